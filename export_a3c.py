@@ -0,0 +1,19 @@
+"""Export a trained A3C model to a NumPy weight file"""
+
+import argparse
+
+from loveletter.agents.a3c_numpy import export_weights
+
+PARSER = argparse.ArgumentParser(
+    description='Export an A3C state dict for AgentA3CNumpy')
+
+PARSER.add_argument('model', type=str,
+                    help='Path of the saved ActorCritic state dict')
+PARSER.add_argument('--output', type=str, default=None,
+                    help='Path of the weight file (default: model path + .npz)')
+
+ARGS = PARSER.parse_args()
+
+OUTPUT = ARGS.output if ARGS.output is not None else ARGS.model + '.npz'
+export_weights(ARGS.model, OUTPUT)
+print('Wrote', OUTPUT)
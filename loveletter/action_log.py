@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Action log
+Persistent log of the actions taken during a game.
+"""
+
+
+class ActionLog():
+    """
+    Immutable sequence of PlayerActions, oldest first.
+
+    A log is its last action and the log before it, so appending is O(1)
+    and a game shares its history with every game moved to from it.
+    Indexing walks back from the newest action, which makes the recent
+    actions the cheapest to read.
+    """
+
+    __slots__ = ('_action', '_previous', '_length')
+
+    def __init__(self, action=None, previous=None):
+        self._action = action
+        self._previous = previous
+        self._length = 0 if previous is None else previous._length + 1
+
+    def append(self, action):
+        """New log with the action added last"""
+        return ActionLog(action, self)
+
+    def previous(self):
+        """Log without its last action"""
+        return self._previous
+
+    def last(self):
+        """Most recent action, None if the log is empty"""
+        return self._action
+
+    def since(self, log):
+        """
+        Actions appended to log to give this log, newest first.
+
+        None if this log does not extend log.
+        """
+        added = []
+        node = self
+        while node._length > log._length:
+            added.append(node._action)
+            node = node._previous
+        return added if node is log else None
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def __reversed__(self):
+        node = self
+        while node._previous is not None:
+            yield node._action
+            node = node._previous
+
+    def __iter__(self):
+        actions = list(reversed(self))
+        actions.reverse()
+        return iter(actions)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self)[idx]
+        if idx < 0:
+            idx += self._length
+        if idx < 0 or idx >= self._length:
+            raise IndexError("Action log index out of range")
+        node = self
+        for _ in range(self._length - 1 - idx):
+            node = node._previous
+        return node._action
+
+    def __eq__(self, other):
+        if isinstance(other, (ActionLog, list, tuple)):
+            return len(self) == len(other) and \
+                all(a == b for a, b in zip(reversed(self), reversed(other)))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "ActionLog({})".format(list(self))
+
+    @staticmethod
+    def of(actions):
+        """Log of the actions in order, shared if already a log"""
+        if isinstance(actions, ActionLog):
+            return actions
+        log = ActionLog()
+        for action in actions:
+            log = log.append(action)
+        return log
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Action tables
+Candidate actions by index and precomputed legality lookups.
+
+Actions are addressed by index, in the layout of
+`LoveLetterEnv.actions_set`:
+
+  0 - 7   discard king, guard, priest, baron, prince, handmaid, countess
+          or princess targeting the current player
+  8 +     per relative target (0 is the current player) eleven actions:
+          guard guessing priest through princess, priest, baron, king
+          and prince
+
+The index is the action's ID. `candidates` holds one interned
+PlayerAction per seat and ID, `action_id` maps an action back to its ID.
+Some actions have two IDs (e.g. a king on oneself is both ID 0 and a
+king on relative target 0), they map back to the lowest.
+
+Whether an action is valid only depends on the current player's hand
+card, the card they drew, their seat and which players are still
+playing or protected. `legal_actions` memoizes the result per such key.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.player import PlayerAction
+
+_SELF_CARDS = [Card.king, Card.guard, Card.priest, Card.baron,
+               Card.prince, Card.handmaid, Card.countess, Card.princess]
+_TARGET_ACTIONS = [(Card.guard, guess) for guess in range(Card.priest, Card.princess + 1)] + \
+    [(Card.priest, Card.noCard), (Card.baron, Card.noCard),
+     (Card.king, Card.noCard), (Card.prince, Card.noCard)]
+
+
+# Valid actions of a player
+#
+#  mask - int with bit i set if action index i is valid
+#  indices - tuple of valid action indices, ascending
+#  actions - tuple of the valid candidate PlayerActions, same order
+#  array - read only int8 numpy array of the mask bits
+LegalActions = namedtuple('LegalActions', 'mask indices actions array')
+
+
+def action_count(player_count=4):
+    """Number of action indices for a game with player_count players"""
+    return len(_SELF_CARDS) + len(_TARGET_ACTIONS) * player_count
+
+
+def action_layout(player_count=4):
+    """Arrays of (discard, target offset, guess) for every action index"""
+    cards = list(_SELF_CARDS)
+    offsets = [0] * len(_SELF_CARDS)
+    guesses = [Card.noCard] * len(_SELF_CARDS)
+    for offset in range(player_count):
+        for card, guess in _TARGET_ACTIONS:
+            cards.append(card)
+            offsets.append(offset)
+            guesses.append(guess)
+    return np.array(cards), np.array(offsets), np.array(guesses)
+
+
+@lru_cache(maxsize=None)
+def candidates(player_turn, player_count=4):
+    """Tuple of every candidate action for the player, by index"""
+    cards, offsets, guesses = action_layout(player_count)
+    return tuple(PlayerAction(int(card), (player_turn + int(offset)) % player_count,
+                              int(guess), Card.noCard, Card.noCard,
+                              player_turn, 0)
+                 for card, offset, guess in zip(cards, offsets, guesses))
+
+
+@lru_cache(maxsize=None)
+def _action_ids(player_turn, player_count):
+    """Dict of (discard, player target, guess) to lowest action ID"""
+    ids = {}
+    for idx, action in enumerate(candidates(player_turn, player_count)):
+        ids.setdefault((action.discard, action.player_target, action.guess), idx)
+    return ids
+
+
+def action_id(action, player_turn=None, player_count=4):
+    """
+    Action ID of a PlayerAction, None if it is not a candidate
+
+    The action is played by player_turn, by default its player field.
+    """
+    player_turn = action.player if player_turn is None else player_turn
+    return _action_ids(player_turn, player_count).get(
+        (action.discard, action.player_target, action.guess))
+
+
+def masked_argmax(scores, legal):
+    """
+    Index of the highest score of each row among its legal actions.
+
+    legal has one column per action ID, non zero where the action is
+    legal, and scores at least as many. Columns of scores past legal
+    are never chosen.
+    """
+    columns = legal.shape[-1]
+    masked = np.where(legal > 0, scores[..., :columns], -np.inf)
+    return masked.argmax(axis=-1)
+
+
+@lru_cache(maxsize=None)
+def legal_actions(hand_card, drawn_card, player_turn, alive, defended,
+                  player_count=4):
+    """
+    LegalActions for a player
+
+    alive and defended are bitmasks with bit i set if player i is still
+    playing or protected by a handmaid respectively.
+    """
+    actions = candidates(player_turn, player_count)
+    mask = 0
+    if hand_card != Card.noCard:
+        for idx, action in enumerate(actions):
+            if _is_valid(action, hand_card, drawn_card, player_turn,
+                         alive, defended):
+                mask |= 1 << idx
+
+    count = action_count(player_count)
+    indices = tuple(idx for idx in range(count) if (mask >> idx) & 1)
+    array = np.zeros(count, dtype=np.int8)
+    array[list(indices)] = 1
+    array.flags.writeable = False
+    return LegalActions(mask, indices,
+                        tuple(actions[idx] for idx in indices), array)
+
+
+def _is_valid(action, hand_card, drawn_card, player_turn, alive, defended):
+    """Game.is_action_valid for a player that is still playing"""
+    target = action.player_target
+
+    # cannot discard a card not in the hand
+    if action.discard != hand_card and action.discard != drawn_card:
+        return False
+
+    new_hand_card = drawn_card if action.discard == hand_card else hand_card
+
+    # countess must be discarded if the other card is king/prince
+    if new_hand_card == Card.countess and \
+            (action.discard == Card.prince or action.discard == Card.king):
+        return False
+
+    # cannot target an invalid player
+    if not (alive >> target) & 1:
+        return False
+
+    # cannot mis-target a card, unless everybody else is protected (or dead)
+    if player_turn == target and action.discard in Card.only_other:
+        return alive & ~defended & ~(1 << player_turn) == 0
+
+    if player_turn != target and action.discard in Card.only_self:
+        return False
+
+    # Check if target is defended (and not the current player)
+    if player_turn != target and (defended >> target) & 1:
+        return False
+
+    # Cannot guess guard or no card
+    if action.discard == Card.guard and (
+            action.guess == Card.guard or action.guess == Card.noCard):
+        return False
+
+    return True
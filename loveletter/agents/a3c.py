@@ -1,22 +1,26 @@
 """Agent with uses A3C trained network"""
 
-import random
+from collections import namedtuple
 
+import numpy as np
 import torch
-import torch.nn.functional as F
 from torch.autograd import Variable
 
 
-from loveletter.env import LoveLetterEnv
-from loveletter.agents.random import AgentRandom
+from loveletter.actions import action_count, candidates, masked_argmax
 from loveletter.agents.agent import Agent
+from loveletter.encoding import OBSERVATION_SIZE
 from loveletter.trainers.a3c_model import ActorCritic
 
+# the part of a gym Discrete space ActorCritic reads
+ActionSpace = namedtuple('ActionSpace', 'n')
 
 
 class AgentA3C(Agent):
     '''Agent which leverages Actor Critic Learning'''
 
+    reusable = True
+
     def __init__(self,
                  model_path,
                  dtype,
@@ -24,38 +28,40 @@ class AgentA3C(Agent):
         self._seed = seed
         self._idx = 0
         self._dtype = dtype
-        self.env = LoveLetterEnv(AgentRandom(seed), seed)
-        state = self.env.reset()
 
+        # the model scores an action per observation entry, as the
+        # environment's action space it was trained in
         self._model = ActorCritic(
-            state.shape[0], self.env.action_space).type(dtype)
+            OBSERVATION_SIZE, ActionSpace(OBSERVATION_SIZE)).type(dtype)
         self._model.load_state_dict(torch.load(model_path,
                                                map_location={'cuda:0': 'cpu'}))
 
     def _move(self, game):
-        '''Return move which ends in score hole'''
-        assert game.active()
-        self._idx += 1
+        '''Return the legal move the model scores highest'''
+        return self.move_batch([game])[0]
+
+    def move_batch(self, games):
+        '''
+        Return the moves of many games from one forward pass.
+
+        Logits of illegal actions are masked out, so the move is the
+        legal action of highest probability.
+        '''
+        for game in games:
+            assert game.active()
+        self._idx += len(games)
 
-        state = self.env.force(game)
-        state = torch.from_numpy(state).type(self._dtype)
-        cx = Variable(torch.zeros(1, 256).type(self._dtype), volatile=True)
-        hx = Variable(torch.zeros(1, 256).type(self._dtype), volatile=True)
+        observations = np.stack([game.observation() for game in games])
+        states = torch.from_numpy(observations).type(self._dtype)
+        cx = Variable(torch.zeros(len(games), 256).type(self._dtype), volatile=True)
+        hx = Variable(torch.zeros(len(games), 256).type(self._dtype), volatile=True)
 
         _, logit, (hx, cx) = self._model(
-            (Variable(state.unsqueeze(0), volatile=True), (hx, cx)))
-        prob = F.softmax(logit)
-        action_idx = prob.max(1)[1].data.cpu().numpy()[0]
-
-        player_action = self.env.action_from_index(action_idx, game)
-        if player_action is None:
-            # print("ouch")
-            options = Agent.valid_actions(game, self._seed + self._idx)
-            if len(options) < 1:
-                raise Exception("Unable to play without actions")
-
-            random.seed(self._seed + self._idx)
-            return random.choice(options)
-
-        # print("playing ", self._idx, player_action)
-        return player_action
+            (Variable(states, volatile=True), (hx, cx)))
+        action_indices = masked_argmax(
+            logit.data.cpu().numpy(),
+            observations[:, :action_count(len(games[0].players()))])
+
+        return [candidates(game.player_turn(), len(game.players()))[action_idx]
+                for game, action_idx in zip(games, action_indices)]
+
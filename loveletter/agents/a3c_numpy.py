@@ -0,0 +1,95 @@
+"""Agent with uses A3C trained network, evaluated with NumPy"""
+
+import numpy as np
+
+from loveletter.actions import action_count, candidates, masked_argmax
+from loveletter.agents.agent import Agent
+from loveletter.encoding import OBSERVATION_SIZE
+
+# arrays of a weight file, by ActorCritic state dict name
+WEIGHT_NAMES = ['linear1.weight', 'linear1.bias',
+                'lstm.weight_ih', 'lstm.bias_ih', 'lstm.bias_hh',
+                'actor_linear.weight', 'actor_linear.bias']
+HIDDEN_SIZE = 256
+
+
+def write_weights(path, state):
+    """Save the arrays inference needs from an ActorCritic state dict"""
+    np.savez(path, **{name: np.asarray(state[name], dtype=np.float32)
+                      for name in WEIGHT_NAMES})
+
+
+def export_weights(model_path, path):
+    """Write the NumPy weight file of a saved ActorCritic state dict"""
+    import torch
+
+    state = torch.load(model_path, map_location={'cuda:0': 'cpu'})
+    write_weights(path, {name: state[name].cpu().numpy() for name in WEIGHT_NAMES})
+
+
+class AgentA3CNumpy(Agent):
+    '''
+    Agent which plays as AgentA3C from an exported weight file.
+
+    Computes the same float32 forward pass as ActorCritic, without torch,
+    so decisions match up to float32 rounding of near ties.
+    The LSTM cell starts from a zero state for every move, so the hidden
+    to hidden weights are not needed.
+    '''
+
+    reusable = True
+
+    def __init__(self,
+                 weights_path,
+                 seed=451):
+        self._seed = seed
+        self._idx = 0
+        with np.load(weights_path) as weights:
+            # transposed once so a batch of rows is multiplied on the left
+            self._linear1 = np.ascontiguousarray(weights['linear1.weight'].T)
+            self._linear1_bias = weights['linear1.bias']
+            self._lstm = np.ascontiguousarray(weights['lstm.weight_ih'].T)
+            self._lstm_bias_ih = weights['lstm.bias_ih']
+            self._lstm_bias_hh = weights['lstm.bias_hh']
+            self._actor = np.ascontiguousarray(weights['actor_linear.weight'].T)
+            self._actor_bias = weights['actor_linear.bias']
+        if self._linear1.shape[0] != OBSERVATION_SIZE or \
+                self._actor.shape[1] < action_count(4):
+            raise Exception("Model takes {} inputs and scores {} actions, the game "
+                            "observes {} and has {}".format(
+                                self._linear1.shape[0], self._actor.shape[1],
+                                OBSERVATION_SIZE, action_count(4)))
+
+    def _move(self, game):
+        '''Return the legal move the model scores highest'''
+        return self.move_batch([game])[0]
+
+    def move_batch(self, games):
+        '''Return the moves of many games from one forward pass'''
+        for game in games:
+            assert game.active()
+        self._idx += len(games)
+
+        observations = np.stack([game.observation() for game in games])
+        logits = self.logits(observations)
+        action_indices = masked_argmax(
+            logits, observations[:, :action_count(len(games[0].players()))])
+        return [candidates(game.player_turn(), len(game.players()))[action_idx]
+                for game, action_idx in zip(games, action_indices)]
+
+    def logits(self, observations):
+        '''Actor logits of a batch of observations'''
+        hidden = observations @ self._linear1 + self._linear1_bias
+        hidden = np.where(hidden > 0, hidden, np.expm1(np.minimum(hidden, 0)))
+
+        # gates in, forget, cell, out; forget is unused from a zero cell
+        gates = (hidden @ self._lstm + self._lstm_bias_ih) + self._lstm_bias_hh
+        size = HIDDEN_SIZE
+        cell = _sigmoid(gates[:, :size]) * np.tanh(gates[:, 2 * size:3 * size])
+        hidden = _sigmoid(gates[:, 3 * size:]) * np.tanh(cell)
+        return hidden @ self._actor + self._actor_bias
+
+
+def _sigmoid(values):
+    """Logistic function, elementwise"""
+    return 1 / (1 + np.exp(-values))
@@ -6,16 +6,40 @@ Abstract Agent for a Love Letter AI
 
 import random
 
-from loveletter.card import Card
-from loveletter.player import PlayerAction, PlayerActionTools
 
 class Agent():
     """Abstract Class for agent to play Love Letter."""
 
+    # whether the arena may create the agent once and reset it between
+    # games, for agents costly to create such as those loading a model
+    reusable = False
+
     def move(self, game):
         """Return a Player Action based on a game state"""
         return self._move(game)
 
+    def move_batch(self, games):
+        """
+        Player Actions for many games at once.
+
+        Agents able to decide for several games together, such as one
+        forward pass of a model, override this. Their decision for a game
+        must not depend on the other games.
+        """
+        return [self.move(game) for game in games]
+
+    def reset(self, seed=451):
+        """
+        Prepare for a new game as if just created with seed, returns self.
+
+        Agents keeping more per game state than their seed and move count
+        must override this. The arena resets `reusable` agents with the
+        seed of each game, so their lambdas must pass the seed unchanged.
+        """
+        self._seed = seed
+        self._idx = 0
+        return self
+
     def _move(self, game):
         """Return a Player Action based on a game state"""
         raise NotImplementedError("Class {} doesn't implement _move()".format(
@@ -24,71 +48,4 @@ class Agent():
     @staticmethod
     def valid_actions(game, seed=451):
         """Returns valid moves based on a current game"""
-        player_self = game.player_turn()
-        opponents = game.opponent_turn()
-
-        possible_actions = [
-            # Actions always targeting the current player
-            PlayerAction(Card.king, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.guard, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.priest, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.baron, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-
-            PlayerAction(Card.prince, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.handmaid, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.countess, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.princess, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0)
-        ]
-        for rel_idx in range(len(game._players)):
-            target_idx = game.absolute_player_idx(rel_idx, player_self)
-
-            possible_actions.extend([
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.priest,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.baron,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.handmaid,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.prince,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.king,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.countess,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.princess,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.priest,
-                             target_idx,
-                             Card.noCard,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.baron,
-                             target_idx,
-                             Card.noCard,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.king,
-                             target_idx,
-                             Card.noCard,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.prince,
-                             target_idx,
-                             Card.noCard,
-                             Card.noCard, Card.noCard, player_self, 0)
-                ])
-
-        actions = [action for action in possible_actions
-                   if game.is_action_valid(action)]
-        return actions
+        return list(game.legal_actions().actions)
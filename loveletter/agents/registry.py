@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter agent registry
+Agent classes by name, imported only when first asked for.
+
+Agents with heavy dependencies (torch, TensorFlow, gym) stay unimported
+until an agent of theirs is needed. Other packages can add agents with
+an entry point in the `loveletter.agents` group, e.g. in setup.py:
+
+    entry_points={'loveletter.agents': ['Mine = mypackage.agents:AgentMine']}
+"""
+
+import importlib
+
+ENTRY_POINT_GROUP = 'loveletter.agents'
+
+# agent name -> 'module:class'
+_PATHS = {
+    'Random': 'loveletter.agents.random:AgentRandom',
+    'A3C': 'loveletter.agents.a3c:AgentA3C',
+    'A3C NumPy': 'loveletter.agents.a3c_numpy:AgentA3CNumpy',
+    'TF': 'loveletter.agents.tf_agent:TFAgent',
+}
+_LOADED = {}
+_ENTRY_POINTS_READ = []
+
+
+def register(name, path):
+    """Add an agent class by its 'module:class' import path"""
+    _PATHS[name] = path
+    _LOADED.pop(name, None)
+
+
+def names():
+    """Sorted names of the registered agents"""
+    _read_entry_points()
+    return sorted(_PATHS)
+
+
+def path(name):
+    """'module:class' import path of an agent"""
+    _read_entry_points()
+    if name not in _PATHS:
+        raise Exception("Unknown agent {}, registered are {}".format(
+            name, ', '.join(sorted(_PATHS))))
+    return _PATHS[name]
+
+
+def load(name):
+    """Agent class of a name, importing its module on first use"""
+    if name not in _LOADED:
+        module_name, _, class_name = path(name).partition(':')
+        _LOADED[name] = getattr(importlib.import_module(module_name), class_name)
+    return _LOADED[name]
+
+
+def _read_entry_points():
+    """Register the agents of installed packages' entry points, once"""
+    if _ENTRY_POINTS_READ:
+        return
+    _ENTRY_POINTS_READ.append(True)
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return
+    found = entry_points()
+    if hasattr(found, 'select'):
+        found = found.select(group=ENTRY_POINT_GROUP)
+    else:
+        found = found.get(ENTRY_POINT_GROUP, [])
+    for entry_point in found:
+        _PATHS.setdefault(entry_point.name, entry_point.value.replace(' ', ''))
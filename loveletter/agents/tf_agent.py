@@ -9,13 +9,14 @@ from stable_baselines import PPO2
 from loveletter.env import LoveLetterEnv
 from loveletter.agents.random import AgentRandom
 from loveletter.agents.agent import Agent
-from loveletter.trainers.a3c_model import ActorCritic
 
 
 
 class TFAgent(Agent):
     '''Agent which leverages tensorflow'''
 
+    reusable = True
+
     def __init__(self,
                  model_path,
                  seed=451):
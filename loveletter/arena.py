@@ -3,9 +3,52 @@
 Love Letter Arena object
 """
 
+from collections import namedtuple
+import contextlib
 import itertools
+import math
+import multiprocessing
+
 from loveletter.game import Game
 
+# Outcome of one agent against another over a number of deals.
+# The standard error is that of the win rate, from the spread of the
+# per deal win rates, and nan with fewer than two deals
+Comparison = namedtuple('Comparison',
+                        ['wins', 'games', 'win_rate', 'stderr', 'deals'])
+
+# (candidate seat, hand shift) of the single game played per deal
+SINGLE_GAME = ((0, 0),)
+
+# most deals played between saves to a results store
+STORE_CHUNK = 25
+
+# agent lambda pairs, rotations and concurrent games of the pool a worker
+# process belongs to, inherited through fork so the lambdas are never
+# pickled, and the agents the worker created from them
+_WORKER_PAIRS = None
+_WORKER_ROTATIONS = SINGLE_GAME
+_WORKER_CONCURRENT = 1
+_WORKER_AGENTS = {}
+
+
+def _init_worker(pairs, rotations, concurrent_games):
+    """Keep the agent pairs and rotations in the worker process"""
+    global _WORKER_PAIRS, _WORKER_ROTATIONS, _WORKER_CONCURRENT, _WORKER_AGENTS
+    _WORKER_PAIRS = pairs
+    _WORKER_ROTATIONS = rotations
+    _WORKER_CONCURRENT = concurrent_games
+    _WORKER_AGENTS = {}
+
+
+def _play_task(task):
+    """Play a (pair index, first seed, end seed) task in a worker"""
+    pair_idx, start, stop = task
+    lambda_01, lambda_02 = _WORKER_PAIRS[pair_idx]
+    return Arena._play_games(lambda_01, lambda_02, start, stop,
+                             _WORKER_ROTATIONS, _WORKER_AGENTS,
+                             _WORKER_CONCURRENT)
+
 
 class Arena():
     """
@@ -17,11 +60,47 @@ class Arena():
     Where `agent_str` is the display name of the agent and
     `agent_lambda` is a lambda function that takes **only** a random
     seed to create a new object of the agent
+
+    With `workers` above one the games of every pairing are split into
+    chunks of consecutive seeds and played in a pool of forked processes.
+    Every game only depends on its seed, so results equal a serial run.
+    Agents are created for every game, except `reusable` ones, such as
+    model agents, which each process creates once and resets with the
+    seed of every game it plays.
+
+    With `duplicate` every seed is a deal replayed with the first agent
+    of a pairing in each of the four seats, and with `permute_hands` also
+    with the dealt hands rotated between the seats, so luck of the deal
+    cancels out within a deal. `games_to_play` then counts deals.
+
+    With a `stop` rule, such as `SPRT` or `IntervalWidth` from
+    loveletter.sequential, pairings play `batch_size` deals at a time and
+    end early once the rule is met, `games_to_play` being the most deals.
+
+    With a ResultsStore as `store` only the games it lacks are played, and
+    played games are saved to it as they finish. Agents may then be
+    `(agent_str, agent_lambda, fingerprint)` tuples, the fingerprint
+    telling apart models behind the same name, for instance
+    `ResultsStore.fingerprint(model_path)`, or a function returning it,
+    called only once a pairing of the agent is looked up in the store.
+
+    With `concurrent_games` above one a process plays that many games of
+    a chunk at once and asks each agent for the moves of all its pending
+    games in one `move_batch` call. Only agents whose decisions do not
+    depend on earlier moves, such as greedy model agents, then give the
+    results of a serial run, so concurrent games cannot use a store.
     """
 
     def __init__(self,
                  agents=None,
-                 games_to_play=101):
+                 games_to_play=101,
+                 workers=1,
+                 duplicate=False,
+                 permute_hands=False,
+                 stop=None,
+                 batch_size=20,
+                 store=None,
+                 concurrent_games=1):
         self._agents = agents if agents is list else []
         self._games_to_play = games_to_play
         self._names = list(sorted(map(lambda t: t[0], agents)))
@@ -30,58 +109,335 @@ class Arena():
         combos = list(itertools.combinations(agents, 2)) + \
             list(zip(agents, agents))
         self._combos = sorted(combos, key=lambda t: t[0][0] + '_' + t[1][0])
-        self._results = list(map(lambda t: Arena._handle_combo(
-            t[1], games_to_play, t[0]), enumerate(self._combos)))
+        rotations = Arena.rotations(duplicate, permute_hands)
+        comparisons = Arena._compare_pairs(
+            [(combo[0][1], combo[1][1]) for combo in self._combos],
+            games_to_play, range(len(self._combos)), workers, rotations,
+            stop, batch_size, store,
+            [(Arena._key(combo[0]), Arena._key(combo[1])) for combo in self._combos],
+            concurrent_games)
+        self._comparisons = [(combo[0][0], combo[1][0], comparison)
+                             for combo, comparison in zip(self._combos, comparisons)]
+        self._results = [(name_01, name_02, comparison.wins)
+                         for name_01, name_02, comparison in self._comparisons]
+
+    @staticmethod
+    def _key(agent):
+        """(name, fingerprint) of an agent tuple"""
+        return (agent[0], agent[2] if len(agent) > 2 else '')
 
     @staticmethod
-    def _handle_combo(combo, games_to_play, seed):
-        wins = Arena.compare_agents(
-            combo[0][1], combo[1][1], games_to_play, seed)
-        return (combo[0][0], combo[1][0], wins)
+    def _resolved(key):
+        """(name, fingerprint) of a key, calling a fingerprint function"""
+        name, fingerprint = key
+        return (name, fingerprint() if callable(fingerprint) else fingerprint)
 
     @staticmethod
-    def compare_agents(lambda_01, lambda_02, games_to_play=51, seed=451):
+    def compare_agents(lambda_01, lambda_02, games_to_play=51, seed=451,
+                       workers=1):
         """
         Returns number of times agent created from lambda_01
         wins over agent created from lambda_02 (which plays all the other
         positions)
         """
-        wins = 0
+        return Arena._compare_pairs([(lambda_01, lambda_02)], games_to_play,
+                                    [seed], workers)[0].wins
 
-        if lambda_01 is lambda_02:
-            # Playing against yourself is nonsensical
-            return 0
+    @staticmethod
+    def compare_agents_float(lambda_01, lambda_02, games_to_play=51, seed=451,
+                             workers=1):
+        """
+        Returns fraction of times agent created from lambda_01
+        wins over agent created from lambda_02
+        """
 
-        for idx in range(games_to_play):
-            game = Game.new(4, seed + idx)
-            agent_one = (lambda_01)(seed + idx)
-            agent_two = (lambda_02)(seed + idx)
+        wins = Arena.compare_agents(lambda_01, lambda_02, games_to_play, seed,
+                                    workers)
+        return wins / games_to_play
 
-            while game.active():
-                if not game.is_current_player_playing():
-                    game = game.skip_eliminated_player()
-                    continue
+    @staticmethod
+    def compare_agents_duplicate(lambda_01, lambda_02, deals=51, seed=451,
+                                 workers=1, permute_hands=False):
+        """
+        Returns the Comparison of agent created from lambda_01 against
+        agent created from lambda_02 over duplicate deals, each played
+        with the first agent in every seat
+        """
+        return Arena._compare_pairs([(lambda_01, lambda_02)], deals, [seed],
+                                    workers,
+                                    Arena.rotations(True, permute_hands))[0]
 
-                if game.player_turn() == 0:
-                    action = agent_one.move(game)
-                else:
-                    action = agent_two.move(game)
-                game, _ = game.move(action)
+    @staticmethod
+    def compare_agents_sequential(lambda_01, lambda_02, stop, games_to_play=800,
+                                  seed=451, workers=1, batch_size=20,
+                                  duplicate=False):
+        """
+        Returns the Comparison of agent created from lambda_01 against
+        agent created from lambda_02, playing batches of batch_size deals
+        until the stop rule is met or games_to_play deals are played
+        """
+        return Arena._compare_pairs([(lambda_01, lambda_02)], games_to_play,
+                                    [seed], workers, Arena.rotations(duplicate),
+                                    stop, batch_size)[0]
 
-            if game.is_winner(0):
-                wins = wins + 1
-        print('%s won against %s %.1f%% of games' % (agent_one, agent_two, wins*100 / games_to_play))
-        return wins
+    @staticmethod
+    def rotations(duplicate=False, permute_hands=False, player_count=4):
+        """(candidate seat, hand shift) of each game played per deal"""
+        if not duplicate:
+            return SINGLE_GAME
+        shifts = range(player_count) if permute_hands else [0]
+        return tuple((seat, shift) for seat in range(player_count)
+                     for shift in shifts)
 
     @staticmethod
-    def compare_agents_float(lambda_01, lambda_02, games_to_play=51, seed=451):
+    def _compare_pairs(pairs, games_to_play, seeds, workers=1,
+                       rotations=SINGLE_GAME, stop=None, batch_size=20,
+                       store=None, keys=None, concurrent_games=1):
         """
-        Returns fraction of times agent created from lambda_01
-        wins over agent created from lambda_02
+        Comparison of each (lambda_01, lambda_02) pair over games_to_play
+        deals starting from its seed, with all the games in one pool.
+
+        With a stop rule deals are played batch_size at a time, and a pair
+        plays no more batches once stop.done(comparison) holds.
+
+        With a ResultsStore deals it holds for the pair's (agent key,
+        opponent key) in keys are not played again, and played deals are
+        added to it chunk by chunk as they finish. Fingerprint functions
+        of the keys are only called for pairs looked up in the store.
         """
+        if store is not None and concurrent_games > 1:
+            raise Exception("Concurrent games are not stored, they may differ "
+                            "from the serial games of the store")
+        active = [pair_idx for pair_idx, (lambda_01, lambda_02) in enumerate(pairs)
+                  # Playing against yourself is nonsensical
+                  if lambda_01 is not lambda_02]
+        outcomes = [[] for _ in pairs]
+        keys = None if keys is None else list(keys)
+        names = [None] * len(pairs)
+        if active:
+            with Arena._task_runner(pairs, rotations, workers,
+                                    concurrent_games) as run_tasks:
+                while active:
+                    batches = {}
+                    tasks = []
+                    for pair_idx in active:
+                        played = len(outcomes[pair_idx])
+                        count = games_to_play - played if stop is None else \
+                            min(batch_size, games_to_play - played)
+                        first = seeds[pair_idx] + played
+                        if store is not None:
+                            keys[pair_idx] = tuple(map(Arena._resolved,
+                                                       keys[pair_idx]))
+                        stored = {} if store is None else store.deals(
+                            keys[pair_idx][0], keys[pair_idx][1],
+                            first, first + count, rotations)
+                        batch = [stored.get(seed) for seed in range(first, first + count)]
+                        batches[pair_idx] = (first, batch)
+                        for start, missing in Arena._missing_runs(first, batch):
+                            tasks.extend(
+                                (pair_idx, chunk_start, chunk_stop)
+                                for chunk_start, chunk_stop in Arena._seed_chunks(
+                                    start, missing, workers,
+                                    None if store is None else STORE_CHUNK))
+                    for (pair_idx, start, _), (chunk_outcomes, chunk_names) in \
+                            zip(tasks, run_tasks(tasks)):
+                        if store is not None:
+                            store.add(keys[pair_idx][0], keys[pair_idx][1], start,
+                                      chunk_outcomes, rotations)
+                        first, batch = batches[pair_idx]
+                        batch[start - first:start - first + len(chunk_outcomes)] = \
+                            chunk_outcomes
+                        names[pair_idx] = chunk_names
+                    for pair_idx, (_, batch) in batches.items():
+                        outcomes[pair_idx].extend(batch)
+                        if names[pair_idx] is None and keys is not None:
+                            names[pair_idx] = (keys[pair_idx][0][0],
+                                               keys[pair_idx][1][0])
+                    active = [pair_idx for pair_idx in active
+                              if len(outcomes[pair_idx]) < games_to_play and
+                              stop is not None and not stop.done(
+                                  Arena._comparison(
+                                      [sum(deal) for deal in outcomes[pair_idx]],
+                                      len(rotations)))]
 
-        wins = Arena.compare_agents(lambda_01, lambda_02, games_to_play, seed)
-        return wins / games_to_play
+        comparisons = []
+        for pair_outcomes, pair_names in zip(outcomes, names):
+            comparison = Arena._comparison([sum(deal) for deal in pair_outcomes],
+                                           len(rotations))
+            if pair_names is not None and stop is not None:
+                print('%s won against %s %.1f%% of %d games' %
+                      (pair_names + (comparison.win_rate * 100, comparison.games)))
+            elif pair_names is not None:
+                print('%s won against %s %.1f%% of games' %
+                      (pair_names + (comparison.win_rate * 100,)))
+            comparisons.append(comparison)
+        return comparisons
+
+    @staticmethod
+    def _missing_runs(first, batch):
+        """(first seed, count) of each run of deals without outcomes"""
+        runs = []
+        for offset, deal in enumerate(batch):
+            if deal is not None:
+                continue
+            if runs and runs[-1][0] + runs[-1][1] == first + offset:
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((first + offset, 1))
+        return runs
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _task_runner(pairs, rotations, workers, concurrent_games=1):
+        """Function playing a list of tasks, in a pool with several workers"""
+        if workers <= 1:
+            agents = {}
+            # lazily, so the results of each task can be stored as it ends
+            yield lambda tasks: (
+                Arena._play_games(pairs[pair_idx][0], pairs[pair_idx][1],
+                                  start, stop, rotations, agents,
+                                  concurrent_games)
+                for pair_idx, start, stop in tasks)
+            return
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise Exception("Arena workers need the fork start method")
+        context = multiprocessing.get_context('fork')
+        with context.Pool(workers, _init_worker,
+                          (pairs, rotations, concurrent_games)) as pool:
+            yield lambda tasks: pool.imap(_play_task, tasks, chunksize=1)
+
+    @staticmethod
+    def _comparison(outcomes, games_per_deal):
+        """Comparison from the wins of each deal"""
+        deals = len(outcomes)
+        wins = sum(outcomes)
+        games = deals * games_per_deal
+        if deals < 1:
+            return Comparison(0, 0, 0.0, float('nan'), 0)
+        win_rate = wins / games
+        if deals < 2:
+            return Comparison(wins, games, win_rate, float('nan'), deals)
+        # deals are the paired samples, their games are not independent
+        variance = sum((deal_wins / games_per_deal - win_rate) ** 2
+                       for deal_wins in outcomes) / (deals - 1)
+        return Comparison(wins, games, win_rate, math.sqrt(variance / deals),
+                          deals)
+
+    @staticmethod
+    def _seed_chunks(seed, games_to_play, workers, max_size=None):
+        """Consecutive (first seed, end seed) ranges covering the games"""
+        # a few chunks per worker evens out pairings of unequal speed
+        size = max(1, int(math.ceil(games_to_play / (workers * 4)))) \
+            if workers > 1 else max(1, games_to_play)
+        if max_size is not None:
+            size = min(size, max_size)
+        return [(start, min(start + size, seed + games_to_play))
+                for start in range(seed, seed + games_to_play, size)]
+
+    @staticmethod
+    def _deal(seed, shift=0, player_count=4):
+        """New game of the seed with the dealt hands moved shift seats on"""
+        game = Game.new(player_count, seed)
+        if shift == 0:
+            return game
+        players = game.players()
+        players = players[-shift:] + players[:-shift]
+        return Game(game._deck, players, 0, [], player_count)
+
+    @staticmethod
+    def _play_games(lambda_01, lambda_02, start, stop, rotations=SINGLE_GAME,
+                    agents=None, concurrent_games=1):
+        """
+        Wins of agent one in each deal seeded start to stop, as a tuple of
+        0 or 1 per (seat, hand shift) rotation, and the names of the last
+        agents.
+
+        Reusable agents are created from their lambda once and kept in the
+        agents dict, then reset with the seed of every game; other agents,
+        and all of them without a dict, are created for every game.
+        """
+        if concurrent_games > 1:
+            return Arena._play_games_batched(lambda_01, lambda_02, start, stop,
+                                             rotations, agents, concurrent_games)
+        outcomes = []
+        for game_seed in range(start, stop):
+            wins = []
+            for seat, shift in rotations:
+                game = Arena._deal(game_seed, shift)
+                agent_one = Arena._agent(lambda_01, game_seed, agents)
+                agent_two = Arena._agent(lambda_02, game_seed, agents)
+
+                while game.active():
+                    if not game.is_current_player_playing():
+                        game = game.skip_eliminated_player()
+                        continue
+
+                    if game.player_turn() == seat:
+                        action = agent_one.move(game)
+                    else:
+                        action = agent_two.move(game)
+                    game, _ = game.move(action)
+
+                wins.append(1 if game.is_winner(seat) else 0)
+            outcomes.append(tuple(wins))
+        return outcomes, (str(agent_one), str(agent_two))
+
+    @staticmethod
+    def _play_games_batched(lambda_01, lambda_02, start, stop, rotations,
+                            agents, concurrent_games):
+        """
+        _play_games with up to concurrent_games games in play, the moves
+        of each agent asked for with one move_batch call per turn
+        """
+        agent_one = Arena._agent(lambda_01, start, agents)
+        agent_two = Arena._agent(lambda_02, start, agents)
+        # (deal offset, rotation index, seat) of the games yet to start
+        waiting = [(offset, rotation_idx, seat)
+                   for offset in range(stop - start)
+                   for rotation_idx, (seat, _) in enumerate(rotations)]
+        waiting.reverse()
+        wins = [[0] * len(rotations) for _ in range(start, stop)]
+        playing = []
+        while playing or waiting:
+            while waiting and len(playing) < concurrent_games:
+                offset, rotation_idx, seat = waiting.pop()
+                playing.append((offset, rotation_idx, seat, Arena._deal(
+                    start + offset, rotations[rotation_idx][1])))
+
+            pending = ([], [])
+            for slot, (_, _, seat, game) in enumerate(playing):
+                while game.active() and not game.is_current_player_playing():
+                    game = game.skip_eliminated_player()
+                playing[slot] = playing[slot][:3] + (game,)
+                if game.active():
+                    pending[0 if game.player_turn() == seat else 1].append(slot)
+
+            for agent, slots in zip((agent_one, agent_two), pending):
+                if not slots:
+                    continue
+                actions = agent.move_batch([playing[slot][3] for slot in slots])
+                for slot, action in zip(slots, actions):
+                    playing[slot] = playing[slot][:3] + \
+                        (playing[slot][3].move(action)[0],)
+
+            still_playing = []
+            for offset, rotation_idx, seat, game in playing:
+                if game.active():
+                    still_playing.append((offset, rotation_idx, seat, game))
+                elif game.is_winner(seat):
+                    wins[offset][rotation_idx] = 1
+            playing = still_playing
+        return [tuple(deal) for deal in wins], (str(agent_one), str(agent_two))
+
+    @staticmethod
+    def _agent(agent_lambda, seed, agents=None):
+        """Agent of the lambda ready for a game of the seed"""
+        if agents is not None and agent_lambda in agents:
+            return agents[agent_lambda].reset(seed)
+        agent = agent_lambda(seed)
+        if agents is not None and agent.reusable:
+            agents[agent_lambda] = agent
+        return agent
 
     def names(self):
         """Sorted names of agents"""
@@ -91,6 +447,10 @@ class Arena():
         """Sorted results of agents"""
         return self._results[:]
 
+    def comparisons(self):
+        """Sorted (name, opponent name, Comparison) of agents"""
+        return self._comparisons[:]
+
     def csv_header(self):
         """A header row for a csv result"""
         return ['opponent'] + self.names()
@@ -105,14 +465,19 @@ class Arena():
     def _row_from_name(self, name):
         """Returns a row of results, each from the perspective of """
         results_for_player_2 = list(
-            filter(lambda t: t[0] == name or t[1] == name, self._results))
+            filter(lambda t: t[0] == name or t[1] == name, self._comparisons))
         results_fixed_for_row = list(map(lambda t: Arena._fix_for_row(
-            name, t, self._games_to_play), results_for_player_2))
+            name, (t[0], t[1], t[2].wins), self._game_count(t[2])),
+                                         results_for_player_2))
         results_ordered = list(
             sorted(results_fixed_for_row, key=lambda t: t[0]))
         results_final = list(map(lambda t: t[1], results_ordered))
         return [name] + results_final
 
+    def _game_count(self, comparison):
+        """Games of a pairing, as if played for pairings with themselves"""
+        return comparison.games if comparison.games > 0 else self._games_to_play
+
     @staticmethod
     def _fix_for_row(name, match_tuple, game_count):
         """Reduce a row to the player 2 and note the correct win percentage for player 1"""
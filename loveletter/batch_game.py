@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Batch Game object
+
+Holds many games as NumPy arrays and steps all of them at once. Actions
+are indices into the layout described in `loveletter.actions`.
+
+Every game slot is dealt with `Card.shuffle_deck(seed)` so slot `i` of
+`BatchGame(n, seed)` plays the same deal as `Game.new(4, seed + i)`.
+"""
+import numpy as np
+
+from loveletter.actions import action_layout, candidates
+from loveletter.card import Card
+from loveletter.encoding import CONSUMED_SIZE, HAND_SIZE, ROW_LENGTH, STATE_SIZE
+
+SLOTS_PER_PLAYER = 8
+LOG_LENGTH = 15
+DECK_SIZE = sum(Card.counts)
+
+
+class BatchGame():
+    """Many Love Letter Games stepped together"""
+
+    def __init__(self, count, seed=451, player_count=4, auto_reset=True):
+        self._count = count
+        self._player_count = player_count
+        self._auto_reset = auto_reset
+        self._cards, self._offsets, self._guesses = action_layout(player_count)
+        self._only_other = np.isin(self._cards, Card.only_other)
+        self._only_self = np.isin(self._cards, Card.only_self)
+
+        self._decks = np.zeros((count, DECK_SIZE), dtype=np.int8)
+        self._cursor = np.zeros(count, dtype=np.int64)
+        self._hands = np.zeros((count, player_count), dtype=np.int8)
+        self._counts = np.zeros((count, player_count), dtype=np.int64)
+        self._discards = np.zeros(
+            (count, player_count, SLOTS_PER_PLAYER), dtype=np.int8)
+        self._defended = np.zeros((count, player_count), dtype=bool)
+        self._turn = np.zeros(count, dtype=np.int64)
+        self._log = np.zeros((count, LOG_LENGTH, 7), dtype=np.uint8)
+        self._log_length = np.zeros(count, dtype=np.int64)
+        self._seeds = np.zeros(count, dtype=np.int64)
+        self._winners = np.full(count, -1, dtype=np.int64)
+        self._games_played = 0
+
+        self._next_seed = seed + count
+        self._deal(np.arange(count), seed + np.arange(count))
+
+    def _deal(self, rows, seeds):
+        """Deal fresh games into the given slots"""
+        self._decks[rows] = Card.shuffle_decks(seeds)
+        self._seeds[rows] = seeds
+        self._cursor[rows] = self._player_count
+        self._hands[rows] = self._decks[rows, :self._player_count]
+        self._counts[rows] = 0
+        self._discards[rows] = Card.noCard
+        self._defended[rows] = False
+        self._turn[rows] = 0
+        self._log[rows] = 0
+        self._log_length[rows] = 0
+
+    def count(self):
+        """Number of game slots"""
+        return self._count
+
+    def action_count(self):
+        """Number of action indices"""
+        return len(self._cards)
+
+    def seeds(self):
+        """Seed of the game currently in each slot"""
+        return self._seeds.copy()
+
+    def games_played(self):
+        """Number of games finished so far"""
+        return self._games_played
+
+    def hands(self):
+        """int8[count, player_count] card held by each player"""
+        return self._hands.copy()
+
+    def draw_cards(self):
+        """Card available to the current player of each game"""
+        cursor = np.minimum(self._cursor, DECK_SIZE - 1)
+        return self._decks[np.arange(self._count), cursor]
+
+    def player_turns(self):
+        """Player number of the current player of each game"""
+        return self._turn % self._player_count
+
+    def turn_indices(self):
+        """Overall turn index of each game"""
+        return self._turn.copy()
+
+    def rounds(self):
+        """Current round number of each game"""
+        return self._turn // self._player_count
+
+    def cards_left(self):
+        """Number of cards left to distribute in each game"""
+        return DECK_SIZE - self._cursor - 1
+
+    def discards(self):
+        """int8[count, player_count, 8] cards discarded by each player"""
+        return self._discards.copy()
+
+    def defended(self):
+        """bool[count, player_count] players protected by a handmaid"""
+        return self._defended.copy()
+
+    def alive(self):
+        """bool[count, player_count] players still holding a card"""
+        return self._hands != Card.noCard
+
+    def action_logs(self):
+        """
+        (uint8[count, 15, 7], int[count]) logged actions and log lengths
+
+        Rows hold PlayerAction fields in order, oldest action first.
+        """
+        return self._log.copy(), self._log_length.copy()
+
+    def active(self):
+        """bool[count] games still being played"""
+        alive_count = (self._hands != Card.noCard).sum(axis=1)
+        return (alive_count > 1) & (self.cards_left() > 0)
+
+    def winners(self):
+        """
+        Winner of the game most recently finished in each slot.
+
+        Without auto reset this is the winner of the finished game
+        still held in the slot. -1 where no game has finished.
+        """
+        return self._winners.copy()
+
+    def decode(self, index, player_turn):
+        """PlayerAction for an action index"""
+        return candidates(int(player_turn), self._player_count)[index]
+
+    def legal_mask(self):
+        """bool[count, action_count] valid actions of each current player"""
+        rows = np.arange(self._count)
+        seat = self.player_turns()
+        hand = self._hands[rows, seat][:, None]
+        drawn = self.draw_cards()[:, None]
+        cards = self._cards[None, :]
+        is_self = (self._offsets == 0)[None, :]
+
+        target = (seat[:, None] + self._offsets[None, :]) % self._player_count
+        alive = self._hands != Card.noCard
+        target_alive = alive[rows[:, None], target]
+        target_defended = self._defended[rows[:, None], target]
+
+        # others that can still be targeted
+        others_open = alive & ~self._defended
+        others_open[rows, seat] = False
+        none_open = ~others_open.any(axis=1)[:, None]
+
+        new_hand = np.where(cards == hand, drawn, hand)
+        mask = ((cards == hand) | (cards == drawn)) & \
+            ~((new_hand == Card.countess) &
+              ((cards == Card.prince) | (cards == Card.king))) & \
+            target_alive
+
+        guess_invalid = (cards == Card.guard) & \
+            ((self._guesses == Card.guard) | (self._guesses == Card.noCard))[None, :]
+        targeted = ~(~is_self & self._only_self[None, :]) & \
+            ~(~is_self & target_defended) & ~guess_invalid
+        self_only_other = is_self & self._only_other[None, :]
+        mask &= np.where(self_only_other, none_open, targeted)
+
+        mask &= (hand != Card.noCard) & self.active()[:, None]
+        return mask
+
+    def observations(self, out=None):
+        """
+        float32[count, action_count + 1344] observations of the current
+        players, laid out as Game.observation: valid action mask then state.
+
+        Written into out when given; integer buffers hold consumed card
+        counts, as with Game.observation.
+        """
+        rows = np.arange(self._count)
+        actions = len(self._cards)
+        if out is None:
+            out = np.empty((self._count, actions + STATE_SIZE), dtype=np.float32)
+        out[:, :actions] = self.legal_mask()
+        state = out[:, actions:]
+        state[:] = 0
+
+        # hand cards, lowest first
+        seat = self.player_turns()
+        hand = self._hands[rows, seat].astype(np.int64)
+        drawn = self.draw_cards().astype(np.int64)
+        state[rows, (np.minimum(hand, drawn) - 1) % 8] = 1
+        state[rows, 8 + (np.maximum(hand, drawn) - 1) % 8] = 1
+
+        # consumed cards: discards of every player and the two in hand
+        recorded = np.arange(SLOTS_PER_PLAYER) < self._counts[:, :, None]
+        seen = np.where(recorded, self._discards, Card.noCard).reshape(
+            self._count, -1)
+        seen = np.concatenate([seen, hand[:, None], drawn[:, None]], axis=1)
+        cards = np.arange(1, len(Card.counts) + 1)
+        counts = (seen[:, :, None] == cards).sum(axis=1)
+        if out.dtype.kind in "iu":
+            state[:, HAND_SIZE:HAND_SIZE + CONSUMED_SIZE] = counts
+        else:
+            state[:, HAND_SIZE:HAND_SIZE + CONSUMED_SIZE] = \
+                counts / np.array(Card.counts)
+
+        # action log rows relative to the current player, newest first
+        log = state[:, HAND_SIZE + CONSUMED_SIZE:].reshape(
+            self._count, LOG_LENGTH, ROW_LENGTH)
+        source = self._log_length[:, None] - 1 - np.arange(LOG_LENGTH)
+        game, row = np.nonzero(source >= 0)
+        card, target, guess, revealed, force_discarded, player, force_discarder = \
+            self._log[game, source[game, row]].astype(np.int64).T
+        observer = seat[game]
+
+        def relative(player_idx):
+            return (player_idx - observer) % self._player_count
+
+        log[game, row, relative(player)] = 1
+        log[game, row, 4 + (card - 1) % 8] = 1
+        log[game, row, 12 + relative(target)] = 1
+        sel = guess > 0
+        log[game[sel], row[sel], 16 + guess[sel] - 1] = 1
+        sel = force_discarded > 0
+        log[game[sel], row[sel], 24 + relative(force_discarder)[sel] * 8 +
+            force_discarded[sel] - 1] = 1
+        sel = revealed > 0
+        log[game[sel], row[sel], 56 + relative(target)[sel] * 8 +
+            revealed[sel] - 1] = 1
+        return out
+
+    def reset(self, rows):
+        """Deal fresh games with the next seeds into the given slots"""
+        rows = np.asarray(rows, dtype=np.int64)
+        seeds = self._next_seed + np.arange(rows.size)
+        self._next_seed += rows.size
+        self._deal(rows, seeds)
+
+    def step(self, actions, playing=None):
+        """
+        Current player of every game plays the action with that index.
+
+        Invalid actions (and actions for finished games) leave their
+        game untouched, as do games not selected by the bool[count]
+        playing mask when one is given. Finished games are dealt again
+        with the next seed when auto reset is on.
+
+        Returns (valid, done) bool[count] arrays
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        rows = np.arange(self._count)
+        valid = self.legal_mask()[rows, actions]
+        if playing is not None:
+            valid &= playing
+        playing = np.flatnonzero(valid)
+        if playing.size > 0:
+            self._apply(playing, actions[playing])
+            self._skip_eliminated()
+
+        done = valid & ~self.active()
+        finished = np.flatnonzero(done)
+        if finished.size > 0:
+            self._winners[finished] = self._hands[finished].argmax(axis=1)
+            self._games_played += finished.size
+            if self._auto_reset:
+                self.reset(finished)
+
+        return valid, done
+
+    def _apply(self, rows, actions):
+        """Apply valid actions to the games in rows"""
+        hands = self._hands
+        turn = self._turn[rows] % self._player_count
+        card = self._cards[actions]
+        target = (turn + self._offsets[actions]) % self._player_count
+        guess = self._guesses[actions]
+
+        # state before the move
+        hand = hands[rows, turn].astype(np.int64)
+        cursor = self._cursor[rows] + 1
+        dealt = self._decks[rows, cursor - 1].astype(np.int64)
+        hand_new = np.where(card == hand, dealt, hand)
+        target_hand = hands[rows, target].astype(np.int64)
+        target_defended = self._defended[rows, target]
+        count_turn = self._counts[rows, turn]
+        count_target = self._counts[rows, target]
+
+        revealed = np.zeros(len(rows), dtype=np.int64)
+        force_discarded = np.zeros(len(rows), dtype=np.int64)
+        force_discarder = np.zeros(len(rows), dtype=np.int64)
+
+        # princess: both cards are discarded and the player is out
+        sel = card == Card.princess
+        self._push(rows[sel], turn[sel], hand[sel])
+        self._push(rows[sel], turn[sel], dealt[sel])
+        hands[rows[sel], turn[sel]] = Card.noCard
+
+        # every other card is recorded and the other card kept
+        sel = ~sel
+        self._push(rows[sel], turn[sel], card[sel])
+        hands[rows[sel], turn[sel]] = hand_new[sel]
+
+        # priest: the target's card is revealed unless protected
+        sel = (card == Card.priest) & ~target_defended
+        revealed[sel] = target_hand[sel]
+
+        # baron: lower hand is eliminated
+        baron = card == Card.baron
+        sel = baron & (hand_new > target_hand) & ~target_defended
+        self._force_discard(rows[sel], target[sel], target_hand[sel],
+                            count_target[sel])
+        force_discarded[sel] = target_hand[sel]
+        force_discarder[sel] = target[sel]
+
+        sel = baron & (hand_new == target_hand)
+        revealed[sel] = target_hand[sel]
+
+        sel = baron & (hand_new < target_hand)
+        self._force_discard(rows[sel], turn[sel], hand[sel], count_turn[sel])
+        self._push(rows[sel], turn[sel], hand_new[sel])
+        force_discarded[sel] = hand_new[sel]
+        force_discarder[sel] = turn[sel]
+
+        # guard: a right guess eliminates the target
+        sel = (card == Card.guard) & (target_hand == guess) & ~target_defended
+        self._force_discard(rows[sel], target[sel], target_hand[sel],
+                            count_target[sel])
+
+        # prince: target discards and draws, unless the deck is empty
+        prince = card == Card.prince
+        card_target = hands[rows, target].astype(np.int64)
+        force_discarded[prince] = card_target[prince]
+        force_discarder[prince] = target[prince]
+        sel = prince & (DECK_SIZE - cursor - 1 >= 1)
+        self._push(rows[sel], target[sel], card_target[sel])
+        out = sel & (card_target == Card.princess)
+        hands[rows[out], target[out]] = Card.noCard
+        redraw = sel & (card_target != Card.princess)
+        hands[rows[redraw], target[redraw]] = \
+            self._decks[rows[redraw], cursor[redraw]]
+        cursor[redraw] += 1
+
+        # king: trade hands
+        sel = card == Card.king
+        hand_turn = hands[rows[sel], turn[sel]]
+        hands[rows[sel], turn[sel]] = hands[rows[sel], target[sel]]
+        hands[rows[sel], target[sel]] = hand_turn
+
+        self._log[rows, self._log_length[rows]] = np.stack(
+            [card, target, guess, revealed, force_discarded, turn,
+             force_discarder], axis=1)
+        self._log_length[rows] += 1
+        self._cursor[rows] = cursor
+        self._turn[rows] += 1
+
+    def _push(self, rows, seats, cards):
+        """Record a discard for one player in each of the rows"""
+        position = self._counts[rows, seats]
+        if (position >= SLOTS_PER_PLAYER).any():
+            raise Exception("Insufficient space in actions")
+        self._discards[rows, seats, position] = cards
+        self._counts[rows, seats] = position + 1
+        self._defended[rows, seats] = cards == Card.handmaid
+
+    def _force_discard(self, rows, seats, hand_before, count_before):
+        """
+        Force players to discard the card held before this move.
+
+        Discards recorded for them during this move are dropped first,
+        as Game rebuilds the player from the record it had before.
+        """
+        self._counts[rows, seats] = count_before
+        self._push(rows, seats, hand_before)
+        self._hands[rows, seats] = Card.noCard
+
+    def _skip_eliminated(self):
+        """Advance turns past eliminated players of active games"""
+        rows = np.arange(self._count)
+        for _ in range(self._player_count - 1):
+            seat = self.player_turns()
+            skip = self.active() & (self._hands[rows, seat] == Card.noCard)
+            if not skip.any():
+                return
+            self._turn[skip] += 1
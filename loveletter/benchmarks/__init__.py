@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Performance benchmarks for the Love Letter engine and tooling.
+
+Each suite is a module in this package exposing `run(args)` which prints
+its measurements. Run them with `python run_benchmarks.py [suite ...]`.
+"""
+
+import importlib
+import random
+import sys
+import time
+
+import numpy as np
+
+from loveletter.agents.agent import Agent
+from loveletter.game import Game
+from loveletter.player import PlayerActionTools
+
+
+# suite name -> module, imported only when the suite is run
+SUITES = {
+    'arena': 'loveletter.benchmarks.arena_bench',
+    'game': 'loveletter.benchmarks.game_bench',
+    'imports': 'loveletter.benchmarks.imports_bench',
+    'actions': 'loveletter.benchmarks.actions_bench',
+    'batch': 'loveletter.benchmarks.batch_bench',
+    'encoding': 'loveletter.benchmarks.encoding_bench',
+    'env': 'loveletter.benchmarks.env_bench',
+    'search': 'loveletter.benchmarks.search_bench',
+}
+
+
+def run_suite(name, args):
+    """Import and run a benchmark suite by name"""
+    module = importlib.import_module(SUITES[name])
+    print('== {} '.format(name) + '=' * (76 - len(name)))
+    module.run(args)
+
+
+def timed(func, repeat=3):
+    """Best wall-clock time in seconds of `repeat` calls to func"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(label, value, unit):
+    """Print a single aligned measurement"""
+    print("  {: <44} {: >14,.1f} {}".format(label, value, unit))
+
+
+def record_games(count, seed=451):
+    """
+    Play random games and record their action sequences.
+
+    Returns a list of (seed, actions) where actions includes the blank
+    actions used to skip eliminated players, so any engine can replay
+    the game with plain `_move` calls.
+    """
+    games = []
+    for idx in range(count):
+        game_seed = seed + idx
+        game = Game.new(4, game_seed)
+        rng = random.Random(game_seed)
+        actions = []
+        while game.active():
+            if not game.is_current_player_playing():
+                action = PlayerActionTools.blank()
+            else:
+                action = rng.choice(Agent.valid_actions(game))
+            actions.append(action)
+            game = game._move(action)
+        games.append((game_seed, actions))
+    return games
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Approximate number of bytes reachable from obj.
+
+    Objects whose id is already in `seen` are not counted, which allows
+    measuring only the memory a state does not share with another.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, np.ndarray):
+            if item.base is not None:
+                stack.append(item.base)
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            if hasattr(item, '__dict__'):
+                stack.append(item.__dict__)
+            for cls in type(item).__mro__:
+                slots = getattr(cls, '__slots__', ())
+                slots = (slots,) if isinstance(slots, str) else slots
+                for slot in slots:
+                    if hasattr(item, slot):
+                        stack.append(getattr(item, slot))
+    return total
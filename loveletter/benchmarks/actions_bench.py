@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of legal action generation.
+
+Compares testing all candidate actions with Game.is_action_valid to the
+precomputed lookup behind Game.legal_actions, on the decision points of
+recorded random games. The scan also gives the throughput of
+Game.is_action_valid itself. Then compares choosing the best scored
+action by scanning the candidates to a masked argmax over the scores,
+as LoveLetterEnv.action_by_score does.
+"""
+import numpy as np
+
+from loveletter.actions import action_count, candidates, masked_argmax
+from loveletter.benchmarks import record_games, report, timed
+from loveletter.game import Game
+
+
+def decision_points(games):
+    """Games at every point where a player has to act"""
+    points = []
+    for seed, actions in games:
+        game = Game.new(4, seed)
+        for action in actions:
+            if game.is_current_player_playing():
+                points.append(game)
+            game = game._move(action)
+    return points
+
+
+def scan(points):
+    """Valid actions by testing every candidate"""
+    for game in points:
+        [action for action in candidates(game.player_turn())
+         if game.is_action_valid(action)]
+
+
+def lookup(points):
+    """Valid actions from the lookup table"""
+    for game in points:
+        game.legal_actions().actions
+
+
+def scored_scan(points, scores):
+    """Best scored action by testing every candidate"""
+    for game, row in zip(points, scores):
+        max((score, idx) for idx, (action, score) in
+            enumerate(zip(candidates(game.player_turn()), row))
+            if game.is_action_valid(action))
+
+
+def scored_argmax(points, scores):
+    """Best scored action by a masked argmax"""
+    for game, row in zip(points, scores):
+        candidates(game.player_turn())[
+            masked_argmax(row, game.legal_actions().array)]
+
+
+def run(args):
+    """Run the benchmark"""
+    points = decision_points(record_games(args.games, args.seed))
+    for name, generate in [('is_action_valid scan', scan),
+                           ('legal_actions lookup', lookup)]:
+        elapsed = timed(lambda: generate(points))
+        report('{} decisions/sec'.format(name), len(points) / elapsed,
+               'decisions/s')
+        if generate is scan:
+            report('is_action_valid calls/sec',
+                   len(points) * action_count() / elapsed, 'calls/s')
+
+    scores = np.random.RandomState(args.seed).uniform(
+        size=(len(points), action_count()))
+    for name, choose in [('score scan', scored_scan),
+                         ('score masked argmax', scored_argmax)]:
+        elapsed = timed(lambda: choose(points, scores))
+        report('{} decisions/sec'.format(name), len(points) / elapsed,
+               'decisions/s')
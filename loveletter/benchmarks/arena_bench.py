@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the Arena process pool.
+
+Plays a tournament of four random agents and reports games per second
+with a growing number of worker processes, up to the number of cores,
+then the standard error of one pairing's win rate for the same number
+of games dealt fresh, seat rotated and seat and hand rotated, and the
+games a sequential test plays for a close and a clear pairing.
+
+Finally compares creating the NumPy A3C agent for every game against
+creating it once and resetting it between games, as the arena does for
+reusable agents, and against playing many games at once with batched moves, and reports
+the start-up time and memory of a process creating the NumPy agent and,
+when torch is installed, the torch one.
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from loveletter.agents.a3c_numpy import AgentA3CNumpy, write_weights
+from loveletter.agents.agent import Agent
+from loveletter.encoding import OBSERVATION_SIZE
+from loveletter.agents.random import AgentRandom
+from loveletter.arena import Arena
+from loveletter.benchmarks import report, timed
+from loveletter.sequential import SPRT
+
+AGENTS = [
+    ("Random A", lambda seed: AgentRandom(seed)),
+    ("Random B", lambda seed: AgentRandom(seed + 1000)),
+    ("Random C", lambda seed: AgentRandom(seed + 2000)),
+    ("Random D", lambda seed: AgentRandom(seed + 3000))
+]
+
+CONCURRENT_GAMES = [1, 16, 256]
+
+
+class AgentFirst(Agent):
+    """Always plays the first legal action, a clearly weak agent"""
+
+    def __init__(self, seed=451):
+        self._seed = seed
+
+    def _move(self, game):
+        return Agent.valid_actions(game)[0]
+
+
+def save_model(path, seed=451):
+    """NumPy A3C weight file of random actor critic weights"""
+    rng = np.random.RandomState(seed)
+    shapes = {'linear1.weight': (256, OBSERVATION_SIZE), 'linear1.bias': (256,),
+              'lstm.weight_ih': (1024, 256), 'lstm.bias_ih': (1024,),
+              'lstm.bias_hh': (1024,), 'actor_linear.weight': (OBSERVATION_SIZE, 256),
+              'actor_linear.bias': (OBSERVATION_SIZE,)}
+    write_weights(path, {name: rng.normal(0, 0.05, shape)
+                         for name, shape in shapes.items()})
+
+
+def agent_startup(code):
+    """Wall-clock seconds and peak RSS in MB of a fresh process running code"""
+    script = code + (
+        "\nimport resource"
+        "\nprint(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', script], check=True,
+                            stdout=subprocess.PIPE).stdout
+    elapsed = time.perf_counter() - start
+    return elapsed, int(output.split()[-1]) / 1024
+
+
+def worker_counts():
+    """Powers of two up to the core count, and the core count"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cores:
+        counts.append(counts[-1] * 2)
+    if cores > 1:
+        counts.append(cores)
+    return counts
+
+
+def play_arena(games, workers):
+    """Run the tournament, silencing the per pairing report"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        Arena(AGENTS, games, workers=workers)
+
+
+def comparison(games, seed, permute_hands, duplicate=True):
+    """Comparison of two of the agents over about `games` games"""
+    games_per_deal = len(Arena.rotations(duplicate, permute_hands))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Arena._compare_pairs(
+            [(AGENTS[0][1], AGENTS[1][1])], max(2, games // games_per_deal),
+            [seed], 1, Arena.rotations(duplicate, permute_hands))[0]
+
+
+def run(args):
+    """Run the benchmark"""
+    # pairings with different agents, each playing every game
+    played = args.games * len(AGENTS) * (len(AGENTS) - 1) // 2
+    for workers in worker_counts():
+        elapsed = timed(lambda: play_arena(args.games, workers), repeat=1)
+        report('Arena({} workers) games/sec'.format(workers),
+               played / elapsed, 'games/s')
+
+    for label, permute_hands, duplicate in [('fresh deals', False, False),
+                                            ('seat rotated', False, True),
+                                            ('seat and hand rotated', True, True)]:
+        result = comparison(args.games, args.seed, permute_hands, duplicate)
+        report('stderr, {} ({} games)'.format(label, result.games),
+               result.stderr * 100, '%')
+
+    for label, opponent in [('close', AGENTS[1][1]),
+                            ('clear', lambda seed: AgentFirst(seed))]:
+        results = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = timed(lambda: results.append(Arena.compare_agents_sequential(
+                AGENTS[0][1], opponent, SPRT(), args.games, args.seed)), repeat=1)
+        report('SPRT {} pairing games of {}'.format(label, args.games),
+               results[-1].games, 'games')
+        report('SPRT {} pairing wall-clock'.format(label), elapsed * 1000, 'ms')
+
+    with tempfile.TemporaryDirectory() as directory:
+        model_path = os.path.join(directory, 'model.npz')
+        save_model(model_path)
+        model = lambda seed: AgentA3CNumpy(model_path, seed)
+        games = max(1, args.games // 5)
+        for label, agents in [('created per game', None), ('reset per game', {})]:
+            elapsed = timed(lambda: Arena._play_games(
+                model, AGENTS[0][1], args.seed, args.seed + games,
+                agents=agents), repeat=1)
+            report('model agent {} games/sec'.format(label),
+                   games / elapsed, 'games/s')
+
+        # both sides batched, the opponent being the same model
+        games = max(1, args.games)
+        opponent = lambda seed: AgentA3CNumpy(model_path, seed)
+        for concurrent_games in CONCURRENT_GAMES:
+            elapsed = timed(lambda: Arena._play_games(
+                model, opponent, args.seed, args.seed + games,
+                agents={}, concurrent_games=concurrent_games), repeat=1)
+            report('model agents, {} concurrent games/sec'.format(concurrent_games),
+                   games / elapsed, 'games/s')
+
+        code = ("from loveletter.agents.a3c_numpy import AgentA3CNumpy\n"
+                "AgentA3CNumpy({!r})".format(model_path))
+        elapsed, rss = agent_startup(code)
+        report('NumPy A3C agent process start', elapsed * 1000, 'ms')
+        report('NumPy A3C agent process peak RSS', rss, 'MB')
+        if importlib.util.find_spec('torch') is not None:
+            elapsed, rss = agent_startup(
+                "import torch\nfrom loveletter.agents.a3c import AgentA3C")
+            report('torch A3C agent import start', elapsed * 1000, 'ms')
+            report('torch A3C agent import peak RSS', rss, 'MB')
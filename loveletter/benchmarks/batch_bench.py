@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the vectorized batch engine.
+
+Plays random games to completion and reports games per second for the
+scalar Game (one game at a time) and BatchGame at several batch sizes.
+"""
+import random
+
+import numpy as np
+
+from loveletter.agents.agent import Agent
+from loveletter.batch_game import BatchGame
+from loveletter.benchmarks import report, timed
+from loveletter.game import Game
+
+BATCH_SIZES = [64, 1024, 8192]
+
+
+def play_scalar(games, seed):
+    """Play random games one by one"""
+    rng = random.Random(seed)
+    for idx in range(games):
+        game = Game.new(4, seed + idx)
+        while game.active():
+            if not game.is_current_player_playing():
+                game = game.skip_eliminated_player()
+                continue
+            game = game._move(rng.choice(Agent.valid_actions(game)))
+    return games
+
+
+def play_batch(batch_size, games, seed):
+    """Play random games in a batch until `games` have finished"""
+    rng = np.random.RandomState(seed)
+    batch = BatchGame(batch_size, seed)
+    while batch.games_played() < games:
+        mask = batch.legal_mask()
+        keys = rng.uniform(size=mask.shape)
+        keys[~mask] = -1
+        batch.step(keys.argmax(axis=1))
+    return batch.games_played()
+
+
+def run(args):
+    """Run the benchmark"""
+    elapsed = timed(lambda: play_scalar(args.games, args.seed), repeat=1)
+    report('Game games/sec', args.games / elapsed, 'games/s')
+
+    for batch_size in BATCH_SIZES:
+        games = max(args.games, batch_size * 4)
+        played = []
+        elapsed = timed(lambda: played.append(
+            play_batch(batch_size, games, args.seed)), repeat=1)
+        report('BatchGame({}) games/sec'.format(batch_size),
+               played[-1] / elapsed, 'games/s')
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the action log encoding.
+
+Reports the latency of encoding the action log of every state of
+recorded random games: one action at a time as Game used to, from the
+precomputed row table, and incrementally with an ActionLogEncoder.
+Also reports the latency of the full environment observation, built by
+concatenation or written into a reused float32 buffer, and for each
+observation format its size, encoding latency and the throughput of
+unpacking a batch of the compact formats back to float32.
+"""
+import numpy as np
+
+from loveletter.benchmarks import record_games, report, timed
+from loveletter.encoding import (OBSERVATION_FORMATS, STATE_SIZE, ActionLogEncoder,
+                                 observation_dtype, pack_observations,
+                                 unpack_observations)
+from loveletter.game import Game
+
+
+def observations(games):
+    """Games at every point where a player has to act"""
+    points = []
+    for seed, actions in games:
+        game = Game.new(4, seed)
+        for action in actions:
+            if game.is_current_player_playing():
+                points.append(game)
+            game = game._move(action)
+    return points
+
+
+def action_to_np(game, action, observing_player):
+    """One action encoded with fresh arrays per field"""
+    player = np.zeros(4)
+    player[game.relative_player_idx(action.player, observing_player)] = 1
+    played_card = np.zeros(8)
+    played_card[action.discard - 1] = 1
+    target = np.zeros(4)
+    target[game.relative_player_idx(action.player_target, observing_player)] = 1
+    guessed_card = np.zeros(8)
+    if action.guess > 0:
+        guessed_card[action.guess - 1] = 1
+    force_discard = np.zeros(32)
+    if action.force_discarded > 0:
+        i = game.relative_player_idx(action.force_discarder, observing_player)
+        force_discard[i * 8 + action.force_discarded - 1] = 1
+    revealed_card = np.zeros(32)
+    if action.revealed_card > 0:
+        i = game.relative_player_idx(action.player_target, observing_player)
+        revealed_card[i * 8 + action.revealed_card - 1] = 1
+    return np.concatenate([player, played_card, target, guessed_card,
+                           force_discard, revealed_card])
+
+
+def per_action(points):
+    """Encode each logged action with fresh arrays, then pad"""
+    for game in points:
+        observer = game.player_turn()
+        log = list(reversed([action_to_np(game, action, observer)
+                             for action in game._action_log]))
+        if len(log) == 0:
+            np.zeros(15 * 88)
+        else:
+            np.pad(np.array(log), ((0, 15 - len(log)), (0, 0)),
+                   'constant').flatten()
+
+
+def table(points):
+    """Encode from the row table"""
+    for game in points:
+        game.state_action_log()
+
+
+def incremental(points):
+    """Encode new actions only, states in order of play"""
+    encoder = ActionLogEncoder()
+    for game in points:
+        game.state_action_log(encoder=encoder)
+
+
+def concatenated(points):
+    """Observation as mask and state concatenated"""
+    for game in points:
+        np.concatenate([game.legal_actions().array, game.state()])
+
+
+def written(points):
+    """Observation written into one reused buffer"""
+    encoder = ActionLogEncoder()
+    out = np.zeros(52 + STATE_SIZE, dtype=np.float32)
+    for game in points:
+        game.observation(out=out, encoder=encoder)
+
+
+def formatted(points, observation_format):
+    """Observations of a format, written into one reused buffer"""
+    encoder = ActionLogEncoder()
+    out = np.zeros(52 + STATE_SIZE, dtype=np.float32
+                   if observation_format == 'float32' else np.uint8)
+    encoded = []
+    for game in points:
+        observation = game.observation(out=out, encoder=encoder)
+        if observation_format == 'packed':
+            observation = pack_observations(observation)
+        encoded.append(observation)
+    return encoded
+
+
+def run(args):
+    """Run the benchmark"""
+    points = observations(record_games(args.games, args.seed))
+    for name, encode in [('per action', per_action),
+                         ('row table', table),
+                         ('incremental', incremental)]:
+        elapsed = timed(lambda: encode(points))
+        report('{} latency'.format(name), elapsed / len(points) * 1e6,
+               'us/obs')
+
+    for name, observe in [('concatenated observation', concatenated),
+                          ('written observation', written)]:
+        elapsed = timed(lambda: observe(points))
+        report('{} latency'.format(name), elapsed / len(points) * 1e6,
+               'us/obs')
+
+    for observation_format in OBSERVATION_FORMATS:
+        batch = np.array(formatted(points, observation_format),
+                         dtype=observation_dtype(observation_format))
+        report('{} observation size'.format(observation_format),
+               batch[0].nbytes, 'bytes')
+        elapsed = timed(lambda: formatted(points, observation_format))
+        report('{} observation latency'.format(observation_format),
+               elapsed / len(points) * 1e6, 'us/obs')
+        if observation_format != 'float32':
+            elapsed = timed(lambda: unpack_observations(batch, observation_format))
+            report('{} unpack to float32'.format(observation_format),
+                   len(points) / elapsed, 'obs/s')
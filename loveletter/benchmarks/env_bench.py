@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the training environments.
+
+Steps environments with random legal learner actions against random
+opponents and reports environment steps per second for LoveLetterEnv
+(one Game per environment) and LoveLetterVecEnv at several numbers of
+environments, then for LoveLetterEnv in 4 to 16 subprocesses with
+results piped by SubprocVecEnv vs shared by SharedMemoryVecEnv. The
+self-play LoveLetterMultiAgentEnv is reported in learner transitions
+per second, every move of its games being one. Environments are
+reported unavailable without gym or stable_baselines. Finally compares
+the deals of resets: Game.new from a seed drawn per game vs a DealPool.
+"""
+import numpy as np
+
+from loveletter.actions import action_count
+from loveletter.benchmarks import report, timed
+from loveletter.deal_pool import DealPool
+from loveletter.game import Game
+from loveletter.multi_agent_env import LoveLetterMultiAgentEnv
+from loveletter.vec_env import LoveLetterVecEnv, SharedMemoryVecEnv
+
+NUM_ENVS = [1, 16, 256]
+WORKERS = [4, 8, 16]
+STEPS_PER_GAME = 10
+
+
+def random_actions(rng, observations):
+    """Random legal action of each observation"""
+    keys = rng.uniform(size=(len(observations), action_count(4)))
+    keys[observations[:, :action_count(4)] == 0] = -1
+    return keys.argmax(axis=1)
+
+
+def step_env(steps, seed):
+    """Step a single LoveLetterEnv, resetting finished games"""
+    from loveletter.env import LoveLetterEnv
+
+    rng = np.random.RandomState(seed)
+    env = LoveLetterEnv(None, seed)
+    observation = env.reset()
+    for _ in range(steps):
+        observation, _, done, _ = env.step(
+            int(random_actions(rng, observation[None])[0]))
+        if done:
+            observation = env.reset()
+    return steps
+
+
+def step_multi_agent(steps, seed):
+    """Play self-play games until `steps` transitions are taken"""
+    rng = np.random.RandomState(seed)
+    env = LoveLetterMultiAgentEnv(seed)
+    taken = 0
+    while taken < steps:
+        env.reset()
+        for _ in env.agent_iter():
+            observation, _, done, _ = env.last()
+            if done:
+                env.step(None)
+            else:
+                env.step(int(random_actions(rng, observation[None])[0]))
+                taken += 1
+    return taken
+
+
+def deal_seeded(games, seed):
+    """Deal games as LoveLetterEnv.reset, from a seed per game"""
+    rng = np.random.RandomState(seed)
+    for _ in range(games):
+        Game.new(4, rng.randint(1, 5000001))
+
+
+def deal_pooled(games, seed, background):
+    """Deal games from a DealPool"""
+    pool = DealPool(seed, background=background)
+    for _ in range(games):
+        pool.game()
+    pool.close()
+
+
+def step_vec_env(num_envs, steps, seed):
+    """Step a LoveLetterVecEnv until `steps` environment steps are taken"""
+    rng = np.random.RandomState(seed)
+    env = LoveLetterVecEnv(num_envs, seed)
+    observations = env.reset()
+    for _ in range(max(1, steps // num_envs)):
+        observations, _, _, _ = env.step(random_actions(rng, observations))
+    return max(1, steps // num_envs) * num_envs
+
+
+def step_subprocesses(vec_env_class, workers, steps, seed):
+    """Step LoveLetterEnvs in subprocesses until `steps` steps are taken"""
+    from loveletter.env import LoveLetterEnv
+
+    rng = np.random.RandomState(seed)
+    env = vec_env_class([lambda env_seed=env_seed: LoveLetterEnv(None, env_seed)
+                         for env_seed in range(seed, seed + workers)])
+    try:
+        observations = env.reset()
+        for _ in range(max(1, steps // workers)):
+            observations, _, _, _ = env.step(random_actions(rng, observations))
+    finally:
+        env.close()
+    return max(1, steps // workers) * workers
+
+
+def subproc_vec_env():
+    """stable_baselines SubprocVecEnv"""
+    from stable_baselines.common.vec_env import SubprocVecEnv
+    return SubprocVecEnv
+
+
+def report_steps(label, func):
+    """Report the steps per second of func, which returns the steps taken"""
+    try:
+        taken = []
+        elapsed = timed(lambda: taken.append(func()), repeat=1)
+        report(label, taken[-1] / elapsed, 'steps/s')
+    except ImportError:
+        print("  {: <44} {: >14} {}".format(label, 'unavailable', ''))
+
+
+def run(args):
+    """Run the benchmark"""
+    steps = args.games * STEPS_PER_GAME
+    report_steps('LoveLetterEnv steps/sec',
+                 lambda: step_env(steps, args.seed))
+
+    report_steps('LoveLetterMultiAgentEnv transitions/sec',
+                 lambda: step_multi_agent(steps, args.seed))
+
+    for num_envs in NUM_ENVS:
+        report_steps('LoveLetterVecEnv({}) steps/sec'.format(num_envs),
+                     lambda: step_vec_env(num_envs, steps, args.seed))
+
+    for workers in WORKERS:
+        report_steps('SubprocVecEnv({}) steps/sec'.format(workers),
+                     lambda: step_subprocesses(subproc_vec_env(), workers,
+                                               steps, args.seed))
+        report_steps('SharedMemoryVecEnv({}) steps/sec'.format(workers),
+                     lambda: step_subprocesses(SharedMemoryVecEnv, workers,
+                                               steps, args.seed))
+
+    games = args.games * STEPS_PER_GAME
+    for label, deal in [
+            ('Game.new', lambda: deal_seeded(games, args.seed)),
+            ('DealPool', lambda: deal_pooled(games, args.seed, False)),
+            ('DealPool background', lambda: deal_pooled(games, args.seed, True))]:
+        elapsed = timed(deal)
+        report('{} deals/sec'.format(label), games / elapsed, 'games/s')
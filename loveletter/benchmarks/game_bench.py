@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the scalar game engines.
+
+Replays recorded random games on each engine and reports moves per
+second plus the memory held by a single state, both in total and the
+part that is newly allocated by a move (not shared with its parent).
+"""
+
+from loveletter.benchmarks import deep_sizeof, record_games, report, timed
+from loveletter.compact_game import CompactGame
+from loveletter.game import Game
+
+ENGINES = [
+    ('Game', Game.new),
+    ('CompactGame', CompactGame.new),
+]
+
+
+def replay(new_game, games):
+    """Replay all recorded games, returns number of moves made"""
+    moves = 0
+    for seed, actions in games:
+        game = new_game(4, seed)
+        for action in actions:
+            game = game._move(action)
+        moves += len(actions)
+    return moves
+
+
+def state_bytes(new_game, games):
+    """Average (total, new per move) bytes of the states in the games"""
+    total = 0
+    fresh = 0
+    states = 0
+    for seed, actions in games:
+        game = new_game(4, seed)
+        for action in actions:
+            game_next = game._move(action)
+            parent = set()
+            deep_sizeof(game, parent)
+            fresh += deep_sizeof(game_next, parent)
+            total += deep_sizeof(game_next)
+            states += 1
+            game = game_next
+    return total / states, fresh / states
+
+
+def run(args):
+    """Run the benchmark"""
+    games = record_games(args.games, args.seed)
+    moves = sum([len(actions) for _, actions in games])
+
+    for name, new_game in ENGINES:
+        elapsed = timed(lambda: replay(new_game, games))
+        report('{} moves/sec'.format(name), moves / elapsed, 'moves/s')
+
+    sample = games[:max(1, args.games // 10)]
+    for name, new_game in ENGINES:
+        total, fresh = state_bytes(new_game, sample)
+        report('{} bytes per state'.format(name), total, 'B')
+        report('{} bytes allocated per move'.format(name), fresh, 'B')
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of import times.
+
+Imports each module in a fresh interpreter and reports the time it adds
+over starting Python, for the engine, the arena and every registered
+agent. Agents whose dependencies are not installed are reported as such.
+"""
+import subprocess
+import sys
+import time
+
+from loveletter.agents import registry
+from loveletter.benchmarks import report
+
+MODULES = ['loveletter.game', 'loveletter.arena', 'loveletter.agents.registry',
+           'loveletter.env', 'loveletter.vec_env']
+REPEAT = 3
+
+
+def start_time(code):
+    """Best wall-clock seconds of a fresh interpreter running code, None on error"""
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', code],
+                                   stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        if completed.returncode != 0:
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report_import(label, code, baseline):
+    """Report the time code adds to an empty interpreter"""
+    elapsed = start_time(code)
+    if elapsed is None:
+        print("  {: <44} {: >14} {}".format(label, 'unavailable', ''))
+    else:
+        report(label, (elapsed - baseline) * 1000, 'ms')
+
+
+def run(args):
+    """Run the benchmark"""
+    baseline = start_time('pass')
+    report('python start', baseline * 1000, 'ms')
+    for module in MODULES:
+        report_import('import {}'.format(module), 'import {}'.format(module),
+                      baseline)
+    for name in registry.names():
+        code = "from loveletter.agents import registry\nregistry.load({!r})".format(name)
+        report_import('load agent {}'.format(name), code, baseline)
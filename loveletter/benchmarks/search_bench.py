@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of tree search over game states.
+
+Runs a fixed depth, full width search from the opening of several
+deals. The immutable engines create a game per node, SearchGame walks
+the same tree with apply/undo on a single object. The transposition
+search visits each distinct Game position once, keyed by Zobrist hash.
+"""
+
+from loveletter.benchmarks import report, timed
+from loveletter.card import Card
+from loveletter.compact_game import CompactGame
+from loveletter.game import Game
+from loveletter.player import PlayerAction, PlayerActionTools
+from loveletter.search_game import SearchGame
+from loveletter.zobrist import TranspositionTable
+
+DEPTH = 4
+
+
+def candidate_actions(game):
+    """Actions worth testing for validity in the current position"""
+    if not game.is_current_player_playing():
+        return [PlayerActionTools.blank()]
+    turn = game.player_turn()
+    cards = set([int(game.player().hand_card), int(game.draw_card())])
+    actions = []
+    for card in cards:
+        guesses = range(2, 9) if card == Card.guard else [0]
+        for target in range(len(game.players())):
+            for guess in guesses:
+                actions.append(PlayerAction(card, target, guess, 0, 0, turn, 0))
+    return [action for action in actions if game.is_action_valid(action)]
+
+
+def search_immutable(game, depth):
+    """Count nodes of the tree by creating a game per move"""
+    if depth == 0 or game.over():
+        return 1
+    nodes = 1
+    for action in candidate_actions(game):
+        nodes += search_immutable(game._move(action), depth - 1)
+    return nodes
+
+
+def search_in_place(game, depth):
+    """Count nodes of the tree with apply/undo"""
+    if depth == 0 or game.over():
+        return 1
+    nodes = 1
+    for action in candidate_actions(game):
+        game.apply(action)
+        nodes += search_in_place(game, depth - 1)
+        game.undo()
+    return nodes
+
+
+def search_transposed(game, depth, table):
+    """Count nodes of the tree, searching repeated positions once"""
+    if depth == 0 or game.over():
+        return 1
+    key = game.zobrist_hash()
+    if table.get(key) is not None:
+        return 1
+    table.put(key, True, depth)
+    nodes = 1
+    for action in candidate_actions(game):
+        nodes += search_transposed(game._move(action), depth - 1, table)
+    return nodes
+
+
+def run(args):
+    """Run the benchmark"""
+    seeds = range(args.seed, args.seed + max(1, args.games // 50))
+    searches = [
+        ('Game', lambda: sum([search_immutable(Game.new(4, seed), DEPTH)
+                              for seed in seeds])),
+        ('CompactGame', lambda: sum([search_immutable(CompactGame.new(4, seed), DEPTH)
+                                     for seed in seeds])),
+        ('SearchGame apply/undo', lambda: sum([search_in_place(SearchGame.new(4, seed), DEPTH)
+                                               for seed in seeds])),
+    ]
+    for name, search in searches:
+        nodes = search()
+        elapsed = timed(search)
+        report('{} nodes/sec (depth {})'.format(name, DEPTH),
+               nodes / elapsed, 'nodes/s')
+
+    table = TranspositionTable()
+
+    def transposed():
+        table.clear()
+        return sum([search_transposed(Game.new(4, seed), DEPTH, table)
+                    for seed in seeds])
+    nodes = transposed()
+    elapsed = timed(transposed)
+    report('Game transposition nodes/sec (depth {})'.format(DEPTH),
+           nodes / elapsed, 'nodes/s')
+    report('Game transposition table hit rate', table.hit_rate() * 100, '%')
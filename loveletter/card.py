@@ -4,8 +4,21 @@ Love Letter Card tools
 Functions and constants to facilitate working with cards, which are represented as integers.
 """
 
+import threading
+
 import numpy as np
 
+# random state reseeded for every deck, one per thread
+_local = threading.local()
+
+
+def _seeded(seed):
+    """Random state of the thread, reseeded"""
+    if not hasattr(_local, 'rng'):
+        _local.rng = np.random.RandomState()
+    _local.rng.seed(seed)
+    return _local.rng
+
 
 class Card():
     """Static Card class"""
@@ -48,6 +61,10 @@ class Card():
     only_self = [4, 7, 8]
     only_other = [1, 2, 3, 6]
 
+    # every card of a deck, in card order
+    ordered_deck = np.repeat(np.arange(1, 9), counts)
+    ordered_deck.flags.writeable = False
+
     @staticmethod
     def render_card_number(card):
         """Render a card name with padded length"""
@@ -59,12 +76,36 @@ class Card():
 
     @staticmethod
     def shuffle_deck(seed=451):
-        """A numpy array of shuffled cards"""
-        deck = []
-        for card_number, card_count in enumerate(Card.counts):
-            card_id = card_number + 1
-            deck = deck + [card_id] * card_count
-        deck_np = np.array(deck)
-        np.random.seed(seed=seed)
-        np.random.shuffle(deck_np)
-        return deck_np
+        """
+        A numpy array of shuffled cards
+
+        Does not touch the global numpy random state, the same seed
+        always gives the same deck.
+        """
+        deck = Card.ordered_deck.copy()
+        _seeded(seed).shuffle(deck)
+        return deck
+
+    @staticmethod
+    def shuffle_decks(seeds):
+        """
+        A numpy array of shuffled decks, one row per seed
+
+        Row i is the same deck as `shuffle_deck(seeds[i])`.
+        """
+        decks = np.tile(Card.ordered_deck, (len(seeds), 1))
+        for deck, seed in zip(decks, seeds):
+            _seeded(int(seed)).shuffle(deck)
+        return decks
+
+    @staticmethod
+    def random_decks(count, rng=None):
+        """
+        A numpy array of count shuffled decks drawn from rng
+
+        rng is a numpy Generator or RandomState, decks depend on its
+        state rather than on a seed per deck.
+        """
+        rng = np.random.RandomState() if rng is None else rng
+        keys = rng.uniform(size=(count, len(Card.ordered_deck)))
+        return Card.ordered_deck[keys.argsort(axis=1)]
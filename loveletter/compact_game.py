@@ -0,0 +1,474 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Compact Game object
+
+Alternative state representation for the Love Letter Game. Instead of
+a list of Player tuples, each holding its own copy of an 8 slot action
+list, the state is a handful of small containers:
+
+  hands    - int[player_count] card currently held by each player
+  counts   - int[player_count] number of used discard slots per player
+  slots    - tuple per player of its used discard slots, at most 8
+  defended - int bitmask, bit i set if player i is protected by a handmaid
+  alive    - int bitmask, bit i set if player i still holds a card
+  cursor   - int index of the next card to draw from the shared deck
+
+A move copies three short lists and builds a new slots tuple only for
+the players whose discards change, one entry longer; the other tuples
+are shared with the previous state. The deck is never sliced and
+discard slots reference shared (interned) action records.
+"""
+import numpy as np
+
+from loveletter.action_log import ActionLog
+from loveletter.actions import legal_actions
+from loveletter.card import Card
+from loveletter.game import Game
+from loveletter.player import Player, PlayerAction, PlayerActionTools
+
+SLOTS_PER_PLAYER = 8
+
+# Interned records for forced discards, indexed by card
+_SIMPLE = [PlayerActionTools.simple(card) for card in range(len(Card.names))]
+_BLANK = _SIMPLE[Card.noCard]
+
+
+class CompactGame():
+    """A Love Letter Game backed by flat integer state"""
+
+    __slots__ = ('_deck', '_cursor', '_hands', '_counts', '_slots',
+                 '_defended', '_alive', '_turn_index', '_action_log',
+                 '_game_active')
+
+    def __init__(self, deck, cursor, hands, counts, slots, defended,
+                 turn_index, action_log=None):
+        self._deck = deck
+        self._cursor = cursor
+        self._hands = hands
+        self._counts = counts
+        self._slots = slots
+        self._defended = defended
+        self._turn_index = turn_index
+        self._action_log = ActionLog.of(action_log or ())
+
+        alive = 0
+        for idx, hand_card in enumerate(hands):
+            if hand_card != Card.noCard:
+                alive |= 1 << idx
+        self._alive = alive
+
+        self._game_active = (alive & (alive - 1)) != 0 and \
+            self.cards_left() > 0
+
+    def players(self):
+        """List of current players."""
+        return [self._player_at(idx) for idx in range(len(self._hands))]
+
+    def _player_at(self, idx):
+        row = self._slots[idx]
+        count = self._counts[idx]
+        last_discard = row[count - 1].discard if count > 0 else Card.noCard
+        return Player(self._hands[idx],
+                      list(row) + [_BLANK] * (SLOTS_PER_PLAYER - count),
+                      count, last_discard, self.is_defended(idx))
+
+    def deck(self):
+        """
+        List of current cards.
+
+        NOTE: The LAST card [-1] is always held out
+        """
+        return np.array(self._deck[self._cursor:])
+
+    def draw_card(self):
+        """
+        Card currently available to the next player.
+
+        Only valid if the game is not over (otherwise No Card)
+        """
+        return self._deck[self._cursor] if self.cards_left() > 0 \
+            else Card.noCard
+
+    def held_card(self):
+        """
+        Card withheld from the game
+        """
+        return self._deck[-1]
+
+    def turn_index(self):
+        """
+        Overall turn index of the game.
+
+        This points to the actual action number
+        """
+        return self._turn_index
+
+    def round(self):
+        """Current round number."""
+        return self._turn_index // len(self._hands)
+
+    def player_turn(self):
+        """Player number of current player."""
+        return self._turn_index % len(self._hands)
+
+    def is_winner(self, idx):
+        """True iff that player has won the game"""
+        if self._game_active:
+            return False
+        hand_card = self._hands[idx]
+        if hand_card == Card.noCard:
+            return False
+        return max(self._hands) <= hand_card
+
+    def winner(self):
+        """Return the index of the winning player. -1 if none"""
+        for idx in range(len(self._hands)):
+            if self.is_winner(idx):
+                return idx
+        return -1
+
+    def player(self):
+        """Returns the current player"""
+        return self._player_at(self.player_turn())
+
+    def opponents(self):
+        """Returns the opposing players"""
+        return [self._player_at(idx) for idx in self.opponent_turn()]
+
+    def opponent_turn(self):
+        """Returns the opposing players indices"""
+        turn = self.player_turn()
+        return [idx for idx in range(len(self._hands))
+                if idx != turn and self._alive & (1 << idx)]
+
+    def cards_left(self):
+        """
+        Number of cards left in deck to distribute
+
+        Does not include the held back card
+        """
+        return len(self._deck) - self._cursor - 1
+
+    def active(self):
+        """Return True if the game is still playing"""
+        return self._game_active
+
+    def over(self):
+        """Return True if the game is over"""
+        return not self._game_active
+
+    def is_current_player_playing(self):
+        """True if the current player has not been eliminated"""
+        return self._hands[self.player_turn()] != Card.noCard
+
+    def skip_eliminated_player(self, throw=False):
+        """If the current player is eliminated, skip to next"""
+        if self.is_current_player_playing():
+            return self
+        return self._move(PlayerActionTools.blank(), throw)
+
+    def action_log(self):
+        """List of all actions taken, oldest first"""
+        return list(self._action_log)
+
+    def is_defended(self, idx):
+        """True iff the player is protected by a handmaid"""
+        return (self._defended >> idx) & 1 == 1
+
+    def is_playing(self, idx):
+        """True iff the player still holds a card"""
+        return (self._alive >> idx) & 1 == 1
+
+    def alive_mask(self):
+        """Bitmask of players still playing, bit i for player i"""
+        return self._alive
+
+    def defended_mask(self):
+        """Bitmask of players protected by a handmaid, bit i for player i"""
+        return self._defended
+
+    def legal_actions(self):
+        """LegalActions of the current player (see loveletter.actions)"""
+        return legal_actions(self._hands[self.player_turn()],
+                             self._deck[self._cursor], self.player_turn(),
+                             self._alive, self._defended, len(self._hands))
+
+    def _reward(self, game, action):
+        """
+        Record current reward.
+        """
+        if game.active():
+            if self.is_action_valid(action):
+                return 0
+            else:
+                return -1
+        elif game.winner() == self.turn_index():
+            return 30
+        return -10
+
+    def move(self, action, throw=False):
+        """Current player makes an action.
+
+        Returns (NewGame and Reward)<CompactGame,int>
+        """
+        game = self._move(action)
+        return game, self._reward(game, action)
+
+    def _move(self, action, throw=False):
+        """Current player makes an action.
+
+        Returns the new CompactGame"""
+        if not self._game_active or not self.is_action_valid(action):
+            return self._invalid_input(throw)
+
+        # player is out, increment turn index
+        if action.discard == Card.noCard:
+            return CompactGame(self._deck, self._cursor, self._hands,
+                               self._counts, self._slots, self._defended,
+                               self._turn_index + 1, self._action_log)
+
+        turn = self.player_turn()
+        hand_card = self._hands[turn]
+        dealt_card = self._deck[self._cursor]
+        hand_card_new = dealt_card if action.discard == hand_card else hand_card
+
+        hands = self._hands[:]
+        counts = self._counts[:]
+        slots = self._slots[:]
+        defended = self._defended
+        cursor = self._cursor + 1
+        action_updated = action if action.player == turn else \
+            action._replace(player=turn)
+
+        if action.discard == Card.princess:
+            # both cards are discarded and the player is out
+            defended = self._push(counts, slots, defended, turn,
+                                  _SIMPLE[hand_card])
+            defended = self._push(counts, slots, defended, turn,
+                                  _SIMPLE[dealt_card])
+            hands[turn] = Card.noCard
+        elif action.discard == Card.priest:
+            revealed_card = Card.noCard if \
+                self.is_defended(action.player_target) \
+                else self._hands[action.player_target]
+            action_updated = action._replace(player=turn,
+                                             revealed_card=revealed_card)
+            defended = self._push(counts, slots, defended, turn,
+                                  action_updated)
+            hands[turn] = hand_card_new
+        else:
+            defended = self._push(counts, slots, defended, turn, action)
+            hands[turn] = hand_card_new
+
+            if action.discard == Card.baron:
+                action_updated, defended = self._move_baron(
+                    action, hands, counts, slots, defended, hand_card_new)
+            elif action.discard == Card.guard:
+                defended = self._move_guard(
+                    action, hands, counts, slots, defended)
+            elif action.discard == Card.prince:
+                action_updated, defended, cursor = self._move_prince(
+                    action, hands, counts, slots, defended, cursor)
+            elif action.discard == Card.king:
+                target = action.player_target
+                hands[turn], hands[target] = hands[target], hands[turn]
+
+        return CompactGame(self._deck, cursor, hands, counts, slots,
+                           defended, self._turn_index + 1,
+                           self._action_log.append(action_updated))
+
+    def _move_guard(self, action, hands, counts, slots, defended):
+        """
+        Apply a guard action to the new state
+
+        Player makes a guess to try and eliminate the opponent
+        """
+        target = action.player_target
+        if self._hands[target] == action.guess and \
+                not self.is_defended(target):
+            # then target player is out
+            defended = self._force_discard(counts, slots, defended, hands,
+                                           target)
+        return defended
+
+    def _move_baron(self, action, hands, counts, slots, defended,
+                    hand_card_new):
+        """
+        Apply a baron action to the new state
+
+        Player and target compare hand cards. Player with lower hand
+        card is eliminated
+        """
+        turn = self.player_turn()
+        target = action.player_target
+        card_target = self._hands[target]
+        if hand_card_new > card_target:
+            if not self.is_defended(target):
+                # target is eliminated
+                defended = self._force_discard(counts, slots, defended,
+                                               hands, target)
+                action_updated = action._replace(player=turn,
+                                                 force_discarded=card_target,
+                                                 force_discarder=target)
+            else:
+                action_updated = action._replace(player=turn)
+
+        elif hand_card_new == card_target:
+            # Tie, nobody wins
+            action_updated = action._replace(player=turn,
+                                             revealed_card=card_target)
+
+        else:
+            # player is eliminated, the baron is not recorded in the slots
+            defended = self._force_discard(counts, slots, defended, hands,
+                                           turn)
+            defended = self._push(counts, slots, defended, turn,
+                                  _SIMPLE[hand_card_new])
+            hands[turn] = Card.noCard
+            action_updated = action._replace(player=turn,
+                                             force_discarded=hand_card_new,
+                                             force_discarder=action.player)
+
+        return action_updated, defended
+
+    def _move_prince(self, action, hands, counts, slots, defended, cursor):
+        """Apply a prince action to the new state"""
+        target = action.player_target
+        card_target = hands[target]
+        action_updated = action._replace(player=self.player_turn(),
+                                         force_discarded=card_target,
+                                         force_discarder=target)
+        # if there are no more cards, this has no effect
+        if len(self._deck) - cursor - 1 < 1:
+            return action_updated, defended, cursor
+
+        defended = self._push(counts, slots, defended, target,
+                              _SIMPLE[card_target])
+        if card_target == Card.princess:
+            hands[target] = Card.noCard
+        else:
+            hands[target] = self._deck[cursor]
+            cursor += 1
+
+        return action_updated, defended, cursor
+
+    def _force_discard(self, counts, slots, defended, hands, idx):
+        """
+        Force a player to discard the card held before this move.
+
+        The slots are rewritten from the previous state, mirroring how
+        Game rebuilds the target from the pre-move player record.
+        """
+        slots[idx] = self._slots[idx]
+        counts[idx] = self._counts[idx]
+        hands[idx] = Card.noCard
+        return self._push(counts, slots, defended, idx,
+                          _SIMPLE[self._hands[idx]])
+
+    @staticmethod
+    def _push(counts, slots, defended, idx, action):
+        """Record a discard for the player, returns the new defended mask"""
+        count = counts[idx]
+        if count >= SLOTS_PER_PLAYER:
+            raise Exception("Insufficient space in actions")
+        slots[idx] = slots[idx][:count] + (action,)
+        counts[idx] = count + 1
+        if action.discard == Card.handmaid:
+            return defended | (1 << idx)
+        return defended & ~(1 << idx)
+
+    def is_action_valid(self, action):
+        """Tests if an action is valid given the current game state"""
+        turn = self.player_turn()
+        hand_card = self._hands[turn]
+
+        # if player is out, only valid action is no action
+        if hand_card == Card.noCard:
+            return PlayerActionTools.is_blank(action)
+
+        target = action.player_target
+        target_card = self._hands[target]
+        dealt_card = self._deck[self._cursor]
+
+        # cannot discard a card not in the hand
+        if action.discard != hand_card and action.discard != dealt_card:
+            return False
+
+        hand_card_new = dealt_card if action.discard == hand_card \
+            else hand_card
+
+        # countess must be discarded if the other card is king/prince
+        if hand_card_new == Card.countess and \
+                (action.discard == Card.prince or action.discard == Card.king):
+            return False
+
+        # cannot target an invalid player
+        if target_card == Card.noCard:
+            return False
+
+        # cannot mis-target a card
+        if turn == target and action.discard in Card.only_other:
+            # Check if self is the only valid target due to everybody else
+            # protected (or dead)
+            others = self._alive & ~self._defended & ~(1 << turn)
+            return others == 0
+
+        if turn != target and action.discard in Card.only_self:
+            return False
+
+        # Check if target is defender (and not the current player)
+        if turn != target and self.is_defended(target):
+            return False
+
+        # Cannot guess guard or no card
+        if action.discard == Card.guard and (
+                action.guess == Card.guard or action.guess == Card.noCard):
+            return False
+
+        return True
+
+    def _invalid_input(self, throw):
+        """Throw if true, otherwise return current game"""
+        if throw:
+            raise Exception("Invalid Move")
+        return self
+
+    def to_game(self):
+        """Convert into an equivalent Game"""
+        return Game(self.deck(), self.players(), self._turn_index,
+                    self._action_log)
+
+    def to_str(self):
+        """Returns a string[] representation of the game"""
+        return self.to_game().to_str()
+
+    @staticmethod
+    def from_game(game):
+        """Create a CompactGame from an existing Game"""
+        players = game.players()
+        hands = [int(player.hand_card) for player in players]
+        counts = []
+        slots = []
+        defended = 0
+        for idx, player in enumerate(players):
+            actions = list(player.actions)
+            count = sum([1 for action in actions
+                         if action.discard != Card.noCard])
+            counts.append(count)
+            slots.append(tuple(actions[:count]))
+            if count > 0 and actions[count - 1].discard == Card.handmaid:
+                defended |= 1 << idx
+
+        deck = tuple(int(card) for card in game.deck())
+        return CompactGame(deck, 0, hands, counts, slots, defended,
+                           game.turn_index(), game._action_log)
+
+    @staticmethod
+    def new(player_count=4, seed=451):
+        """Create a brand new game"""
+        deck = tuple(int(card) for card in Card.shuffle_deck(seed))
+
+        hands = list(deck[:player_count])
+        slots = [()] * player_count
+        return CompactGame(deck, player_count, hands, [0] * player_count,
+                           slots, 0, 0)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter deal pool
+Shuffled decks generated in blocks, handed out one game at a time.
+"""
+import queue
+import threading
+
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.game import Game
+
+
+class DealPool():
+    """
+    Decks drawn with `Card.random_decks` in blocks of block_size from a
+    Generator seeded with seed.
+
+    The same seed always deals the same sequence of games, whatever the
+    block size and with or without the background thread, which keeps
+    the next block ready while the current one is handed out.
+    """
+
+    def __init__(self, seed=451, block_size=1024, background=True):
+        self._rng = np.random.default_rng(seed)
+        self._block_size = block_size
+        self._block = np.zeros((0, len(Card.ordered_deck)), dtype=np.int64)
+        self._next = 0
+        self._closed = False
+        self._blocks = None
+        if background:
+            self._blocks = queue.Queue(maxsize=1)
+            self._stop = threading.Event()
+            # the thread holds no reference to the pool, so a pool that is
+            # never closed is still collected and its finalizer stops it
+            self._thread = threading.Thread(
+                target=_refill, args=(self._rng, block_size, self._blocks,
+                                      self._stop), daemon=True)
+            self._thread.start()
+
+    def __del__(self):
+        if self._blocks is not None:
+            self._stop.set()
+
+    def deck(self):
+        """Next shuffled deck, read only"""
+        if self._closed:
+            raise Exception("DealPool is closed")
+        if self._next == len(self._block):
+            self._block = self._blocks.get() if self._blocks is not None \
+                else _generate(self._rng, self._block_size)
+            self._next = 0
+        deck = self._block[self._next]
+        self._next += 1
+        return deck
+
+    def game(self, player_count=4):
+        """Next brand new game"""
+        return Game.from_deck(self.deck(), player_count)
+
+    def close(self):
+        """Stop the background thread, no more blocks are dealt"""
+        self._closed = True
+        if self._blocks is None:
+            return
+        self._stop.set()
+        while self._thread.is_alive():
+            try:
+                self._blocks.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(0.01)
+
+
+def _generate(rng, block_size):
+    """Block of decks from the Generator"""
+    block = Card.random_decks(block_size, rng)
+    block.flags.writeable = False
+    return block
+
+
+def _refill(rng, block_size, blocks, stop):
+    """Keep the next block queued until stopped"""
+    while not stop.is_set():
+        block = _generate(rng, block_size)
+        while not stop.is_set():
+            try:
+                blocks.put(block, timeout=0.1)
+                break
+            except queue.Full:
+                pass
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter State encoding
+Functions and tables to encode game state as numpy arrays.
+
+Each logged action is encoded relative to an observing player as a row
+of 88 one hot floats:
+
+  player          4 - relative index of the player that acted
+  played card     8 - card discarded
+  target          4 - relative index of the targeted player
+  guessed card    8 - guard guess, if any
+  force discard  32 - relative player x card forced out by the action
+  revealed card  32 - relative target x card revealed by the action
+
+The action log is the 15 most recent rows, newest first, zero padded.
+It follows the 16 hand and 8 consumed card values in the state.
+
+Observations come in three formats:
+
+  float32  consumed cards as the fraction of each card seen
+  uint8    consumed cards as counts, every other value 0 or 1
+  packed   np.packbits of the uint8 values, the counts in unary,
+           (OBSERVATION_SIZE - 8 + 16) bits in PACKED_SIZE bytes
+
+`unpack_observations` turns the compact formats back into float32.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from loveletter.action_log import ActionLog
+from loveletter.actions import action_count
+from loveletter.card import Card
+
+LOG_LENGTH = 15
+ROW_LENGTH = 88
+HAND_SIZE = 16
+CONSUMED_SIZE = 8
+STATE_SIZE = HAND_SIZE + CONSUMED_SIZE + LOG_LENGTH * ROW_LENGTH
+# legal action mask then state, as in Game.observation
+OBSERVATION_SIZE = action_count(4) + STATE_SIZE
+CONSUMED_START = action_count(4) + HAND_SIZE
+
+OBSERVATION_FORMATS = ('float32', 'uint8', 'packed')
+# consumed counts in unary, one bit per card of the deck
+PACKED_BITS = OBSERVATION_SIZE - CONSUMED_SIZE + sum(Card.counts)
+PACKED_SIZE = (PACKED_BITS + 7) // 8
+# card of each unary bit and the bit's place among the bits of its card
+_UNARY_CARDS = np.repeat(np.arange(CONSUMED_SIZE), Card.counts)
+_UNARY_STARTS = np.cumsum([0] + Card.counts[:-1])
+_UNARY_PLACES = np.arange(sum(Card.counts)) - _UNARY_STARTS[_UNARY_CARDS]
+
+
+def observation_size(observation_format):
+    """Number of values in an observation of a format"""
+    if observation_format not in OBSERVATION_FORMATS:
+        raise Exception("Unknown observation format {}, available are {}".format(
+            observation_format, ', '.join(OBSERVATION_FORMATS)))
+    return PACKED_SIZE if observation_format == 'packed' else OBSERVATION_SIZE
+
+
+def observation_dtype(observation_format):
+    """NumPy dtype of an observation of a format"""
+    observation_size(observation_format)
+    return np.float32 if observation_format == 'float32' else np.uint8
+
+
+def observation_high(observation_format):
+    """Largest value in an observation of a format"""
+    if observation_format == 'packed':
+        return 255
+    observation_size(observation_format)
+    return max(Card.counts) if observation_format == 'uint8' else 1
+
+
+def pack_observations(observations):
+    """Packed form of uint8 observations, along the last axis"""
+    consumed = observations[..., CONSUMED_START:CONSUMED_START + CONSUMED_SIZE]
+    unary = _UNARY_PLACES < consumed[..., _UNARY_CARDS]
+    bits = np.concatenate([observations[..., :CONSUMED_START],
+                           unary.astype(np.uint8),
+                           observations[..., CONSUMED_START + CONSUMED_SIZE:]],
+                          axis=-1)
+    return np.packbits(bits, axis=-1)
+
+
+def unpack_observations(observations, observation_format):
+    """
+    float32 observations, as Game.observation writes them, from
+    observations of any format; the layer in front of a model
+    """
+    if observation_format == 'float32':
+        return observations
+    if observation_format == 'packed':
+        bits = np.unpackbits(observations, axis=-1, count=PACKED_BITS)
+        counts = np.add.reduceat(
+            bits[..., CONSUMED_START:CONSUMED_START + sum(Card.counts)],
+            _UNARY_STARTS, axis=-1)
+        observations = np.concatenate(
+            [bits[..., :CONSUMED_START], counts,
+             bits[..., CONSUMED_START + sum(Card.counts):]], axis=-1)
+    elif observation_format != 'uint8':
+        observation_size(observation_format)
+
+    unpacked = observations.astype(np.float32)
+    unpacked[..., CONSUMED_START:CONSUMED_START + CONSUMED_SIZE] = \
+        observations[..., CONSUMED_START:CONSUMED_START + CONSUMED_SIZE] / \
+        np.array(Card.counts)
+    return unpacked
+
+
+@lru_cache(maxsize=None)
+def encode_action(action, observing_player, player_count=4):
+    """Read only float64[88] row encoding an action seen by the observer"""
+    def relative(player_idx):
+        return (int(player_idx) - observing_player) % player_count
+
+    row = np.zeros(ROW_LENGTH)
+    row[relative(action.player)] = 1
+    row[4 + (int(action.discard) - 1) % 8] = 1
+    row[12 + relative(action.player_target)] = 1
+    if action.guess > 0:
+        row[16 + int(action.guess) - 1] = 1
+    if action.force_discarded > 0:
+        row[24 + relative(action.force_discarder) * 8 +
+            int(action.force_discarded) - 1] = 1
+    if action.revealed_card > 0:
+        row[56 + relative(action.player_target) * 8 +
+            int(action.revealed_card) - 1] = 1
+    row.flags.writeable = False
+    return row
+
+
+def encode_action_log(actions, observing_player, player_count=4):
+    """float64[15 * 88] encoding of the action log, newest action first"""
+    log = np.zeros(LOG_LENGTH * ROW_LENGTH)
+    write_action_log(actions, observing_player, log, player_count)
+    return log
+
+
+def write_action_log(actions, observing_player, out, player_count=4):
+    """Write the action log encoding into a zeroed array of 15 * 88"""
+    start = 0
+    for action in reversed(actions):
+        out[start:start + ROW_LENGTH] = encode_action(
+            action, observing_player, player_count)
+        start += ROW_LENGTH
+
+
+class ActionLogEncoder():
+    """
+    Incrementally encodes the action log of a game as it is played.
+
+    Keeps a buffer per observing player holding the rows already
+    encoded. When the ActionLog passed in extends the one seen last
+    only the new actions are encoded, otherwise the buffer is rebuilt.
+
+    Rows are written bottom up into a buffer twice the log length, so
+    the newest-first, zero padded log is always one contiguous slice.
+    """
+
+    def __init__(self, player_count=4):
+        self._player_count = player_count
+        self._buffers = np.zeros((player_count, 2 * LOG_LENGTH, ROW_LENGTH))
+        self._logs = [ActionLog()] * player_count
+
+    def encode(self, actions, observing_player):
+        """
+        float64[15 * 88] encoding of the action log
+
+        The result is a view into the encoder's buffer, valid until the
+        next call for the same observer.
+        """
+        log = ActionLog.of(actions)
+        buffer = self._buffers[observing_player]
+        seen = self._logs[observing_player]
+        count = len(log)
+        length = len(seen)
+        if count > LOG_LENGTH:
+            raise ValueError("Action log longer than {}".format(LOG_LENGTH))
+
+        added = log.since(seen)
+        if added is None:
+            buffer[LOG_LENGTH - length:2 * LOG_LENGTH - length] = 0
+            length = 0
+            added = list(reversed(log))
+
+        row = LOG_LENGTH - 1 - length
+        for action in reversed(added):
+            buffer[row] = encode_action(action, observing_player,
+                                        self._player_count)
+            row -= 1
+
+        self._logs[observing_player] = log
+        return buffer[LOG_LENGTH - count:2 * LOG_LENGTH - count].reshape(-1)
@@ -1,13 +1,14 @@
-from operator import itemgetter
-
 import gym
 from gym import spaces
 from gym.utils import seeding
 import numpy as np
 
+from .actions import candidates, masked_argmax
+from .deal_pool import DealPool
+from .encoding import (ActionLogEncoder, observation_dtype, observation_high,
+                       observation_size, pack_observations)
 from .game import Game
-from .card import Card
-from .player import PlayerAction, PlayerTools, PlayerActionTools
+from .player import PlayerTools
 from .agents.random import AgentRandom
 
 
@@ -21,34 +22,61 @@ REWARD_INVALID_ACTION = -1.50
 
 
 class LoveLetterEnv(gym.Env):
-    """Love Letter Game Environment"""
+    """
+    Love Letter Game Environment
+
+    Observations are in observation_format, one of
+    encoding.OBSERVATION_FORMATS: float32, uint8 with consumed card
+    counts, or packed bits. encoding.unpack_observations turns the
+    compact formats back into float32 for a model.
 
-    def __init__(self, agent_other, seed=451):
+    With deal_pool games are dealt from a DealPool seeded with the env's
+    seed, decks shuffled in blocks ahead of the resets, instead of from a
+    seed drawn per game. The two deal different sequences of games.
+    """
+
+    def __init__(self, agent_other, seed=451, observation_format='float32',
+                 deal_pool=False):
 
         self.action_space = spaces.Discrete(SPACE_SIZE)
-        self.observation_space = spaces.Box(low=0, high=1, shape=(SPACE_SIZE,),
-                                            dtype=np.float32)
+        self.observation_space = spaces.Box(
+            low=0, high=observation_high(observation_format),
+            shape=(observation_size(observation_format),),
+            dtype=observation_dtype(observation_format))
 
         self._agent_other = AgentRandom(
             seed) if agent_other is None else agent_other
+        self._log_encoder = ActionLogEncoder(NBR_PLAYERS)
+        self._observation_format = observation_format
+        self._observation = np.zeros(
+            SPACE_SIZE, dtype=np.float32 if observation_format == 'float32'
+            else np.uint8)
+        self._use_deal_pool = deal_pool
+        self._deal_pool = None
         self.seed(seed)
         self.reset()
-        self._game = Game.new(4, self.np_random.random_integers(5000000))
+        self._game = self._deal()
 
     def seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
+        if self._use_deal_pool:
+            self.close()
+            self._deal_pool = DealPool(seed)
         return [seed]
 
+    def close(self):
+        if self._deal_pool is not None:
+            self._deal_pool.close()
+            self._deal_pool = None
+
     def step(self, action):
         assert self.action_space.contains(action)
 
-        player_action = self.action_from_index(action)
-
-        if player_action is None or not self._game.is_action_valid(player_action):
+        if not self._game.is_action_valid(action):
             return self._state(), REWARD_INVALID_ACTION, True, {"round": self._game.round()}
 
         self._game, reward = LoveLetterEnv.advance_game(
-            self._game, player_action, self._agent_other)
+            self._game, action, self._agent_other)
 
         done = self._game.over() or not PlayerTools.is_playing(
             self._game.players()[0])
@@ -56,28 +84,39 @@ class LoveLetterEnv(gym.Env):
         return self._state(), reward, done, {"round": self._game.round()}
 
     def reset(self):
-        self._game = Game.new(4, self.np_random.random_integers(5000000))
+        self._game = self._deal()
         return self._state()
 
+    def _deal(self):
+        """Brand new game, from the deal pool if the env has one"""
+        if self._deal_pool is not None:
+            return self._deal_pool.game(NBR_PLAYERS)
+        return Game.new(4, self.np_random.random_integers(5000000))
+
     def force(self, game):
         """Force the environment to a certain game state"""
         self._game = game
-        return game.state()
+        return game.state(encoder=self._log_encoder)
 
     def _state(self, game=None):
         """
         Gets the current state from game with additional state information.
+
+        The observation is encoded in the env's buffer and returned as a
+        new array, so callers may keep it across steps (e.g. as a torch
+        tensor sharing its memory).
         """
         game = self._game if game is None else game
 
-        action_candidates = self.actions_set(game)
-        actions = [game.is_action_valid(a) for a in self.actions_set(game)]
-        actions = np.array(actions, dtype=np.int8)
-        return np.concatenate([actions, game.state()])
+        observation = game.observation(out=self._observation,
+                                       encoder=self._log_encoder)
+        if self._observation_format == 'packed':
+            return pack_observations(observation)
+        return observation.copy()
 
     @staticmethod
     def advance_game(game, action, agent):
-        """Advance a game with an action
+        """Advance a game with an action (PlayerAction or action ID)
 
         * Play an action
         * Advance the game using the agent
@@ -111,7 +150,7 @@ class LoveLetterEnv(gym.Env):
 
     def action_by_score(self, scores, game=None):
         """
-        Returns best action based on assigned scores
+        Returns the valid action with the highest score
 
         return (action, score, idx)
         """
@@ -120,108 +159,29 @@ class LoveLetterEnv(gym.Env):
         game = self._game if game is None else game
 
         assert game.active()
-        actions_possible = self.actions_set(game)
-
-        actions = [(action, score, idx) for action, score, idx in
-                   zip(actions_possible,
-                       scores,
-                       range(len(actions_possible)))
-                   if game.is_action_valid(action)]
-
-        action = max(actions, key=itemgetter(2))
-        return action
+        scores = np.asarray(scores)
+        idx = int(masked_argmax(scores, game.legal_actions().array))
+        return self.actions_set(game)[idx], scores[idx], idx
 
     def action_from_index(self, action_index, game=None):
         """Returns valid action based on index and game"""
         game = self._game if game is None else game
 
-        action_candidates = self.actions_set(game)
-
-        actions = [(idx, action) for idx, action in
-                   enumerate(action_candidates)
-                   if game.is_action_valid(action) and idx == action_index]
-
-        return actions[0][1] if len(actions) == 1 else None
+        action_index = int(action_index)
+        if not 0 <= action_index < NBR_ACTIONS or \
+                not (game.legal_actions().mask >> action_index) & 1:
+            return None
+        return candidates(game.player_turn(), len(game.players()))[action_index]
 
     def actions_possible(self, game=None):
         """Returns valid (idx, actions) based on a current game"""
         game = self._game if game is None else game
 
-        action_candidates = self.actions_set(game)
-
-        actions = [(idx, action) for idx, action in
-                   enumerate(action_candidates)
-                   if game.is_action_valid(action)]
-
-        return actions
+        legal = game.legal_actions()
+        return list(zip(legal.indices, legal.actions))
 
     def actions_set(self, game=None):
-        """Returns all actions for a game"""
+        """Returns all actions for a game, by index"""
         game = self._game if game is None else game
 
-        player_self = game.player_turn()
-        opponents = game.opponent_turn()
-
-        possible_actions = [
-            # Actions always targeting the current player
-            PlayerAction(Card.king, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.guard, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.priest, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.baron, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-
-            PlayerAction(Card.prince, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.handmaid, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.countess, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0),
-            PlayerAction(Card.princess, player_self, Card.noCard, Card.noCard, Card.noCard, player_self, 0)
-        ]
-        for rel_idx in range(len(game._players)):
-            target_idx = game.absolute_player_idx(rel_idx, player_self)
-
-            possible_actions.extend([
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.priest,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.baron,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.handmaid,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.prince,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.king,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.countess,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.guard,
-                             target_idx,
-                             Card.princess,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.priest,
-                             target_idx,
-                             Card.noCard,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.baron,
-                             target_idx,
-                             Card.noCard,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.king,
-                             target_idx,
-                             Card.noCard,
-                             Card.noCard, Card.noCard, player_self, 0),
-                PlayerAction(Card.prince,
-                             target_idx,
-                             Card.noCard,
-                             Card.noCard, Card.noCard, player_self, 0)
-                ])
-
-        return possible_actions
+        return candidates(game.player_turn(), len(game.players()))
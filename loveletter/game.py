@@ -3,18 +3,32 @@
 Love Letter Game object
 """
 import numpy as np
+from loveletter.action_log import ActionLog
+from loveletter.actions import action_count, action_id, candidates, legal_actions
 from loveletter.card import Card
+from loveletter.encoding import (HAND_SIZE, CONSUMED_SIZE, STATE_SIZE,
+                                 encode_action, encode_action_log,
+                                 write_action_log)
 from loveletter.player import PlayerTools, PlayerAction, PlayerActionTools
+from loveletter import zobrist
 
 
 class Game():
-    """A Love Letter Game"""
+    """
+    A Love Letter Game
 
-    def __init__(self, deck, players, turn_index, action_log=[]):
+    The deck is shared, unchanged, by all states of a game. The cards
+    before the cursor have been dealt. The action log is an ActionLog
+    (or a list of actions) shared with the states that follow.
+    """
+
+    def __init__(self, deck, players, turn_index, action_log=None, cursor=0):
         self._deck = deck
+        self._cursor = cursor
         self._players = players
         self._turn_index = turn_index
-        self._action_log = action_log
+        self._action_log = ActionLog.of(action_log or ())
+        self._slot_keys = None
 
         total_playing = sum(
             [1 for player in players if PlayerTools.is_playing(player)])
@@ -30,7 +44,7 @@ class Game():
 
         NOTE: The LAST card [-1] is always held out
         """
-        return self._deck
+        return self._deck[self._cursor:]
 
     def draw_card(self):
         """
@@ -38,7 +52,8 @@ class Game():
 
         Only valid if the game is not over (otherwise No Card)
         """
-        return self._deck[0] if len(self._deck) > 1 else Card.noCard
+        return self._deck[self._cursor] if self.cards_left() > 0 \
+            else Card.noCard
 
     def held_card(self):
         """
@@ -102,7 +117,7 @@ class Game():
 
         Does not include the held back card
         """
-        return len(self._deck) - 1
+        return len(self._deck) - self._cursor - 1
 
     def active(self):
         """Return True if the game is still playing"""
@@ -112,6 +127,81 @@ class Game():
         """Return True if the game is over"""
         return not self.active()
 
+    def alive_mask(self):
+        """Bitmask of players still playing, bit i for player i"""
+        mask = 0
+        for idx, player in enumerate(self._players):
+            if PlayerTools.is_playing(player):
+                mask |= 1 << idx
+        return mask
+
+    def defended_mask(self):
+        """Bitmask of players protected by a handmaid, bit i for player i"""
+        mask = 0
+        for idx, player in enumerate(self._players):
+            if PlayerTools.is_defended(player):
+                mask |= 1 << idx
+        return mask
+
+    def legal_actions(self):
+        """LegalActions of the current player (see loveletter.actions)"""
+        return legal_actions(int(self.player().hand_card),
+                             int(self._deck[self._cursor]), self.player_turn(), self.alive_mask(),
+                             self.defended_mask(), len(self._players))
+
+    def action_id(self, action):
+        """Action ID of a PlayerAction of the current player, None if none"""
+        return action_id(action, self.player_turn(), len(self._players))
+
+    def zobrist_hash(self):
+        """
+        64 bit key of the position.
+
+        Covers the deck cursor, hands, discard slots, protection and
+        turn. Positions of the same deal with equal keys are the same
+        up to the action log. Once a position is hashed, the games
+        moved to from it update the keys incrementally.
+        """
+        key = zobrist.public_key(self._zobrist_slots(), self.cards_left() + 1,
+                                 self.player_turn())
+        for seat, player in enumerate(self._players):
+            key ^= zobrist.hand_key(seat, player.hand_card)
+        return key
+
+    def info_set_hash(self, seat=None):
+        """
+        64 bit key of what a seat observes, the current player by default.
+
+        Positions a seat cannot tell apart (other than by deduction)
+        have equal keys.
+        """
+        seat = self.player_turn() if seat is None else seat
+        drawn_card = self.draw_card() if seat == self.player_turn() \
+            else Card.noCard
+        return zobrist.public_key(self._zobrist_slots(), self.cards_left() + 1,
+                                  self.player_turn()) ^ \
+            zobrist.info_set_key(seat, self._players[seat], drawn_card)
+
+    def _zobrist_slots(self):
+        """Keys of the discard slots of each seat"""
+        if self._slot_keys is None:
+            self._slot_keys = tuple(zobrist.slots_key(seat, player)
+                                    for seat, player in enumerate(self._players))
+        return self._slot_keys
+
+    def _next_slot_keys(self, game):
+        """Slot keys of a game following this one, updating changed seats"""
+        slot_keys = self._zobrist_slots()
+        changed = [seat for seat, (player, player_before) in
+                   enumerate(zip(game._players, self._players))
+                   if player is not player_before]
+        if not changed:
+            return slot_keys
+        slot_keys = list(slot_keys)
+        for seat in changed:
+            slot_keys[seat] = zobrist.slots_key(seat, game._players[seat])
+        return tuple(slot_keys)
+
     def is_current_player_playing(self):
         """True if the current player has not been eliminated"""
         return PlayerTools.is_playing(self.player())
@@ -129,7 +219,7 @@ class Game():
         """
         # whats in hand
         card_number1 = self.player().hand_card
-        card_number2 = self.deck()[0]
+        card_number2 = self._deck[self._cursor]
 
         cardnumbers = [card_number1, card_number2]
         cardnumbers.sort()
@@ -151,7 +241,7 @@ class Game():
         cards_discarded = np.array([Game.player_to_discards(
             player) for player in self.players()]).flatten()
 
-        cards_hand = [self.player().hand_card, self.deck()[0]]
+        cards_hand = [self.player().hand_card, self._deck[self._cursor]]
         cards_all = np.concatenate([cards_discarded, cards_hand])
 
         card_bins = np.bincount(cards_all, minlength=9)[1:9]
@@ -164,16 +254,91 @@ class Game():
         """Returns a list of all cards discarded by player"""
         return [action.discard for action in player.actions]
 
-    def state(self):
+    def state(self, encoder=None, out=None):
         """
-        Combines player hand and remaining cards into one array.
+        Combines player hand, consumed cards and action log into one array.
 
-        returns numpy float 1d of length 24
+        encoder is an optional ActionLogEncoder kept across the states
+        of a game to encode the action log incrementally.
+
+        out is an optional preallocated array (or batch row) of length
+        1344 to write the state into instead of allocating. Integer
+        arrays hold consumed card counts rather than fractions.
+
+        returns numpy float 1d of length 1344, or out
         """
+        if out is not None:
+            self._write_state(out, encoder)
+            return out
         state = np.concatenate([self.state_hand(), self.consumed_cards(),
-                                self.state_action_log()])
+                                self.state_action_log(encoder=encoder)])
         return state
 
+    def observation(self, out=None, encoder=None, observing_player=None):
+        """
+        Valid action mask followed by the state of the current player.
+
+        Written into out when given, otherwise into a new float32 array.
+
+        For an observing_player other than the current player, or any
+        player once the game is over, the mask is empty and the state is
+        what that player knows between turns: its one card, the cards it
+        has seen consumed and the action log relative to it.
+
+        returns numpy 1d of length 52 + 1344
+        """
+        if observing_player is None or \
+                (observing_player == self.player_turn() and self.active()):
+            mask = self.legal_actions().array
+            if out is None:
+                out = np.empty(len(mask) + STATE_SIZE, dtype=np.float32)
+            out[:len(mask)] = mask
+            self._write_state(out[len(mask):], encoder)
+            return out
+
+        size = action_count(len(self._players))
+        if out is None:
+            out = np.empty(size + STATE_SIZE, dtype=np.float32)
+        out[:size] = 0
+        self._write_state(out[size:], encoder, observing_player)
+        return out
+
+    def _write_state(self, out, encoder=None, observing_player=None):
+        """Write the state into out without intermediate arrays"""
+        out[:] = 0
+        counts = [0] * 9
+        if observing_player is None:
+            observing_player = self.player_turn()
+            hand_card = self.player().hand_card
+            drawn_card = int(self._deck[self._cursor])
+
+            # hand cards, lowest first
+            out[(min(hand_card, drawn_card) - 1) % 8] = 1
+            out[8 + (max(hand_card, drawn_card) - 1) % 8] = 1
+            counts[drawn_card] += 1
+        else:
+            hand_card = self._players[observing_player].hand_card
+            if hand_card != Card.noCard:
+                out[hand_card - 1] = 1
+
+        for player in self._players:
+            for action in player.actions:
+                counts[action.discard] += 1
+        counts[hand_card] += 1
+        consumed = out[HAND_SIZE:HAND_SIZE + CONSUMED_SIZE]
+        if out.dtype.kind in "iu":
+            consumed[:] = counts[1:]
+        else:
+            for idx, card_count in enumerate(Card.counts):
+                consumed[idx] = counts[idx + 1] / card_count
+
+        log = out[HAND_SIZE + CONSUMED_SIZE:]
+        if encoder is not None:
+            log[:] = encoder.encode(self._action_log, observing_player)
+        else:
+            write_action_log(self._action_log, observing_player, log,
+                             len(self._players))
+
     def relative_player_idx(self, player_idx, observing_player):
         """
         Takes a player index and returns as a relative index
@@ -188,54 +353,21 @@ class Game():
         """
         return (relative_player_idx + observing_player) % len(self._players)
 
-    def state_action_log(self, observing_player=None):
+    def state_action_log(self, observing_player=None, encoder=None):
         """
         Creates the state representation of the action log.
         """
         if observing_player is None:
             observing_player = self.player_turn()
-        #print(self.player_turn())
-        log = list(reversed([self._action_to_np(action, observing_player)
-                        for action in self._action_log]))
-        if len(log) == 0:
-            return np.zeros(15 * 88)
-        padded_log = np.pad(np.array(log), ((0, 15 - len(self._action_log)), (0, 0)),
-                            'constant').flatten()
-        return padded_log
+        if encoder is not None:
+            return encoder.encode(self._action_log, observing_player).copy()
+        return encode_action_log(self._action_log, observing_player,
+                                 len(self._players))
 
     def _action_to_np(self, action, observing_player):
-
-        player = np.zeros(4)
-        # Relative player index (maybe?)
-        player_index = self.relative_player_idx(action.player,
-                                                observing_player)
-        player[player_index] = 1
-
-        played_card = np.zeros(8)
-        played_card[action.discard - 1] = 1
-
-        target = np.zeros(4)
-        target_index = self.relative_player_idx(action.player_target,
-                                                observing_player)
-        target[target_index] = 1
-
-        guessed_card = np.zeros(8)
-        if action.guess > 0:
-            guessed_card[action.guess - 1] = 1
-
-        force_discard = np.zeros(32)
-        if action.force_discarded > 0:
-            i = self.relative_player_idx(action.force_discarder, observing_player)
-            force_discard[i*8 + action.force_discarded-1] = 1
-
-        revealed_card = np.zeros(32)
-        if action.revealed_card > 0:
-            i = self.relative_player_idx(action.player_target, observing_player)
-            revealed_card[i*8 + action.revealed_card-1] = 1
-
-        log_bits = np.concatenate([player, played_card, target, guessed_card,
-                                   force_discard, revealed_card])
-        return log_bits
+        """Encodes an action relative to the observing player"""
+        return encode_action(action, observing_player,
+                             len(self._players)).copy()
 
     def _reward(self, game, action):
         """
@@ -251,7 +383,7 @@ class Game():
         return -10
 
     def move(self, action, throw=False):
-        """Current player makes an action.
+        """Current player makes an action, a PlayerAction or an action ID.
 
         Returns (NewGame and Reward)<Game,int>
         """
@@ -266,24 +398,35 @@ class Game():
 
         if self.over() or not self.is_action_valid(action):
             return self._invalid_input(throw)
+        if not isinstance(action, tuple):
+            action = candidates(self.player_turn(), len(self._players))[action]
+
+        game = self._play(action)
+        # keys are maintained once a position of the game was hashed
+        if self._slot_keys is not None:
+            game._slot_keys = self._next_slot_keys(game)
+        return game
 
+    def _play(self, action):
+        """New game state after the current player makes a valid action"""
         # player is out, increment turn index
         if action.discard == Card.noCard:
-            return Game(self.deck(), self.players(), self.turn_index() + 1,
-                        self._action_log)
+            return Game(self._deck, self.players(), self.turn_index() + 1,
+                        self._action_log, self._cursor)
 
         player = self.player()
-        player_hand = [player.hand_card, self._deck[0]]
+        dealt_card = self._deck[self._cursor]
+        player_hand = [player.hand_card, dealt_card]
         player_hand_new = Game.new_hand_card(action.discard, player_hand)
-        deck_new = self._deck[1:]
+        cursor_new = self._cursor + 1
 
         # choosing to discard the princess ... is valid
         if action.discard == Card.princess:
-            return self._move_princess(self._deck[0], action, deck_new)
+            return self._move_princess(dealt_card, action, cursor_new)
 
         # priest requires modification of action (knowledge)
         if action.discard == Card.priest:
-            return self._move_priest(action, player_hand_new, deck_new)
+            return self._move_priest(action, player_hand_new, cursor_new)
 
         # updated players for the next turn
         player = PlayerTools.move(self.player(), player_hand_new, action)
@@ -291,27 +434,27 @@ class Game():
             self._players, player, self.player_turn())
 
         if action.discard == Card.baron:
-            return self._move_baron(action, current_players, player_hand_new, deck_new)
+            return self._move_baron(action, current_players, player_hand_new, cursor_new)
 
         # No other logic for handmaids or countess
         if action.discard == Card.handmaid or \
                 action.discard == Card.countess:
             action_updated = action._replace(player=self.player_turn())
-            return Game(deck_new, current_players, self._turn_index + 1,
-                        [*self._action_log, action_updated])
+            return Game(self._deck, current_players, self._turn_index + 1,
+                        self._action_log.append(action_updated), cursor_new)
 
         if action.discard == Card.guard:
-            return self._move_guard(current_players, action, deck_new)
+            return self._move_guard(current_players, action, cursor_new)
 
         if action.discard == Card.prince:
-            return self._move_prince(current_players, action, deck_new)
+            return self._move_prince(current_players, action, cursor_new)
 
         if action.discard == Card.king:
-            return self._move_king(current_players, action, deck_new)
+            return self._move_king(current_players, action, cursor_new)
 
         raise NotImplementedError("Missing game logic")
 
-    def _move_guard(self, current_players, action, deck_new):
+    def _move_guard(self, current_players, action, cursor_new):
         """
         Handle a guard action into a new game state
 
@@ -326,10 +469,10 @@ class Game():
                 current_players, player_target, action.player_target)
 
         action_updated = action._replace(player=self.player_turn())
-        return Game(deck_new, current_players, self._turn_index + 1,
-                    [*self._action_log, action_updated])
+        return Game(self._deck, current_players, self._turn_index + 1,
+                    self._action_log.append(action_updated), cursor_new)
 
-    def _move_priest(self, action, player_hand_new, deck_new):
+    def _move_priest(self, action, player_hand_new, cursor_new):
         """
         Handle a priest action into a new game state
 
@@ -347,10 +490,10 @@ class Game():
         current_players = Game._set_player(
             self._players, player, self.player_turn())
 
-        return Game(deck_new, current_players, self._turn_index + 1,
-                    [*self._action_log, action_updated])
+        return Game(self._deck, current_players, self._turn_index + 1,
+                    self._action_log.append(action_updated), cursor_new)
 
-    def _move_baron(self, action, current_players, player_hand_new, deck_new):
+    def _move_baron(self, action, current_players, player_hand_new, cursor_new):
         """
         Handle a baron action into a new game state
 
@@ -386,10 +529,10 @@ class Game():
                                              force_discarded=player_hand_new,
                                              force_discarder=action.player)
 
-        return Game(deck_new, current_players, self._turn_index + 1,
-                    [*self._action_log, action_updated])
+        return Game(self._deck, current_players, self._turn_index + 1,
+                    self._action_log.append(action_updated), cursor_new)
 
-    def _move_prince(self, current_players, action, deck_new):
+    def _move_prince(self, current_players, action, cursor_new):
         """Handle a prince action into a new game state"""
 
         player_before_discard = current_players[action.player_target]
@@ -397,26 +540,26 @@ class Game():
                                          force_discarded=player_before_discard.hand_card,
                                          force_discarder=action.player_target)
         # if there are no more cards, this has no effect
-        if len(deck_new) - 1 < 1:
-            return Game(deck_new, current_players, self._turn_index + 1,
-                        [*self._action_log, action_updated])
+        if len(self._deck) - cursor_new - 1 < 1:
+            return Game(self._deck, current_players, self._turn_index + 1,
+                        self._action_log.append(action_updated), cursor_new)
 
         if player_before_discard.hand_card == Card.princess:
             player_post_discard = PlayerTools.force_discard(
                 player_before_discard)
-            deck_final = deck_new
+            cursor_final = cursor_new
         else:
             player_post_discard = PlayerTools.force_discard(
-                player_before_discard, deck_new[0])
-            deck_final = deck_new[1:]
+                player_before_discard, self._deck[cursor_new])
+            cursor_final = cursor_new + 1
 
         current_players = Game._set_player(
             current_players, player_post_discard, action.player_target)
 
-        return Game(deck_final, current_players, self._turn_index + 1,
-                    [*self._action_log, action_updated])
+        return Game(self._deck, current_players, self._turn_index + 1,
+                    self._action_log.append(action_updated), cursor_final)
 
-    def _move_king(self, current_players, action, deck_new):
+    def _move_king(self, current_players, action, cursor_new):
         """Handle a king action into a new game state"""
         player = current_players[self.player_turn()]
         target = current_players[action.player_target]
@@ -431,21 +574,28 @@ class Game():
 
         action_updated = action._replace(player=self.player_turn())
 
-        return Game(deck_new, current_players, self._turn_index + 1,
-                    [*self._action_log, action_updated])
+        return Game(self._deck, current_players, self._turn_index + 1,
+                    self._action_log.append(action_updated), cursor_new)
 
-    def _move_princess(self, dealt_card, action, new_deck):
+    def _move_princess(self, dealt_card, action, cursor_new):
         """Handle a princess action into a new game state"""
         player = PlayerTools.force_discard(self.player(), dealt_card)
         player = PlayerTools.force_discard(player)
         current_players = Game._set_player(
             self._players, player, self.player_turn())
         action_updated = action._replace(player=self.player_turn())
-        return Game(new_deck, current_players, self._turn_index + 1,
-                    [*self._action_log, action_updated])
+        return Game(self._deck, current_players, self._turn_index + 1,
+                    self._action_log.append(action_updated), cursor_new)
 
     def is_action_valid(self, action):
-        """Tests if an action is valid given the current game state"""
+        """
+        Tests if an action is valid given the current game state
+
+        The action is a PlayerAction or an action ID (see loveletter.actions)
+        """
+        if not isinstance(action, tuple):
+            return action >= 0 and (self.legal_actions().mask >> int(action)) & 1 == 1
+
         player = self.player()
 
         # if player is out, only valid action is no action
@@ -453,7 +603,7 @@ class Game():
             return PlayerActionTools.is_blank(action)
 
         target_player = self._players[action.player_target]
-        player_hand = [player.hand_card, self._deck[0]]
+        player_hand = [player.hand_card, self._deck[self._cursor]]
 
         # cannot discard a card not in the hand
         if action.discard not in player_hand:
@@ -553,10 +703,14 @@ class Game():
     @staticmethod
     def new(player_count=4, seed=451):
         """Create a brand new game"""
-        deck = Card.shuffle_deck(seed)
+        return Game.from_deck(Card.shuffle_deck(seed), player_count)
+
+    @staticmethod
+    def from_deck(deck, player_count=4):
+        """Create a brand new game dealt from a shuffled deck"""
+        deck.flags.writeable = False
 
         dealt_cards = deck[:player_count]
-        undealt_cards = deck[player_count:]
 
         players = list(map(PlayerTools.blank, dealt_cards))
-        return Game(undealt_cards, players, 0, [])
+        return Game(deck, players, 0, [], player_count)
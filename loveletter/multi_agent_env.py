@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter self-play environment
+Every seat of a game is a learner, so each game gives four trajectories.
+
+Follows the PettingZoo agent environment cycle without depending on it:
+
+    env = LoveLetterMultiAgentEnv(seed=1)
+    env.reset()
+    for agent in env.agent_iter():
+        observation, reward, done, info = env.last()
+        env.step(None if done else policy(observation))
+"""
+import numpy as np
+
+from loveletter.encoding import (OBSERVATION_SIZE, ActionLogEncoder,
+                                 observation_dtype, pack_observations)
+from loveletter.game import Game
+from loveletter.player import PlayerTools
+from loveletter.vec_env import (REWARD_INVALID_ACTION, REWARD_LOSE, REWARD_WIN,
+                                observation_box, spaces)
+
+NBR_PLAYERS = 4
+
+
+class LoveLetterMultiAgentEnv():
+    """
+    Self-play Love Letter Game Environment
+
+    Agents are named player_0 to player_3 by seat. Each agent observes the
+    game relative to itself, as Game.observation does for the current
+    player. An agent is done when it is knocked out, with REWARD_LOSE, or
+    when the game ends, with REWARD_WIN for the winner. It is then
+    selected once more to see its reward and must be stepped with None.
+    An invalid action ends the game for everyone, with
+    REWARD_INVALID_ACTION for the agent that played it.
+    """
+
+    def __init__(self, seed=451, observation_format='float32'):
+        self.possible_agents = ['player_{}'.format(seat)
+                                for seat in range(NBR_PLAYERS)]
+        if spaces is not None:
+            self.observation_spaces = {
+                agent: observation_box(observation_format)
+                for agent in self.possible_agents}
+            self.action_spaces = {agent: spaces.Discrete(OBSERVATION_SIZE)
+                                  for agent in self.possible_agents}
+
+        self._observation_format = observation_format
+        self._log_encoder = ActionLogEncoder(NBR_PLAYERS)
+        self._observation = np.zeros(
+            OBSERVATION_SIZE, dtype=observation_dtype(
+                'uint8' if observation_format == 'packed' else observation_format))
+        self.seed(seed)
+        self.reset()
+
+    def seed(self, seed=None):
+        self._rng = np.random.default_rng(seed)
+        return [seed]
+
+    def reset(self):
+        """Deal a new game"""
+        self._game = Game.new(NBR_PLAYERS, int(self._rng.integers(5000000)))
+        self.agents = list(self.possible_agents)
+        self.rewards = {agent: 0 for agent in self.agents}
+        self._cumulative_rewards = {agent: 0 for agent in self.agents}
+        self.dones = {agent: False for agent in self.agents}
+        self.infos = {agent: {'round': 0} for agent in self.agents}
+        self._select()
+
+    def observe(self, agent):
+        """New observation of the game by an agent"""
+        observation = self._game.observation(
+            out=self._observation, encoder=self._log_encoder,
+            observing_player=self.possible_agents.index(agent))
+        if self._observation_format == 'packed':
+            return pack_observations(observation)
+        return observation.copy()
+
+    def last(self):
+        """
+        Observation of the selected agent, its reward since it last acted,
+        whether it is done and its info
+
+        returns <observation, reward, done, info>
+        """
+        agent = self.agent_selection
+        return (self.observe(agent), self._cumulative_rewards[agent],
+                self.dones[agent], self.infos[agent])
+
+    def agent_iter(self, max_iter=2 ** 63):
+        """Selected agent until every agent is done, at most max_iter times"""
+        for _ in range(max_iter):
+            if not self.agents:
+                return
+            yield self.agent_selection
+
+    def step(self, action):
+        """Selected agent plays an action ID or PlayerAction, None once done"""
+        agent = self.agent_selection
+        if self.dones[agent]:
+            if action is not None:
+                raise Exception("Agent {} is done, step it with None".format(agent))
+            self.agents.remove(agent)
+            self._select()
+            return
+
+        game = self._game
+        self.rewards = {other: 0 for other in self.agents}
+        self._cumulative_rewards[agent] = 0
+        if not game.is_action_valid(action):
+            self.rewards[agent] = REWARD_INVALID_ACTION
+            self.dones = {other: True for other in self.agents}
+        else:
+            game, _ = game.move(action)
+            while game.active() and not game.is_current_player_playing():
+                game = game.skip_eliminated_player()
+            self._game = game
+            for seat, other in enumerate(self.possible_agents):
+                if other not in self.agents or self.dones[other]:
+                    continue
+                if game.over():
+                    self.rewards[other] = REWARD_WIN \
+                        if game.winner() == seat else REWARD_LOSE
+                    self.dones[other] = True
+                elif not PlayerTools.is_playing(game.players()[seat]):
+                    self.rewards[other] = REWARD_LOSE
+                    self.dones[other] = True
+
+        for other, reward in self.rewards.items():
+            self._cumulative_rewards[other] += reward
+            self.infos[other] = {'round': game.round()}
+        self._select()
+
+    def close(self):
+        pass
+
+    def _select(self):
+        """Select a done agent to see its reward, else the player to move"""
+        for agent in self.agents:
+            if self.dones[agent]:
+                self.agent_selection = agent
+                return
+        if self.agents:
+            self.agent_selection = self.possible_agents[self._game.player_turn()]
@@ -93,7 +93,30 @@ class PlayerActionTools():
 #            Note that actions are always of length 8 (the most)
 #            number of moves a player can ever take in a game
 #            in a 2 player game (technically, but highly unlikely)
-Player = namedtuple('Player', 'hand_card actions')
+#  discard_count - int number of actions taken, the first empty slot
+#  last_discard - int card of the last action taken, 0 if none
+#  defended - bool if the player is protected by a handmaid
+#
+# The last three are derived from actions when not given, and kept up to
+# date by PlayerTools.
+class Player(namedtuple('Player', 'hand_card actions discard_count last_discard defended')):
+    """A Love Letter Player"""
+
+    __slots__ = ()
+
+    def __new__(cls, hand_card, actions, discard_count=None,
+                last_discard=None, defended=None):
+        if discard_count is None:
+            discard_count = len(actions)
+            for idx, action in enumerate(actions):
+                if action.discard == Card.noCard:
+                    discard_count = idx
+                    break
+            last_discard = actions[discard_count - 1].discard \
+                if discard_count > 0 else Card.noCard
+            defended = last_discard == Card.handmaid
+        return super(Player, cls).__new__(cls, hand_card, actions, discard_count,
+                                          last_discard, defended)
 
 
 class PlayerTools():
@@ -102,45 +125,35 @@ class PlayerTools():
     @staticmethod
     def blank(dealt_card):
         """Generate a player with blank actions"""
-        return Player(dealt_card, [PlayerActionTools.blank()] * 8)
+        return Player(dealt_card, [PlayerActionTools.blank()] * 8,
+                      0, Card.noCard, False)
 
     @staticmethod
     def move(player, hand_card_new, action):
         """Returns a new player object as the result of a move"""
+        action_index = player.discard_count
+        if action_index >= len(player.actions):
+            raise Exception("Insufficient space in actions")
         actions = player.actions[:]
-        action_index = PlayerTools._next_empty_index(actions)
         actions[action_index] = action
-        return Player(hand_card_new, actions)
+        return Player(hand_card_new, actions, action_index + 1,
+                      action.discard, action.discard == Card.handmaid)
 
     @staticmethod
     def set_hand(player, hand_card_new):
         """Returns a new player object as the result of a move"""
-        return Player(hand_card_new, player.actions[:])
+        return player._replace(hand_card=hand_card_new, actions=player.actions[:])
 
     @staticmethod
     def is_defended(player):
         """Returns if the player object is protected by a handmaid"""
-        actions = player.actions[:]
-        action_index = PlayerTools._next_empty_index(actions)
-        if action_index == 0:
-            return False
-
-        last_discard = actions[action_index - 1].discard
-        return last_discard == Card.handmaid
+        return player.defended
 
     @staticmethod
     def force_discard(player, new_card=Card.noCard):
         """Returns a new player object that is forced to discard"""
         return PlayerTools.move(player, new_card, PlayerActionTools.simple(player.hand_card))
 
-    @staticmethod
-    def _next_empty_index(actions):
-        for idx, action in enumerate(actions):
-            if action.discard == Card.noCard:
-                return idx
-        print(actions)
-        raise Exception("Insufficient space in actions")
-
     @staticmethod
     def is_playing(player):
         """Player still has a card"""
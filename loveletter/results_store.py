@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Arena results store
+SQLite file of the outcome of every arena game played.
+"""
+
+import hashlib
+import sqlite3
+
+
+class ResultsStore():
+    """
+    Outcomes of arena games, one row per game.
+
+    A game is keyed by the agent and its opponents, each a
+    `(name, fingerprint)` pair where the fingerprint identifies the model
+    behind the name, by the seat of the agent, the shift of the dealt
+    hands and the seed of the deal. Outcomes are committed as they are
+    added, so an interrupted arena resumes from the games it finished.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            agent TEXT NOT NULL,
+            agent_hash TEXT NOT NULL,
+            opponent TEXT NOT NULL,
+            opponent_hash TEXT NOT NULL,
+            seat INTEGER NOT NULL,
+            shift INTEGER NOT NULL,
+            seed INTEGER NOT NULL,
+            won INTEGER NOT NULL,
+            PRIMARY KEY (agent, agent_hash, opponent, opponent_hash,
+                         seat, shift, seed)
+        )"""
+
+    def __init__(self, path=':memory:'):
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(self._SCHEMA)
+        self._connection.commit()
+
+    def deals(self, agent, opponent, start, stop, rotations):
+        """
+        Stored wins of agent for each rotation of the deals seeded start
+        to stop, as {seed: wins tuple}, for deals with every rotation stored
+        """
+        rows = self._connection.execute(
+            "SELECT seat, shift, seed, won FROM games WHERE agent = ? AND "
+            "agent_hash = ? AND opponent = ? AND opponent_hash = ? AND "
+            "seed >= ? AND seed < ?",
+            tuple(agent) + tuple(opponent) + (start, stop))
+        games = {}
+        for seat, shift, seed, won in rows:
+            games[(seat, shift, seed)] = won
+        deals = {}
+        for seed in range(start, stop):
+            wins = tuple(games.get((seat, shift, seed))
+                         for seat, shift in rotations)
+            if None not in wins:
+                deals[seed] = wins
+        return deals
+
+    def add(self, agent, opponent, start, outcomes, rotations):
+        """Store the wins tuples of consecutive deals from seed start"""
+        rows = [tuple(agent) + tuple(opponent) + (seat, shift, seed, won)
+                for seed, wins in enumerate(outcomes, start)
+                for (seat, shift), won in zip(rotations, wins)]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows)
+
+    def __len__(self):
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        """Close the database"""
+        self._connection.close()
+
+    @staticmethod
+    def fingerprint(*paths):
+        """Short hash of the contents of model files"""
+        digest = hashlib.sha1()
+        for path in paths:
+            with open(path, 'rb') as model_file:
+                for block in iter(lambda: model_file.read(1 << 20), b''):
+                    digest.update(block)
+        return digest.hexdigest()[:16]
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Search Game object
+
+A mutable CompactGame for tree search. `apply(action)` plays a move in
+place and pushes a compact delta on an undo stack, `undo()` pops it and
+restores the previous position. No game objects are created per node.
+"""
+
+from loveletter.card import Card
+from loveletter.compact_game import CompactGame, _SIMPLE
+
+
+class SearchGame(CompactGame):
+    """A Love Letter Game that is modified in place with apply/undo"""
+
+    __slots__ = ('_undo',)
+
+    def __init__(self, deck, cursor, hands, counts, slots, defended,
+                 turn_index, action_log=None):
+        # the containers are mutated in place, so they are never shared
+        super(SearchGame, self).__init__(deck, cursor, list(hands),
+                                         list(counts), list(slots), defended,
+                                         turn_index, action_log)
+        self._undo = []
+
+    def depth(self):
+        """Number of moves that can be undone"""
+        return len(self._undo)
+
+    def snapshot(self):
+        """Immutable CompactGame copy of the current position"""
+        return CompactGame(self._deck, self._cursor, self._hands[:],
+                           self._counts[:], self._slots[:], self._defended,
+                           self._turn_index, self._action_log)
+
+    def _move(self, action, throw=False):
+        """Current player makes an action.
+
+        Returns a new CompactGame, this game is not modified"""
+        return self.snapshot()._move(action, throw)
+
+    def apply(self, action, throw=False):
+        """
+        Current player makes an action, modifying this game in place.
+
+        Every call pushes exactly one entry on the undo stack, an invalid
+        action leaves the game untouched and pushes an empty entry.
+        """
+        if not self._game_active or not self.is_action_valid(action):
+            self._invalid_input(throw)
+            self._undo.append(None)
+            return self
+
+        hands = self._hands
+        counts = self._counts
+        turn = self.player_turn()
+        target = action.player_target
+
+        # the delta holds everything needed to restore the position
+        self._undo.append((self._turn_index, self._cursor, self._defended,
+                           self._alive, self._game_active, self._action_log,
+                           turn, hands[turn], counts[turn],
+                           target, hands[target], counts[target]))
+        self._turn_index += 1
+
+        # player is out, only the turn index changes
+        if action.discard == Card.noCard:
+            return self
+
+        hand_card = hands[turn]
+        dealt_card = self._deck[self._cursor]
+        hand_card_new = dealt_card if action.discard == hand_card else hand_card
+        target_card = hands[target]
+        target_defended = self.is_defended(target)
+        self._cursor += 1
+        action_updated = action._replace(player=turn)
+
+        if action.discard == Card.princess:
+            self._record(turn, _SIMPLE[hand_card])
+            self._record(turn, _SIMPLE[dealt_card])
+            self._eliminate(turn)
+        elif action.discard == Card.priest:
+            revealed_card = Card.noCard if target_defended else target_card
+            action_updated = action._replace(player=turn,
+                                             revealed_card=revealed_card)
+            self._record(turn, action_updated)
+            hands[turn] = hand_card_new
+        else:
+            self._record(turn, action)
+            hands[turn] = hand_card_new
+
+            if action.discard == Card.baron:
+                action_updated = self._apply_baron(
+                    action, turn, hand_card_new, target_card, target_defended)
+            elif action.discard == Card.guard:
+                if target_card == action.guess and not target_defended:
+                    self._force_discard_previous(target)
+            elif action.discard == Card.prince:
+                action_updated = self._apply_prince(action, turn)
+            elif action.discard == Card.king:
+                hands[turn], hands[target] = hands[target], hands[turn]
+
+        self._action_log = self._action_log.append(action_updated)
+        alive = self._alive
+        self._game_active = (alive & (alive - 1)) != 0 and \
+            len(self._deck) - self._cursor - 1 > 0
+        return self
+
+    def _apply_baron(self, action, turn, hand_card_new, card_target,
+                     target_defended):
+        """Apply a baron action in place, returns the logged action"""
+        target = action.player_target
+        if hand_card_new > card_target:
+            if not target_defended:
+                # target is eliminated
+                self._force_discard_previous(target)
+                return action._replace(player=turn,
+                                       force_discarded=card_target,
+                                       force_discarder=target)
+            return action._replace(player=turn)
+
+        if hand_card_new == card_target:
+            # Tie, nobody wins
+            return action._replace(player=turn, revealed_card=card_target)
+
+        # player is eliminated, the baron is not recorded in the slots
+        self._force_discard_previous(turn)
+        self._record(turn, _SIMPLE[hand_card_new])
+        self._eliminate(turn)
+        return action._replace(player=turn,
+                               force_discarded=hand_card_new,
+                               force_discarder=action.player)
+
+    def _apply_prince(self, action, turn):
+        """Apply a prince action in place, returns the logged action"""
+        target = action.player_target
+        card_target = self._hands[target]
+        action_updated = action._replace(player=turn,
+                                         force_discarded=card_target,
+                                         force_discarder=target)
+        # if there are no more cards, this has no effect
+        if len(self._deck) - self._cursor - 1 < 1:
+            return action_updated
+
+        self._record(target, _SIMPLE[card_target])
+        if card_target == Card.princess:
+            self._eliminate(target)
+        else:
+            self._hands[target] = self._deck[self._cursor]
+            self._cursor += 1
+        return action_updated
+
+    def _force_discard_previous(self, idx):
+        """
+        Force a player to discard the card held before this move.
+
+        Discards already recorded for the player during this move are
+        dropped first, mirroring how Game rebuilds the player from the
+        record it had before the move.
+        """
+        delta = self._undo[-1]
+        if delta[6] == idx:
+            hand_card, count = delta[7], delta[8]
+        else:
+            hand_card, count = delta[10], delta[11]
+        self._clear_slots(idx, count)
+        self._record(idx, _SIMPLE[hand_card])
+        self._eliminate(idx)
+
+    def _eliminate(self, idx):
+        """Remove the player's card, knocking them out"""
+        self._hands[idx] = Card.noCard
+        self._alive &= ~(1 << idx)
+
+    def _record(self, idx, action):
+        """Record a discard for the player in place"""
+        self._defended = CompactGame._push(self._counts, self._slots,
+                                           self._defended, idx, action)
+
+    def _clear_slots(self, idx, count):
+        """Drop the player's slots from count onwards"""
+        self._slots[idx] = self._slots[idx][:count]
+        self._counts[idx] = count
+
+    def undo(self):
+        """Take back the most recently applied action"""
+        delta = self._undo.pop()
+        if delta is None:
+            return self
+
+        self._turn_index, self._cursor, self._defended, self._alive, \
+            self._game_active, self._action_log, turn, hand_turn, count_turn, \
+            target, hand_target, count_target = delta
+
+        # restore the target first, the player wins if both are the same
+        if self._counts[target] != count_target:
+            self._clear_slots(target, count_target)
+        self._hands[target] = hand_target
+        if self._counts[turn] != count_turn:
+            self._clear_slots(turn, count_turn)
+        self._hands[turn] = hand_turn
+        return self
+
+    @staticmethod
+    def from_game(game):
+        """Create a SearchGame from a Game or CompactGame"""
+        compact = game if isinstance(game, CompactGame) else \
+            CompactGame.from_game(game)
+        return SearchGame(compact._deck, compact._cursor, compact._hands,
+                          compact._counts, compact._slots, compact._defended,
+                          compact._turn_index, compact._action_log)
+
+    @staticmethod
+    def new(player_count=4, seed=451):
+        """Create a brand new game"""
+        return SearchGame.from_game(CompactGame.new(player_count, seed))
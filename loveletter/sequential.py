@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter sequential tests
+Rules ending an Arena pairing once its result is clear enough.
+
+A rule's `done(comparison)` is checked with the Comparison of the deals
+played so far after each batch of deals.
+"""
+
+import math
+
+
+class SPRT():
+    """
+    Wald's sequential probability ratio test of the win rate.
+
+    Tests the win rate p0 of an agent no better than its three opponents
+    against the win rate p1, with error rates alpha of accepting p1 and
+    beta of accepting p0 wrongly. Games are taken as independent, which
+    for duplicate deals makes the test somewhat conservative.
+    """
+
+    def __init__(self, p0=0.25, p1=0.35, alpha=0.05, beta=0.05):
+        if not 0 < p0 < p1 < 1:
+            raise Exception("SPRT needs win rates 0 < p0 < p1 < 1")
+        if not (0 < alpha < 1 and 0 < beta < 1):
+            raise Exception("SPRT error rates must be between 0 and 1")
+        self._win = math.log(p1 / p0)
+        self._loss = math.log((1 - p1) / (1 - p0))
+        self._lower = math.log(beta / (1 - alpha))
+        self._upper = math.log((1 - beta) / alpha)
+
+    def log_likelihood_ratio(self, comparison):
+        """Log likelihood ratio of p1 over p0 given the games"""
+        losses = comparison.games - comparison.wins
+        return comparison.wins * self._win + losses * self._loss
+
+    def decision(self, comparison):
+        """1 if p1 is accepted, 0 if p0 is, None while undecided"""
+        ratio = self.log_likelihood_ratio(comparison)
+        if ratio >= self._upper:
+            return 1
+        if ratio <= self._lower:
+            return 0
+        return None
+
+    def done(self, comparison):
+        """True once either win rate is accepted"""
+        return self.decision(comparison) is not None
+
+
+class IntervalWidth():
+    """
+    Stops once the confidence interval of the win rate is narrow enough.
+
+    The interval is the win rate plus or minus z standard errors, with at
+    least min_deals played so the standard error is a fair estimate. The
+    standard error is taken over deals, so with duplicate deals min_deals
+    counts deals rather than their games.
+    """
+
+    def __init__(self, width=0.05, z=1.96, min_deals=100):
+        if width <= 0:
+            raise Exception("Interval width must be positive")
+        self._width = width
+        self._z = z
+        self._min_deals = min_deals
+
+    def width(self, comparison):
+        """Width of the confidence interval, nan if unknown"""
+        return 2 * self._z * comparison.stderr
+
+    def done(self, comparison):
+        """True once the interval is at most the target width"""
+        return comparison.deals >= self._min_deals and \
+            self.width(comparison) <= self._width
@@ -0,0 +1,115 @@
+"""Tests for the NumPy A3C agent"""
+
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from loveletter.agents.a3c_numpy import AgentA3CNumpy, write_weights
+from loveletter.agents.agent import Agent
+from loveletter.encoding import OBSERVATION_SIZE
+from loveletter.game import Game
+
+try:
+    import torch
+    import gym
+except ImportError:
+    torch = None
+
+
+def random_state(inputs=OBSERVATION_SIZE, outputs=OBSERVATION_SIZE, seed=3):
+    """ActorCritic shaped state dict of random arrays"""
+    rng = np.random.RandomState(seed)
+    shapes = {'linear1.weight': (256, inputs), 'linear1.bias': (256,),
+              'lstm.weight_ih': (1024, 256), 'lstm.weight_hh': (1024, 256),
+              'lstm.bias_ih': (1024,), 'lstm.bias_hh': (1024,),
+              'critic_linear.weight': (1, 256), 'critic_linear.bias': (1,),
+              'actor_linear.weight': (outputs, 256), 'actor_linear.bias': (outputs,)}
+    return {name: rng.normal(0, 0.1, shape) for name, shape in shapes.items()}
+
+
+def reference_logits(state, observation):
+    """ActorCritic forward pass of one observation from a zero LSTM state"""
+    hidden = state['linear1.weight'] @ observation + state['linear1.bias']
+    hidden = np.where(hidden > 0, hidden, np.exp(hidden) - 1)
+    gates = state['lstm.weight_ih'] @ hidden + state['lstm.bias_ih'] + \
+        state['lstm.weight_hh'] @ np.zeros(256) + state['lstm.bias_hh']
+    in_gate, _, cell_gate, out_gate = np.split(gates, 4)
+    cell = 1 / (1 + np.exp(-in_gate)) * np.tanh(cell_gate)
+    hidden = 1 / (1 + np.exp(-out_gate)) * np.tanh(cell)
+    return state['actor_linear.weight'] @ hidden + state['actor_linear.bias']
+
+
+def positions(count, seed=5):
+    """Active positions of random games"""
+    rng = random.Random(seed)
+    games = []
+    for idx in range(count):
+        game = Game.new(4, seed + idx)
+        for _ in range(rng.randrange(6)):
+            if not game.active():
+                break
+            if not game.is_current_player_playing():
+                game = game.skip_eliminated_player()
+            else:
+                game = game._move(rng.choice(Agent.valid_actions(game)))
+        if game.active() and game.is_current_player_playing():
+            games.append(game)
+    return games
+
+
+class TestAgentA3CNumpy(unittest.TestCase):
+    """NumPy inference of the A3C model"""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, 'weights.npz')
+        self._state = random_state()
+        write_weights(self._path, self._state)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_matches_reference(self):
+        """Moves are the best legal action of the model"""
+        agent = AgentA3CNumpy(self._path)
+        games = positions(40)
+        moves = agent.move_batch(games)
+        for game, move in zip(games, moves):
+            logits = reference_logits(self._state, game.observation().astype(np.float64))
+            legal = game.legal_actions()
+            best = max(legal.indices, key=lambda idx: logits[idx])
+            self.assertEqual(move, legal.actions[legal.indices.index(best)])
+            self.assertEqual(agent.move(game), move)
+
+    def test_weight_file(self):
+        """Only the weights inference needs are written, as float32"""
+        with np.load(self._path) as weights:
+            self.assertNotIn('lstm.weight_hh', weights.files)
+            self.assertEqual(weights['linear1.weight'].dtype, np.float32)
+
+    def test_other_model(self):
+        """Models of another observation size are refused"""
+        path = os.path.join(self._directory.name, 'old.npz')
+        write_weights(path, random_state(24, 15))
+        self.assertRaises(Exception, AgentA3CNumpy, path)
+
+    @unittest.skipIf(torch is None, "torch and gym are not installed")
+    def test_matches_torch(self):
+        """Exported weights play as AgentA3C"""
+        from loveletter.agents.a3c import AgentA3C
+        from loveletter.agents.a3c_numpy import export_weights
+        model_path = os.path.join(self._directory.name, 'model')
+        torch.save({name: torch.from_numpy(array.astype(np.float32))
+                    for name, array in self._state.items()}, model_path)
+        export_weights(model_path, self._path)
+        agent = AgentA3C(model_path, torch.FloatTensor)
+        games = positions(40)
+        self.assertListEqual(AgentA3CNumpy(self._path).move_batch(games),
+                             agent.move_batch(games))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Tests for the persistent action log"""
+
+import unittest
+
+from loveletter.action_log import ActionLog
+from loveletter.card import Card
+from loveletter.game import Game
+from loveletter.player import PlayerAction, PlayerActionTools
+
+
+class TestActionLog(unittest.TestCase):
+    """Persistent action log"""
+
+    def test_sequence(self):
+        """A log reads like the list of its actions"""
+        actions = [PlayerActionTools.simple(card) for card in range(1, 6)]
+        log = ActionLog.of(actions)
+        self.assertEqual(len(log), 5)
+        self.assertListEqual(list(log), actions)
+        self.assertListEqual(list(reversed(log)), actions[::-1])
+        self.assertEqual(log[0], actions[0])
+        self.assertEqual(log[-1], actions[-1])
+        self.assertEqual(log[1:3], actions[1:3])
+        self.assertEqual(log.last(), actions[-1])
+        self.assertEqual(log, actions)
+        self.assertRaises(IndexError, lambda: log[5])
+        self.assertRaises(IndexError, lambda: ActionLog()[0])
+        self.assertFalse(ActionLog())
+        self.assertIs(ActionLog.of(log), log)
+
+    def test_append(self):
+        """Appending leaves the log unchanged and shares it"""
+        log = ActionLog.of([PlayerActionTools.simple(Card.guard)])
+        first = log.append(PlayerActionTools.simple(Card.priest))
+        second = log.append(PlayerActionTools.simple(Card.baron))
+        self.assertEqual(len(log), 1)
+        self.assertIs(first.previous(), log)
+        self.assertIs(second.previous(), log)
+        self.assertNotEqual(first, second)
+
+    def test_since(self):
+        """Actions appended after a log, if extended from it"""
+        log = ActionLog.of([PlayerActionTools.simple(Card.guard)])
+        longer = log.append(PlayerActionTools.simple(Card.priest)) \
+            .append(PlayerActionTools.simple(Card.baron))
+        self.assertEqual(longer.since(log), [PlayerActionTools.simple(Card.baron),
+                                             PlayerActionTools.simple(Card.priest)])
+        self.assertEqual(log.since(log), [])
+        self.assertIsNone(longer.since(ActionLog.of(list(log))))
+        self.assertIsNone(log.since(longer))
+
+    def test_game_branches(self):
+        """Games moved to from a game share its history"""
+        game = Game.new(4, 451)
+        game = game._move(PlayerAction(Card.guard, 1, Card.priest, 0, 0, 0, 0))
+        branch_a = game._move(game.legal_actions().actions[0])
+        branch_b = game._move(game.legal_actions().actions[-1])
+        self.assertIs(branch_a._action_log.previous(), game._action_log)
+        self.assertIs(branch_b._action_log.previous(), game._action_log)
+        self.assertEqual(len(game._action_log), 1)
+
+    def test_game_list(self):
+        """Games still accept a list of actions"""
+        game = Game.new(4, 451)
+        actions = [PlayerAction(Card.guard, 1, Card.priest, 0, 0, 0, 0)]
+        copy = Game(game.deck(), game.players(), 1, actions)
+        self.assertEqual(copy._action_log, actions)
+        self.assertEqual(len(Game(game.deck(), game.players(), 0)._action_log), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
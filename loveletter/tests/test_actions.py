@@ -0,0 +1,121 @@
+"""Tests for the action tables"""
+
+import random
+import unittest
+
+import numpy as np
+
+from loveletter.actions import action_count, action_id, candidates, legal_actions
+from loveletter.actions import masked_argmax
+from loveletter.agents.agent import Agent
+from loveletter.card import Card
+from loveletter.compact_game import CompactGame
+from loveletter.game import Game
+from loveletter.player import PlayerAction
+
+
+class TestActions(unittest.TestCase):
+    """Candidate actions and legality lookups"""
+
+    def test_candidates(self):
+        """Candidates follow the documented index layout"""
+        actions = candidates(1)
+        self.assertEqual(len(actions), action_count(4))
+        self.assertEqual(action_count(2), 30)
+        self.assertEqual(actions[0], PlayerAction(Card.king, 1, 0, 0, 0, 1, 0))
+        self.assertEqual(actions[7], PlayerAction(Card.princess, 1, 0, 0, 0, 1, 0))
+        # guard on the next player guessing priest
+        self.assertEqual(actions[19], PlayerAction(Card.guard, 2, Card.priest, 0, 0, 1, 0))
+        # prince on the player before
+        self.assertEqual(actions[51], PlayerAction(Card.prince, 0, 0, 0, 0, 1, 0))
+
+    def test_eliminated(self):
+        """An eliminated player has no candidate actions"""
+        legal = legal_actions(Card.noCard, Card.guard, 0, 0b1110, 0)
+        self.assertEqual(legal.mask, 0)
+        self.assertEqual(legal.indices, ())
+        self.assertFalse(legal.array.any())
+
+    def test_matches_game(self):
+        """The lookup agrees with Game.is_action_valid"""
+        for seed in range(200):
+            rng = random.Random(seed)
+            game = Game.new(4, seed)
+            while game.active():
+                if not game.is_current_player_playing():
+                    game = game.skip_eliminated_player()
+                    continue
+                actions = candidates(game.player_turn())
+                legal = game.legal_actions()
+                valid = [idx for idx, action in enumerate(actions)
+                         if game.is_action_valid(action)]
+                self.assertEqual(legal.indices, tuple(valid))
+                self.assertEqual(legal.actions, tuple(actions[idx] for idx in valid))
+                self.assertListEqual(list(legal.array),
+                                     [1 if idx in valid else 0
+                                      for idx in range(len(actions))])
+                self.assertEqual(CompactGame.from_game(game).legal_actions(), legal)
+                game = game._move(rng.choice(Agent.valid_actions(game)))
+
+    def test_action_ids(self):
+        """Candidates map back to their lowest ID"""
+        for player_count in [2, 3, 4]:
+            for seat in range(player_count):
+                actions = candidates(seat, player_count)
+                for action in actions:
+                    self.assertEqual(action_id(action, player_count=player_count),
+                                     actions.index(action))
+        self.assertEqual(action_id(PlayerAction(Card.king, 1, 0, 0, 0, 1, 0)), 0)
+        self.assertEqual(action_id(PlayerAction(Card.guard, 2, Card.priest, 0, 0, 0, 0), 1), 19)
+        self.assertIsNone(action_id(PlayerAction(Card.guard, 2, Card.guard, 0, 0, 1, 0)))
+
+    def test_move_by_id(self):
+        """Games move the same with an action or its ID"""
+        for seed in range(50):
+            rng = random.Random(seed)
+            game = Game.new(4, seed)
+            while game.active():
+                if not game.is_current_player_playing():
+                    game = game.skip_eliminated_player()
+                    continue
+                action = rng.choice(Agent.valid_actions(game))
+                idx = game.action_id(action)
+                self.assertTrue(game.is_action_valid(idx))
+                by_action, reward = game.move(action)
+                by_id, reward_id = game.move(idx)
+                self.assertEqual(reward, reward_id)
+                self.assertEqual(by_id.players(), by_action.players())
+                self.assertEqual(by_id._action_log, by_action._action_log)
+                game = by_id
+
+    def test_invalid_id(self):
+        """Invalid IDs leave the game unchanged"""
+        game = Game.new(4, 451)
+        invalid = [idx for idx in range(action_count(4))
+                   if idx not in game.legal_actions().indices]
+        for idx in invalid + [-1, 52, 1000]:
+            self.assertFalse(game.is_action_valid(idx))
+            self.assertIs(game._move(idx), game)
+        self.assertRaises(Exception, game._move, invalid[0], True)
+
+    def test_read_only(self):
+        """Cached masks cannot be modified by callers"""
+        legal = Game.new().legal_actions()
+        with self.assertRaises(ValueError):
+            legal.array[0] = 1
+
+    def test_masked_argmax(self):
+        """Best legal index of each row"""
+        scores = np.array([[5., 1., 3., 9.],
+                           [0., -2., -1., 9.]])
+        legal = np.array([[0, 1, 1],
+                          [0, 1, 1]], dtype=np.int8)
+        self.assertListEqual(list(masked_argmax(scores, legal)), [2, 2])
+        game = Game.new(4, 451)
+        observation = game.observation()
+        best = masked_argmax(np.arange(60.), observation[:action_count(4)])
+        self.assertEqual(best, game.legal_actions().indices[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 
+import math
 import unittest
 from loveletter.arena import Arena
+from loveletter.agents.agent import Agent
 from loveletter.agents.random import AgentRandom
+from loveletter.game import Game
 
 
 class TestArenaNames(unittest.TestCase):
@@ -92,5 +95,171 @@ class TestArenaCsv(unittest.TestCase):
         ])
 
 
+class TestArenaWorkers(unittest.TestCase):
+    """Test the arena process pool"""
+
+    def test_compare_agents(self):
+        """Chunked games in workers win as often as serial games"""
+        serial = Arena.compare_agents(
+            lambda seed: AgentRandom(seed),
+            lambda seed: AgentRandom(seed + 1), 30, 7)
+        parallel = Arena.compare_agents(
+            lambda seed: AgentRandom(seed),
+            lambda seed: AgentRandom(seed + 1), 30, 7, workers=3)
+        self.assertEqual(serial, parallel)
+
+    def test_results(self):
+        """An arena with workers has the serial results"""
+        agents = [
+            ("Random A", lambda seed: AgentRandom(seed)),
+            ("Random B", lambda seed: AgentRandom(seed + 3)),
+            ("Random C", lambda seed: AgentRandom(seed * 2))
+        ]
+        self.assertListEqual(Arena(agents, 20).results(),
+                             Arena(agents, 20, workers=4).results())
+
+    def test_seed_chunks(self):
+        """Chunks cover every seed once"""
+        for games, workers in [(1, 1), (10, 1), (101, 4), (5, 8)]:
+            chunks = Arena._seed_chunks(451, games, workers)
+            seeds = [seed for start, stop in chunks
+                     for seed in range(start, stop)]
+            self.assertListEqual(seeds, list(range(451, 451 + games)))
+
+
+class TestArenaAgents(unittest.TestCase):
+    """Test the arena agent lifecycle"""
+
+    def test_created_once(self):
+        """Reusable agents are created once and reset for every game"""
+        created = []
+
+        def create(seed):
+            created.append(seed)
+            return AgentReusable(seed)
+
+        wins = Arena.compare_agents(create, lambda seed: AgentRandom(seed), 20, 3)
+        self.assertListEqual(created, [3])
+        self.assertEqual(wins, sum(sum(deal) for deal in Arena._play_games(
+            create, lambda seed: AgentRandom(seed), 3, 23)[0]))
+
+    def test_created_per_game(self):
+        """Other agents are created for every game with the lambda's seed"""
+        created = []
+
+        def create(seed):
+            created.append(seed)
+            return AgentRandom(seed + 1000)
+
+        wins = Arena.compare_agents(create, lambda seed: AgentRandom(seed), 20, 3)
+        self.assertListEqual(created, list(range(3, 23)))
+        self.assertNotEqual(wins, Arena.compare_agents(
+            lambda seed: AgentRandom(seed), lambda seed: AgentRandom(seed), 20, 3))
+
+
+class AgentReusable(AgentRandom):
+    """Random agent the arena resets between games"""
+
+    reusable = True
+
+
+class AgentHashed(Agent):
+    """Picks a legal action from the position alone"""
+
+    def __init__(self, offset=0):
+        self._offset = offset
+
+    def _move(self, game):
+        actions = Agent.valid_actions(game)
+        return actions[(game.zobrist_hash() + self._offset) % len(actions)]
+
+
+class TestArenaBatched(unittest.TestCase):
+    """Test the arena playing concurrent games"""
+
+    def test_move_batch(self):
+        """Agents move in many games at once"""
+        games = [Game.new(4, seed) for seed in range(5)]
+        agent = AgentHashed()
+        self.assertListEqual(agent.move_batch(games),
+                             [agent.move(game) for game in games])
+
+    def test_serial(self):
+        """Concurrent games have the serial results"""
+        pair = (lambda seed: AgentHashed(), lambda seed: AgentHashed(1))
+        for rotations in [Arena.rotations(), Arena.rotations(True, True)]:
+            serial = Arena._play_games(pair[0], pair[1], 3, 23, rotations, {})
+            for concurrent_games in [2, 7, 64]:
+                self.assertListEqual(
+                    Arena._play_games(pair[0], pair[1], 3, 23, rotations, {},
+                                      concurrent_games)[0], serial[0])
+
+    def test_arena(self):
+        """Arenas with concurrent games and workers"""
+        agents = [("Hashed", lambda seed: AgentHashed()),
+                  ("Hashed 1", lambda seed: AgentHashed(1))]
+        self.assertListEqual(
+            Arena(agents, 20).results(),
+            Arena(agents, 20, workers=2, concurrent_games=8).results())
+
+
+class TestArenaDuplicate(unittest.TestCase):
+    """Test the arena duplicate deals"""
+
+    def test_deal(self):
+        """Shifted deals move the hands and keep the draw pile"""
+        game = Arena._deal(451)
+        shifted = Arena._deal(451, 1)
+        hands = [player.hand_card for player in game.players()]
+        self.assertListEqual([player.hand_card for player in shifted.players()],
+                             hands[-1:] + hands[:-1])
+        self.assertListEqual(list(shifted.deck()), list(game.deck()))
+
+    def test_rotations(self):
+        """Games played per deal"""
+        self.assertEqual(Arena.rotations(), ((0, 0),))
+        self.assertEqual(len(Arena.rotations(True)), 4)
+        self.assertEqual(len(set(Arena.rotations(True, True))), 16)
+
+    def test_compare_agents(self):
+        """Every deal is played from every seat"""
+        comparison = Arena.compare_agents_duplicate(
+            lambda seed: AgentRandom(seed),
+            lambda seed: AgentRandom(seed + 1), 10, 7)
+        self.assertEqual(comparison.games, 40)
+        self.assertAlmostEqual(comparison.win_rate, comparison.wins / 40)
+        self.assertGreater(comparison.stderr, 0)
+        self.assertEqual(comparison, Arena.compare_agents_duplicate(
+            lambda seed: AgentRandom(seed),
+            lambda seed: AgentRandom(seed + 1), 10, 7, workers=3))
+
+    def test_permute_hands(self):
+        """Every hand is played from every seat"""
+        comparison = Arena.compare_agents_duplicate(
+            lambda seed: AgentRandom(seed),
+            lambda seed: AgentRandom(seed + 1), 3, 7, permute_hands=True)
+        self.assertEqual(comparison.games, 48)
+        self.assertEqual(comparison.deals, 3)
+
+    def test_arena(self):
+        """Duplicate arenas count the games of every deal"""
+        arena = Arena([
+            ("Random A", lambda seed: AgentRandom(seed)),
+            ("Random B", lambda seed: AgentRandom(seed + 3))
+        ], 5, duplicate=True)
+        comparisons = arena.comparisons()
+        self.assertEqual(len(comparisons), 3)
+        self.assertEqual(comparisons[1][2].games, 20)
+        self.assertEqual(arena.results()[1][2], comparisons[1][2].wins)
+        self.assertEqual(arena.csv_results_lists()[0][2],
+                         1 - comparisons[1][2].wins / 20)
+
+    def test_stderr(self):
+        """Standard error of the per deal win rates"""
+        comparison = Arena._comparison([1, 0, 1, 0], 1)
+        self.assertEqual(comparison, (2, 4, 0.5, math.sqrt(1 / 12), 4))
+        self.assertTrue(math.isnan(Arena._comparison([2], 4).stderr))
+
+
 if __name__ == '__main__':
     unittest.main()
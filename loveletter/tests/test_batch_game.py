@@ -0,0 +1,152 @@
+"""Tests for the vectorized batch of Love Letter games"""
+
+import unittest
+
+import numpy as np
+
+from loveletter.actions import action_count
+from loveletter.batch_game import BatchGame
+from loveletter.card import Card
+from loveletter.game import Game
+from loveletter.player import PlayerTools
+
+
+class TestBatchGame(unittest.TestCase):
+    """Batch games match scalar games dealt from the same seeds"""
+
+    def assert_same(self, batch, games):
+        """Compare each slot of the batch to its scalar game"""
+        hands = batch.hands()
+        turns = batch.player_turns()
+        active = batch.active()
+        discards = batch.discards()
+        defended = batch.defended()
+        logs, lengths = batch.action_logs()
+        for idx, game in enumerate(games):
+            players = game.players()
+            self.assertListEqual(list(hands[idx]),
+                                 [player.hand_card for player in players])
+            for seat, player in enumerate(players):
+                self.assertListEqual(list(discards[idx, seat]),
+                                     Game.player_to_discards(player))
+                self.assertEqual(defended[idx, seat],
+                                 PlayerTools.is_defended(player))
+            self.assertEqual(active[idx], game.active())
+            self.assertEqual(batch.cards_left()[idx], game.cards_left())
+            self.assertEqual(lengths[idx], len(game._action_log))
+            for row, action in zip(logs[idx], game._action_log):
+                self.assertListEqual(list(row), list(action))
+            if game.active():
+                self.assertEqual(turns[idx], game.player_turn())
+                self.assertEqual(batch.draw_cards()[idx], game.draw_card())
+
+    def test_new(self):
+        """Slots are dealt like Game.new"""
+        batch = BatchGame(8, 451)
+        self.assertEqual(batch.action_count(), action_count(4))
+        self.assert_same(batch, [Game.new(4, 451 + idx) for idx in range(8)])
+        self.assertListEqual(list(batch.winners()), [-1] * 8)
+
+    def test_cross_check(self):
+        """Random legal actions give the same games as Game._move"""
+        count = 64
+        rng = np.random.RandomState(3)
+        batch = BatchGame(count, 100, auto_reset=False)
+        games = [Game.new(4, 100 + idx) for idx in range(count)]
+
+        while batch.active().any():
+            mask = batch.legal_mask()
+            turns = batch.player_turns()
+            for idx, game in enumerate(games):
+                if not game.active():
+                    self.assertFalse(mask[idx].any())
+                    continue
+                valid = [game.is_action_valid(batch.decode(action, turns[idx]))
+                         for action in range(batch.action_count())]
+                self.assertListEqual(list(mask[idx]), valid)
+
+            keys = rng.uniform(size=mask.shape)
+            keys[~mask] = -1
+            actions = keys.argmax(axis=1)
+            valid, _ = batch.step(actions)
+
+            for idx, game in enumerate(games):
+                if valid[idx]:
+                    game = game._move(
+                        batch.decode(actions[idx], game.player_turn()))
+                    while game.active() and not game.is_current_player_playing():
+                        game = game.skip_eliminated_player()
+                    games[idx] = game
+            self.assert_same(batch, games)
+
+        self.assertListEqual(list(batch.winners()),
+                             [game.winner() for game in games])
+        self.assertEqual(batch.games_played(), count)
+
+    def test_observations(self):
+        """Every active game is encoded as its scalar game"""
+        count = 64
+        rng = np.random.RandomState(5)
+        batch = BatchGame(count, 200, auto_reset=False)
+        games = [Game.new(4, 200 + idx) for idx in range(count)]
+
+        while batch.active().any():
+            observations = batch.observations()
+            counts = batch.observations(
+                out=np.zeros(observations.shape, dtype=np.uint8))
+            for idx, game in enumerate(games):
+                if game.active():
+                    np.testing.assert_array_equal(observations[idx],
+                                                  game.observation())
+                    np.testing.assert_array_equal(
+                        counts[idx],
+                        game.observation(out=np.zeros(1396, dtype=np.uint8)))
+                else:
+                    self.assertFalse(observations[idx, :action_count(4)].any())
+
+            mask = batch.legal_mask()
+            keys = rng.uniform(size=mask.shape)
+            keys[~mask] = -1
+            actions = keys.argmax(axis=1)
+            valid, _ = batch.step(actions)
+            for idx, game in enumerate(games):
+                if valid[idx]:
+                    game = game._move(
+                        batch.decode(actions[idx], game.player_turn()))
+                    while game.active() and not game.is_current_player_playing():
+                        game = game.skip_eliminated_player()
+                    games[idx] = game
+
+    def test_auto_reset(self):
+        """Finished games are dealt again from the next seed"""
+        batch = BatchGame(2, 10)
+        seeds_before = batch.seeds()
+        self.assertListEqual(list(seeds_before), [10, 11])
+
+        rng = np.random.RandomState(0)
+        while batch.games_played() == 0:
+            mask = batch.legal_mask()
+            keys = rng.uniform(size=mask.shape)
+            keys[~mask] = -1
+            _, done = batch.step(keys.argmax(axis=1))
+
+        finished = np.flatnonzero(done)
+        self.assertEqual(batch.seeds()[finished[0]], 12)
+        self.assertNotEqual(batch.winners()[finished[0]], -1)
+        self.assertTrue(batch.active().all())
+        self.assertEqual(batch.hands()[finished[0]][0],
+                         Game.new(4, 12).players()[0].hand_card)
+
+    def test_invalid_action(self):
+        """Invalid actions leave the game untouched"""
+        batch = BatchGame(1, 451)
+        # princess is not in the opening hand of seed 451
+        self.assertEqual(batch.decode(7, 0).discard, Card.princess)
+        valid, done = batch.step([7])
+        self.assertFalse(valid[0])
+        self.assertFalse(done[0])
+        self.assertEqual(batch.turn_indices()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Tests for deck generation"""
+
+import unittest
+
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.game import Game
+from loveletter.player import PlayerAction
+
+
+def legacy_shuffle_deck(seed):
+    """Deck shuffled with the global numpy random state"""
+    deck = np.array([card + 1 for card, count in enumerate(Card.counts)
+                     for _ in range(count)])
+    np.random.seed(seed=seed)
+    np.random.shuffle(deck)
+    return deck
+
+
+class TestDecks(unittest.TestCase):
+    """Shuffling decks"""
+
+    def test_shuffle_deck(self):
+        """Seeds deal the same decks as before, without global state"""
+        for seed in [0, 1, 451, 4999999]:
+            expected = legacy_shuffle_deck(seed)
+            np.random.seed(7)
+            state = np.random.get_state()[1].copy()
+            np.testing.assert_array_equal(Card.shuffle_deck(seed), expected)
+            np.testing.assert_array_equal(np.random.get_state()[1], state)
+
+    def test_shuffle_decks(self):
+        """Rows are the decks of their seeds"""
+        seeds = np.arange(100, 140)
+        decks = Card.shuffle_decks(seeds)
+        self.assertEqual(decks.shape, (40, 16))
+        for deck, seed in zip(decks, seeds):
+            np.testing.assert_array_equal(deck, Card.shuffle_deck(int(seed)))
+
+    def test_random_decks(self):
+        """Random decks are permutations of the cards"""
+        rngs = [np.random.RandomState(3)]
+        if hasattr(np.random, 'default_rng'):
+            rngs.append(np.random.default_rng(3))
+        for rng in rngs:
+            decks = Card.random_decks(50, rng)
+            self.assertEqual(decks.shape, (50, 16))
+            np.testing.assert_array_equal(np.sort(decks, axis=1),
+                                          np.tile(Card.ordered_deck, (50, 1)))
+            self.assertGreater(len(set(map(tuple, decks))), 1)
+        np.testing.assert_array_equal(
+            Card.random_decks(5, np.random.RandomState(3)),
+            Card.random_decks(5, np.random.RandomState(3)))
+
+    def test_shared_deck(self):
+        """Moves share the deck and advance the cursor"""
+        game = Game.new(4, 451)
+        game_next = game._move(PlayerAction(Card.guard, 1, Card.priest, 0, 0, 0, 0))
+        self.assertIs(game_next._deck, game._deck)
+        self.assertEqual(game_next.cards_left(), game.cards_left() - 1)
+        np.testing.assert_array_equal(game_next.deck(), game.deck()[1:])
+        self.assertFalse(game.deck().flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Tests for the compact Love Letter game state"""
+
+import random
+import unittest
+
+from loveletter.agents.agent import Agent
+from loveletter.card import Card
+from loveletter.compact_game import CompactGame
+from loveletter.game import Game
+from loveletter.player import PlayerAction
+
+
+def all_actions(player_turn, player_count=4):
+    """Every action a player could attempt, valid or not"""
+    return [PlayerAction(discard, target, guess, 0, 0, player_turn, 0)
+            for discard in range(1, 9)
+            for target in range(player_count)
+            for guess in range(9)]
+
+
+class TestCompactGame(unittest.TestCase):
+    """Compact game matches the reference Game"""
+
+    def assert_same(self, game, compact):
+        """Compare every observable part of both engines"""
+        self.assertListEqual(game.players(), compact.players())
+        self.assertListEqual(list(game.deck()), list(compact.deck()))
+        self.assertEqual(game.turn_index(), compact.turn_index())
+        self.assertEqual(game.active(), compact.active())
+        self.assertEqual(game.winner(), compact.winner())
+        self.assertEqual(game.draw_card(), compact.draw_card())
+        self.assertListEqual(game.opponent_turn(), compact.opponent_turn())
+        self.assertListEqual(list(game._action_log), compact.action_log())
+
+    def test_new(self):
+        """Getting a new game"""
+        game = CompactGame.new()
+        self.assertEqual(game.draw_card(), Card.guard)
+        self.assertEqual(game.round(), 0)
+        self.assertEqual(game.player_turn(), 0)
+        self.assertEqual(game.cards_left(), 11)
+        self.assertTrue(game.active())
+        self.assertFalse(game.over())
+        self.assert_same(Game.new(), game)
+
+    def test_random_games(self):
+        """Random games play out identically on both engines"""
+        for seed in range(150):
+            rng = random.Random(seed)
+            game = Game.new(4, seed)
+            compact = CompactGame.new(4, seed)
+            while game.active():
+                if not game.is_current_player_playing():
+                    game = game.skip_eliminated_player()
+                    compact = compact.skip_eliminated_player()
+                else:
+                    for action in all_actions(game.player_turn()):
+                        self.assertEqual(game.is_action_valid(action),
+                                         compact.is_action_valid(action))
+                    action = rng.choice(Agent.valid_actions(game))
+                    game, reward = game.move(action)
+                    compact, reward_compact = compact.move(action)
+                    self.assertEqual(reward, reward_compact)
+                self.assert_same(game, compact)
+
+    def test_from_game(self):
+        """Converting a game part way through keeps the state"""
+        rng = random.Random(7)
+        game = Game.new(4, 7)
+        for _ in range(5):
+            game = game.skip_eliminated_player()
+            game, _ = game.move(rng.choice(Agent.valid_actions(game)))
+
+        compact = CompactGame.from_game(game)
+        self.assert_same(game, compact)
+        self.assert_same(compact.to_game(), compact)
+
+    def test_shared_slots(self):
+        """A move only rebuilds the slots of the players it changes"""
+        rng = random.Random(3)
+        compact = CompactGame.new(4, 3)
+        while compact.active():
+            if not compact.is_current_player_playing():
+                compact = compact.skip_eliminated_player()
+                continue
+            compact_next = compact._move(
+                rng.choice(Agent.valid_actions(compact.to_game())))
+            for idx in range(4):
+                if compact_next._counts[idx] == compact._counts[idx]:
+                    self.assertIs(compact_next._slots[idx],
+                                  compact._slots[idx])
+            compact = compact_next
+
+    def test_invalid_move(self):
+        """Invalid moves leave the game untouched or throw"""
+        game = CompactGame.new()
+        action = PlayerAction(Card.princess, 0, 0, 0, 0, 0, 0)
+        self.assertIs(game._move(action), game)
+        with self.assertRaises(Exception):
+            game._move(action, throw=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
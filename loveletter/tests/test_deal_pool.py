@@ -0,0 +1,77 @@
+"""Tests for the pool of pre-shuffled decks"""
+
+import unittest
+
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.deal_pool import DealPool
+from loveletter.game import Game
+
+
+def dealt(pool, count):
+    """Stack of the next count decks of a pool"""
+    return np.stack([pool.deck() for _ in range(count)])
+
+
+class TestDealPool(unittest.TestCase):
+    """Decks come in a reproducible sequence per seed"""
+
+    def test_reproducible(self):
+        """Same seed, same decks, whatever the block size and thread"""
+        pools = [DealPool(7, 16), DealPool(7, 16, background=False),
+                 DealPool(7, 5, background=False), DealPool(8, 16)]
+        try:
+            decks = [dealt(pool, 40) for pool in pools]
+        finally:
+            for pool in pools:
+                pool.close()
+        np.testing.assert_array_equal(decks[0], decks[1])
+        # the Generator is drawn in order, blocks only batch the draws
+        np.testing.assert_array_equal(decks[0], decks[2])
+        self.assertFalse((decks[0] == decks[3]).all())
+        np.testing.assert_array_equal(
+            decks[0][:16], Card.random_decks(16, np.random.default_rng(7)))
+
+    def test_decks(self):
+        """Every deck is a shuffle of the full deck, read only"""
+        pool = DealPool(3, 8, background=False)
+        for deck in dealt(pool, 20):
+            np.testing.assert_array_equal(np.sort(deck), Card.ordered_deck)
+        self.assertFalse(pool.deck().flags.writeable)
+        pool.close()
+
+    def test_game(self):
+        """Games are dealt from the next deck"""
+        pool = DealPool(3, 8, background=False)
+        deck = DealPool(3, 8, background=False).deck()
+        game = pool.game()
+        self.assertListEqual(list(game._deck), list(deck))
+        self.assertListEqual([player.hand_card for player in game.players()],
+                             list(deck[:4]))
+        self.assertEqual(game.draw_card(), deck[4])
+        self.assertListEqual(
+            list(Game.from_deck(Card.shuffle_deck(11))._deck),
+            list(Game.new(4, 11)._deck))
+
+    def test_closed(self):
+        """A closed pool deals no more games"""
+        for background in [True, False]:
+            pool = DealPool(3, 8, background=background)
+            pool.deck()
+            pool.close()
+            with self.assertRaises(Exception):
+                pool.deck()
+
+    def test_collected(self):
+        """The thread of a pool that is never closed stops with the pool"""
+        pool = DealPool(3, 8)
+        pool.deck()
+        thread = pool._thread
+        del pool
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""Tests for the state encoding tables"""
+
+import random
+import unittest
+
+import numpy as np
+
+from loveletter.agents.agent import Agent
+from loveletter.encoding import (PACKED_SIZE, ActionLogEncoder, encode_action,
+                                 observation_size, pack_observations,
+                                 unpack_observations)
+from loveletter.game import Game
+from loveletter.player import PlayerAction
+
+
+def reference_action_log(game, observing_player):
+    """Action log encoded one action at a time, as Game originally did"""
+    def relative(idx):
+        return (idx - observing_player) % len(game.players())
+
+    log = []
+    for action in reversed(game._action_log):
+        player = np.zeros(4)
+        player[relative(action.player)] = 1
+        played_card = np.zeros(8)
+        played_card[action.discard - 1] = 1
+        target = np.zeros(4)
+        target[relative(action.player_target)] = 1
+        guessed_card = np.zeros(8)
+        if action.guess > 0:
+            guessed_card[action.guess - 1] = 1
+        force_discard = np.zeros(32)
+        if action.force_discarded > 0:
+            force_discard[relative(action.force_discarder) * 8 +
+                          action.force_discarded - 1] = 1
+        revealed_card = np.zeros(32)
+        if action.revealed_card > 0:
+            revealed_card[relative(action.player_target) * 8 +
+                          action.revealed_card - 1] = 1
+        log.append(np.concatenate([player, played_card, target, guessed_card,
+                                   force_discard, revealed_card]))
+    if len(log) == 0:
+        return np.zeros(15 * 88)
+    return np.pad(np.array(log), ((0, 15 - len(log)), (0, 0)),
+                  'constant').flatten()
+
+
+def played_games(count):
+    """Every state of `count` random games"""
+    for seed in range(count):
+        rng = random.Random(seed)
+        game = Game.new(4, seed)
+        states = [game]
+        while game.active():
+            if not game.is_current_player_playing():
+                game = game.skip_eliminated_player()
+                continue
+            game = game._move(rng.choice(Agent.valid_actions(game)))
+            states.append(game)
+        yield states
+
+
+class TestEncoding(unittest.TestCase):
+    """Action log encoding"""
+
+    def test_row(self):
+        """A row sets one bit per encoded field"""
+        action = PlayerAction(1, 3, 5, 0, 5, 2, 3)
+        row = encode_action(action, 2)
+        self.assertEqual(row.shape, (88,))
+        self.assertEqual(row.sum(), 5)
+        self.assertEqual(row[0], 1)
+        self.assertEqual(row[4], 1)
+        self.assertEqual(row[13], 1)
+        self.assertEqual(row[20], 1)
+        self.assertEqual(row[24 + 8 + 4], 1)
+        self.assertFalse(row.flags.writeable)
+
+    def test_state_action_log(self):
+        """Table encoding is byte identical to encoding each action"""
+        for states in played_games(30):
+            for game in states:
+                for observer in range(4):
+                    expected = reference_action_log(game, observer)
+                    encoded = game.state_action_log(observer)
+                    self.assertEqual(encoded.dtype, expected.dtype)
+                    self.assertEqual(encoded.tobytes(), expected.tobytes())
+
+    def test_encoder(self):
+        """Incremental encoding is byte identical, also across games"""
+        encoder = ActionLogEncoder()
+        games = list(played_games(20))
+        for states in games + [list(reversed(states)) for states in games]:
+            for game in states:
+                observer = game.player_turn()
+                expected = reference_action_log(game, observer)
+                encoded = game.state_action_log(observer, encoder=encoder)
+                self.assertEqual(encoded.tobytes(), expected.tobytes())
+
+    def test_state(self):
+        """Game.state is the same with and without an encoder"""
+        encoder = ActionLogEncoder()
+        for states in played_games(5):
+            for game in states:
+                self.assertEqual(game.state(encoder=encoder).tobytes(),
+                                 game.state().tobytes())
+
+    def test_state_out(self):
+        """Writing into a buffer matches Game.state"""
+        out = np.ones(1344)
+        for states in played_games(5):
+            for game in states:
+                expected = game.state()
+                self.assertIs(game.state(out=out), out)
+                self.assertEqual(out.tobytes(), expected.tobytes())
+
+    def test_observation(self):
+        """Observation is the action mask followed by the state"""
+        encoder = ActionLogEncoder()
+        batch = np.ones((3, 1396), dtype=np.float32)
+        for states in played_games(5):
+            for game in states:
+                expected = np.concatenate([game.legal_actions().array,
+                                           game.state()]).astype(np.float32)
+                self.assertEqual(game.observation().dtype, np.float32)
+                np.testing.assert_array_equal(game.observation(), expected)
+                game.observation(out=batch[1], encoder=encoder)
+                np.testing.assert_array_equal(batch[1], expected)
+        self.assertTrue((batch[0] == 1).all())
+
+    def test_observation_integer(self):
+        """Integer buffers hold consumed card counts"""
+        game = Game.new(4, 3)
+        out = game.observation(out=np.zeros(1396, dtype=np.uint8))
+        self.assertEqual(out[52:68].sum(), 2)
+        self.assertEqual(out[68:76].sum(), 2)
+        self.assertEqual(out[76:].sum(), 0)
+
+
+    def test_observation_formats(self):
+        """uint8 and packed observations unpack to the float32 observation"""
+        for states in played_games(5):
+            expected = np.stack([game.observation() for game in states])
+            counts = np.stack([game.observation(out=np.zeros(1396, dtype=np.uint8))
+                               for game in states])
+            packed = pack_observations(counts)
+            self.assertEqual(packed.shape, (len(states), PACKED_SIZE))
+            self.assertEqual(packed.dtype, np.uint8)
+            for observations, observation_format in [(expected, 'float32'),
+                                                     (counts, 'uint8'),
+                                                     (packed, 'packed')]:
+                unpacked = unpack_observations(observations, observation_format)
+                self.assertEqual(unpacked.dtype, np.float32)
+                np.testing.assert_array_equal(unpacked, expected)
+            np.testing.assert_array_equal(
+                unpack_observations(packed[0], 'packed'), expected[0])
+
+    def test_observation_size(self):
+        """Packed observations are an eighth of the size"""
+        self.assertEqual(observation_size('float32'), 1396)
+        self.assertEqual(observation_size('uint8'), 1396)
+        self.assertEqual(observation_size('packed'), 176)
+        with self.assertRaises(Exception):
+            observation_size('float64')
+
+
+if __name__ == '__main__':
+    unittest.main()
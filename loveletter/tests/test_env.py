@@ -0,0 +1,103 @@
+"""Tests for the action helpers of the Love Letter environment"""
+
+import random
+import unittest
+
+import numpy as np
+
+from loveletter.actions import action_count, candidates
+from loveletter.agents.agent import Agent
+from loveletter.deal_pool import DealPool
+from loveletter.game import Game
+
+try:
+    import gym
+except ImportError:
+    gym = None
+
+
+def decision_points(count):
+    """Games of random play at every point where a player has to act"""
+    for seed in range(count):
+        rng = random.Random(seed)
+        game = Game.new(4, seed)
+        while game.active():
+            if not game.is_current_player_playing():
+                game = game.skip_eliminated_player()
+                continue
+            yield game
+            game = game._move(rng.choice(Agent.valid_actions(game)))
+
+
+@unittest.skipIf(gym is None, "needs gym")
+class TestLoveLetterEnvActions(unittest.TestCase):
+    """Actions chosen by index and by score"""
+
+    def setUp(self):
+        from loveletter.env import LoveLetterEnv
+        self.env = LoveLetterEnv(None, 451)
+
+    def test_action_by_score(self):
+        """Highest scoring valid action, as scanning every candidate"""
+        rng = np.random.RandomState(0)
+        for game in decision_points(10):
+            scores = rng.uniform(size=action_count(4))
+            expected = max((score, idx) for idx, (action, score) in
+                           enumerate(zip(candidates(game.player_turn()), scores))
+                           if game.is_action_valid(action))
+            action, score, idx = self.env.action_by_score(list(scores), game)
+            self.assertEqual((score, idx), expected)
+            self.assertEqual(action, candidates(game.player_turn())[idx])
+
+    def test_action_from_index(self):
+        """Valid candidate of an index, None when invalid or out of range"""
+        for game in decision_points(10):
+            for idx in range(-1, action_count(4) + 1):
+                action = self.env.action_from_index(idx, game)
+                if 0 <= idx < action_count(4) and \
+                        game.is_action_valid(candidates(game.player_turn())[idx]):
+                    self.assertEqual(action, candidates(game.player_turn())[idx])
+                else:
+                    self.assertIsNone(action)
+
+
+@unittest.skipIf(gym is None, "needs gym")
+class TestLoveLetterEnvObservations(unittest.TestCase):
+    """Observations returned stay valid after later steps"""
+
+    def test_not_overwritten(self):
+        """reset and step return new arrays"""
+        from loveletter.env import LoveLetterEnv
+        env = LoveLetterEnv(None, 451)
+        observation = env.reset()
+        before = observation.copy()
+        stepped, _, _, _ = env.step(int(observation[:action_count(4)].argmax()))
+        self.assertIsNot(stepped, observation)
+        np.testing.assert_array_equal(observation, before)
+
+
+@unittest.skipIf(gym is None, "needs gym")
+class TestLoveLetterEnvDealPool(unittest.TestCase):
+    """Resets deal from a pool seeded with the env's seed"""
+
+    def test_reset(self):
+        """Games follow the pool of the seed"""
+        from loveletter.env import LoveLetterEnv
+        env = LoveLetterEnv(None, 5, deal_pool=True)
+        pool = DealPool(5, background=False)
+        # the env deals twice while it is created
+        pool.deck()
+        pool.deck()
+        try:
+            for _ in range(5):
+                np.testing.assert_array_equal(env.reset(),
+                                              pool.game().observation())
+            env.seed(6)
+            np.testing.assert_array_equal(
+                env.reset(), DealPool(6, background=False).game().observation())
+        finally:
+            env.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Tests for the self-play Love Letter environment"""
+
+import unittest
+
+import numpy as np
+
+from loveletter.actions import action_count
+from loveletter.encoding import STATE_SIZE, unpack_observations
+from loveletter.game import Game
+from loveletter.multi_agent_env import LoveLetterMultiAgentEnv
+from loveletter.vec_env import REWARD_INVALID_ACTION, REWARD_LOSE, REWARD_WIN
+
+
+def random_action(rng, observation):
+    """Random legal action of an observation"""
+    return int(rng.choice(np.flatnonzero(observation[:action_count(4)])))
+
+
+class TestLoveLetterMultiAgentEnv(unittest.TestCase):
+    """Every seat plays and is rewarded once per game"""
+
+    def test_games(self):
+        """Agents act in turn on their own observations"""
+        env = LoveLetterMultiAgentEnv(7)
+        rng = np.random.RandomState(0)
+        for _ in range(20):
+            env.reset()
+            game = env._game
+            final = {}
+            moves = 0
+            for agent in env.agent_iter():
+                observation, reward, done, info = env.last()
+                if done:
+                    self.assertNotIn(agent, final)
+                    final[agent] = reward
+                    env.step(None)
+                    continue
+                self.assertEqual(agent, 'player_{}'.format(game.player_turn()))
+                self.assertEqual(reward, 0)
+                np.testing.assert_array_equal(observation, game.observation())
+                action = random_action(rng, observation)
+                env.step(action)
+                game, _ = game.move(action)
+                while game.active() and not game.is_current_player_playing():
+                    game = game.skip_eliminated_player()
+                self.assertEqual(env.infos[agent]['round'], game.round())
+                moves += 1
+
+            self.assertTrue(game.over())
+            self.assertEqual(moves, len(game._action_log))
+            self.assertEqual(sorted(final), env.possible_agents)
+            self.assertDictEqual(final, {
+                'player_{}'.format(seat):
+                REWARD_WIN if seat == game.winner() else REWARD_LOSE
+                for seat in range(4)})
+            self.assertListEqual(env.agents, [])
+
+    def test_observe_between_turns(self):
+        """Waiting seats see their card and the log relative to them"""
+        env = LoveLetterMultiAgentEnv(3)
+        rng = np.random.RandomState(1)
+        for _ in range(3):
+            env.step(random_action(rng, env.last()[0]))
+        game = env._game
+        for seat, agent in enumerate(env.possible_agents):
+            if seat == game.player_turn():
+                continue
+            observation = env.observe(agent)
+            self.assertFalse(observation[:action_count(4)].any())
+            state = observation[action_count(4):]
+            hand_card = game.players()[seat].hand_card
+            self.assertListEqual(list(np.flatnonzero(state[:16])),
+                                 [hand_card - 1] if hand_card else [])
+            np.testing.assert_array_equal(
+                state[24:], game.state_action_log(seat).astype(np.float32))
+            self.assertEqual(len(state), STATE_SIZE)
+
+    def test_invalid_action(self):
+        """An invalid action ends the game for every agent"""
+        env = LoveLetterMultiAgentEnv(451)
+        agent = env.agent_selection
+        env.step(1000)
+        self.assertTrue(all(env.dones.values()))
+        self.assertEqual(env.last()[1], REWARD_INVALID_ACTION)
+        self.assertEqual(env.agent_selection, agent)
+        with self.assertRaises(Exception):
+            env.step(0)
+        rewards = []
+        for _ in env.agent_iter():
+            rewards.append(env.last()[1])
+            env.step(None)
+        self.assertListEqual(sorted(rewards), [REWARD_INVALID_ACTION, 0, 0, 0])
+
+    def test_packed(self):
+        """Packed observations unpack to the float32 observation"""
+        env = LoveLetterMultiAgentEnv(5, 'packed')
+        observation = env.last()[0]
+        self.assertEqual(observation.shape, (176,))
+        game = Game.new(4, int(np.random.default_rng(5).integers(5000000)))
+        np.testing.assert_array_equal(
+            unpack_observations(observation, 'packed'), game.observation())
+
+
+if __name__ == '__main__':
+    unittest.main()
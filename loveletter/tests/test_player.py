@@ -40,6 +40,29 @@ class TestPlayer(unittest.TestCase):
         for action in player_next.actions[1:]:
             self.assertTrue(PlayerActionTools.is_blank(action))
 
+    def test_discard_fields(self):
+        """Discard count, last discard and protection follow moves"""
+        player = PlayerTools.blank(1)
+        self.assertEqual((player.discard_count, player.last_discard,
+                          player.defended), (0, 0, False))
+        player = PlayerTools.move(player, 2, PlayerActionTools.simple(4))
+        self.assertEqual((player.discard_count, player.last_discard,
+                          player.defended), (1, 4, True))
+        self.assertTrue(PlayerTools.is_defended(player))
+        player = PlayerTools.force_discard(player)
+        self.assertEqual((player.discard_count, player.last_discard,
+                          player.defended), (2, 2, False))
+        self.assertEqual(Player(player.hand_card, player.actions), player)
+
+    def test_full(self):
+        """Moving with all slots used raises"""
+        player = PlayerTools.blank(1)
+        for _ in range(8):
+            player = PlayerTools.move(player, 1, PlayerActionTools.simple(1))
+        self.assertEqual(player.discard_count, 8)
+        self.assertRaises(Exception, PlayerTools.move, player, 1,
+                          PlayerActionTools.simple(1))
+
     def test_to_np(self):
         """Player to a numpy array"""
         player = Player(1, [
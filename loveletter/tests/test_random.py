@@ -5,6 +5,7 @@ import unittest
 from loveletter.agents.agent import Agent
 from loveletter.agents.random import AgentRandom
 from loveletter.card import Card
+from loveletter.game import Game
 from loveletter.tests.test_games import TestGames
 from loveletter.player import PlayerAction
 
@@ -38,5 +39,13 @@ class TestRandomAgent(unittest.TestCase):
                                               guess=0,
                                               revealed_card=0))
 
+    def test_reset(self):
+        """A reset agent plays as one created with the seed"""
+        agent = AgentRandom(4)
+        game = Game.new(4, 9)
+        agent.move(game)
+        self.assertIs(agent.reset(11), agent)
+        self.assertEqual(agent.move(game), AgentRandom(11).move(game))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,45 @@
+"""Tests for the agent registry"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+from loveletter.agents import registry
+from loveletter.agents.random import AgentRandom
+
+
+class TestRegistry(unittest.TestCase):
+    """Agent classes by name"""
+
+    def test_load(self):
+        """Registered names load their class"""
+        self.assertIn('Random', registry.names())
+        self.assertIn('A3C', registry.names())
+        self.assertIs(registry.load('Random'), AgentRandom)
+        self.assertRaises(Exception, registry.load, 'Nobody')
+
+    def test_register(self):
+        """Added agents load like the built in ones"""
+        registry.register('Random copy', 'loveletter.agents.random:AgentRandom')
+        self.assertIs(registry.load('Random copy'), AgentRandom)
+        self.assertEqual(registry.path('Random copy'),
+                         'loveletter.agents.random:AgentRandom')
+
+    def test_lazy(self):
+        """Loading an agent leaves the other agents' modules unimported"""
+        code = ("import sys\n"
+                "from loveletter.agents import registry\n"
+                "registry.load('Random')\n"
+                "print(sorted(name for name in ('loveletter.agents.a3c', "
+                "'loveletter.agents.tf_agent', 'loveletter.env', 'torch', 'gym') "
+                "if name in sys.modules))")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        output = subprocess.run([sys.executable, '-c', code], check=True, cwd=root,
+                                stdout=subprocess.PIPE).stdout
+        self.assertEqual(output.strip(), b'[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
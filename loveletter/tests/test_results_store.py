@@ -0,0 +1,131 @@
+"""Tests for the arena results store"""
+
+import os
+import tempfile
+import unittest
+
+from loveletter.agents.random import AgentRandom
+from loveletter.arena import Arena
+from loveletter.results_store import ResultsStore
+
+
+class TestResultsStore(unittest.TestCase):
+    """Stored game outcomes"""
+
+    def test_deals(self):
+        """Deals are found once every rotation is stored"""
+        store = ResultsStore()
+        agent, opponent = ("A", "1"), ("B", "")
+        store.add(agent, opponent, 10, [(1, 0), (0, 0)], ((0, 0), (1, 0)))
+        store.add(agent, opponent, 12, [(1,)], ((0, 0),))
+        self.assertEqual(len(store), 5)
+        self.assertDictEqual(store.deals(agent, opponent, 10, 13, ((0, 0), (1, 0))),
+                             {10: (1, 0), 11: (0, 0)})
+        self.assertDictEqual(store.deals(agent, opponent, 10, 13, ((0, 0),)),
+                             {10: (1,), 11: (0,), 12: (1,)})
+        self.assertDictEqual(store.deals(("A", "2"), opponent, 10, 13, ((0, 0),)), {})
+
+    def test_fingerprint(self):
+        """Model files hash by their contents"""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in 'abc']
+            for path, content in zip(paths, [b'one', b'one', b'two']):
+                with open(path, 'wb') as model_file:
+                    model_file.write(content)
+            self.assertEqual(ResultsStore.fingerprint(paths[0]),
+                             ResultsStore.fingerprint(paths[1]))
+            self.assertNotEqual(ResultsStore.fingerprint(paths[0]),
+                                ResultsStore.fingerprint(paths[2]))
+
+
+class TestArenaStore(unittest.TestCase):
+    """Arenas resuming from a store"""
+
+    @staticmethod
+    def agents(played):
+        """Random agents counting the games they are created for"""
+        def random_agent(offset):
+            def create(seed):
+                played.append(seed)
+                return AgentRandom(seed + offset)
+            return create
+        return [("Random A", random_agent(0)),
+                ("Random B", random_agent(3), "b1")]
+
+    def test_resume(self):
+        """Stored games are not played again and give the same results"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.db')
+            played = []
+            arena = Arena(self.agents(played), 30, store=ResultsStore(path))
+            self.assertEqual(len(played), 60)
+
+            played = []
+            resumed = Arena(self.agents(played), 30, store=ResultsStore(path))
+            self.assertEqual(played, [])
+            self.assertListEqual(resumed.results(), arena.results())
+            self.assertListEqual(resumed.csv_results_lists(),
+                                 arena.csv_results_lists())
+
+            played = []
+            Arena(self.agents(played), 40, store=ResultsStore(path))
+            self.assertEqual(len(played), 20)
+
+    def test_partial(self):
+        """An interrupted pairing only plays its missing deals"""
+        store = ResultsStore()
+        played = []
+        pair = (self.agents(played)[0][1], self.agents(played)[1][1])
+        keys = (("Random A", ""), ("Random B", "b1"))
+        Arena._compare_pairs([pair], 10, [5], store=store, keys=[keys])
+        played.clear()
+        comparison = Arena._compare_pairs([pair], 30, [0], store=store,
+                                          keys=[keys])[0]
+        self.assertEqual(len(played), 40)
+        self.assertEqual(comparison.wins, Arena.compare_agents(
+            pair[0], pair[1], 30, 0))
+
+    def test_duplicate(self):
+        """Seat 0 games are shared with duplicate deals"""
+        store = ResultsStore()
+        keys = (("A", ""), ("B", ""))
+        pair = (lambda seed: AgentRandom(seed), lambda seed: AgentRandom(seed + 1))
+        Arena._compare_pairs([pair], 10, [0], store=store, keys=[keys])
+        self.assertEqual(len(store), 10)
+        comparison = Arena._compare_pairs([pair], 10, [0], rotations=Arena.rotations(True),
+                                          store=store, keys=[keys])[0]
+        self.assertEqual(len(store), 40)
+        self.assertEqual(comparison, Arena.compare_agents_duplicate(
+            pair[0], pair[1], 10, 0))
+
+    def test_lazy_fingerprint(self):
+        """Fingerprint functions are called once pairings use the store"""
+        calls = []
+
+        def fingerprint():
+            calls.append(True)
+            return "b1"
+
+        agents = [("Random A", lambda seed: AgentRandom(seed)),
+                  ("Random B", lambda seed: AgentRandom(seed + 3), fingerprint)]
+        Arena(agents[1:], 10, store=ResultsStore())
+        Arena(agents, 10)
+        self.assertListEqual(calls, [])
+        store = ResultsStore()
+        arena = Arena(agents, 10, store=store)
+        self.assertTrue(calls)
+        # the A against B pairing is the second, seeded 1
+        self.assertEqual(len(store.deals(("Random A", ""), ("Random B", "b1"),
+                                         1, 11, Arena.rotations())), 10)
+        self.assertListEqual(arena.results(), Arena(agents, 10).results())
+
+    def test_concurrent(self):
+        """Concurrent games are not stored"""
+        store = ResultsStore()
+        with self.assertRaises(Exception):
+            Arena(self.agents([]), 10, store=store, concurrent_games=4)
+        self.assertEqual(len(store), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
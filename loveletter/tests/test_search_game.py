@@ -0,0 +1,77 @@
+"""Tests for the in place (apply/undo) Love Letter game"""
+
+import random
+import unittest
+
+from loveletter.agents.agent import Agent
+from loveletter.card import Card
+from loveletter.game import Game
+from loveletter.player import PlayerAction, PlayerActionTools
+from loveletter.search_game import SearchGame
+
+
+class TestSearchGame(unittest.TestCase):
+    """Apply and undo match the immutable Game"""
+
+    def assert_same(self, game, search):
+        """Compare every observable part of both engines"""
+        self.assertListEqual(game.players(), search.players())
+        self.assertListEqual(list(game.deck()), list(search.deck()))
+        self.assertEqual(game.turn_index(), search.turn_index())
+        self.assertEqual(game.active(), search.active())
+        self.assertEqual(game.winner(), search.winner())
+        self.assertListEqual(list(game._action_log), search.action_log())
+
+    def test_differential(self):
+        """Every valid action applied in place matches Game._move"""
+        for seed in range(120):
+            rng = random.Random(seed)
+            game = Game.new(4, seed)
+            search = SearchGame.new(4, seed)
+            while game.active():
+                if not game.is_current_player_playing():
+                    game = game.skip_eliminated_player()
+                    search.apply(PlayerActionTools.blank())
+                    self.assert_same(game, search)
+                    continue
+
+                actions = Agent.valid_actions(game)
+                for action in actions:
+                    search.apply(action)
+                    self.assert_same(game._move(action), search)
+                    search.undo()
+                    self.assert_same(game, search)
+
+                action = rng.choice(actions)
+                game = game._move(action)
+                search.apply(action)
+                self.assert_same(game, search)
+
+            # unwind the whole game back to the deal
+            while search.depth() > 0:
+                search.undo()
+            self.assert_same(Game.new(4, seed), search)
+
+    def test_invalid_apply(self):
+        """Invalid actions keep apply and undo paired"""
+        search = SearchGame.new()
+        action = PlayerAction(Card.princess, 0, 0, 0, 0, 0, 0)
+        search.apply(action)
+        self.assertEqual(search.depth(), 1)
+        self.assertEqual(search.turn_index(), 0)
+        search.undo()
+        self.assertEqual(search.depth(), 0)
+        with self.assertRaises(Exception):
+            search.apply(action, throw=True)
+
+    def test_move_does_not_modify(self):
+        """The functional move leaves the search game untouched"""
+        search = SearchGame.new()
+        game = search._move(PlayerAction(Card.guard, 1, Card.handmaid,
+                                         0, 0, 0, 0))
+        self.assertEqual(search.turn_index(), 0)
+        self.assertEqual(game.turn_index(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Tests for the sequential stop rules of the arena"""
+
+import unittest
+
+from loveletter.agents.agent import Agent
+from loveletter.agents.random import AgentRandom
+from loveletter.arena import Arena, Comparison
+from loveletter.sequential import SPRT, IntervalWidth
+
+
+class AgentFirst(Agent):
+    """Always plays the first legal action"""
+
+    def __init__(self, seed=451):
+        self._seed = seed
+
+    def _move(self, game):
+        return Agent.valid_actions(game)[0]
+
+
+class TestSPRT(unittest.TestCase):
+    """Sequential probability ratio test"""
+
+    def test_decision(self):
+        """Clear win rates are accepted, close ones are not yet"""
+        sprt = SPRT(0.25, 0.35)
+        self.assertEqual(sprt.decision(Comparison(90, 200, 0.45, 0.0, 200)), 1)
+        self.assertEqual(sprt.decision(Comparison(20, 200, 0.1, 0.0, 200)), 0)
+        self.assertIsNone(sprt.decision(Comparison(6, 20, 0.3, 0.0, 20)))
+        self.assertFalse(sprt.done(Comparison(0, 0, 0.0, float('nan'), 0)))
+
+    def test_invalid(self):
+        """Invalid hypotheses raise"""
+        self.assertRaises(Exception, SPRT, 0.35, 0.25)
+        self.assertRaises(Exception, SPRT, 0.25, 0.35, 0)
+
+
+class TestIntervalWidth(unittest.TestCase):
+    """Confidence interval width target"""
+
+    def test_done(self):
+        """Narrow intervals over enough deals stop"""
+        rule = IntervalWidth(0.1, min_deals=50)
+        self.assertTrue(rule.done(Comparison(25, 100, 0.25, 0.02, 100)))
+        self.assertFalse(rule.done(Comparison(25, 100, 0.25, 0.04, 100)))
+        self.assertFalse(rule.done(Comparison(10, 40, 0.25, 0.02, 40)))
+        self.assertFalse(rule.done(Comparison(1, 1, 1.0, float('nan'), 1)))
+        # duplicate deals of 16 games each, too few paired samples
+        self.assertFalse(rule.done(Comparison(160, 640, 0.25, 0.02, 40)))
+
+
+class TestArenaSequential(unittest.TestCase):
+    """Pairings ending early"""
+
+    def test_early_stop(self):
+        """A clear result plays fewer games, in whole batches"""
+        comparison = Arena.compare_agents_sequential(
+            lambda seed: AgentRandom(seed), lambda seed: AgentFirst(seed),
+            SPRT(0.25, 0.35), 400, 7, batch_size=10)
+        self.assertLess(comparison.games, 400)
+        self.assertEqual(comparison.games % 10, 0)
+        self.assertEqual(comparison, Arena.compare_agents_sequential(
+            lambda seed: AgentRandom(seed), lambda seed: AgentFirst(seed),
+            SPRT(0.25, 0.35), 400, 7, workers=3, batch_size=10))
+
+    def test_prefix(self):
+        """Games played are the first seeds of the fixed size run"""
+        comparison = Arena.compare_agents_sequential(
+            lambda seed: AgentRandom(seed), lambda seed: AgentFirst(seed),
+            SPRT(0.25, 0.35), 400, 7, batch_size=10)
+        wins = Arena.compare_agents(
+            lambda seed: AgentRandom(seed), lambda seed: AgentFirst(seed),
+            comparison.games, 7)
+        self.assertEqual(comparison.wins, wins)
+
+    def test_cap(self):
+        """Undecided pairings stop at games_to_play"""
+        comparison = Arena.compare_agents_sequential(
+            lambda seed: AgentRandom(seed), lambda seed: AgentRandom(seed + 1),
+            IntervalWidth(0.001), 25, 7, batch_size=10)
+        self.assertEqual(comparison.games, 25)
+
+    def test_arena(self):
+        """Arenas report the games each pairing played"""
+        arena = Arena([
+            ("First", lambda seed: AgentFirst(seed)),
+            ("Random", lambda seed: AgentRandom(seed))
+        ], 300, stop=SPRT(0.25, 0.35), batch_size=10)
+        comparison = arena.comparisons()[1][2]
+        self.assertLess(comparison.games, 300)
+        self.assertEqual(arena.csv_results_lists()[0][2],
+                         1 - comparison.wins / comparison.games)
+
+
+if __name__ == '__main__':
+    unittest.main()
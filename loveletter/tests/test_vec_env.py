@@ -0,0 +1,219 @@
+"""Tests for the vectorized Love Letter environment"""
+
+import unittest
+
+import numpy as np
+
+from loveletter.actions import action_count, candidates
+from loveletter.encoding import unpack_observations
+from loveletter.game import Game
+from loveletter.vec_env import (LoveLetterVecEnv, REWARD_INVALID_ACTION,
+                                REWARD_LOSE, REWARD_WIN, SharedMemoryVecEnv)
+
+
+def first_legal(observations, legal):
+    """Opponent playing the lowest legal action index"""
+    return legal.argmax(axis=1)
+
+
+def advance(game):
+    """Play the opponents of seat 0 with their first legal action"""
+    while game.active():
+        if not game.is_current_player_playing():
+            game = game.skip_eliminated_player()
+        elif game.player_turn() != 0:
+            game, _ = game.move(game.legal_actions().actions[0])
+        else:
+            break
+    return game
+
+
+class GameEnv():
+    """Single game environment as LoveLetterEnv, without gym"""
+
+    def __init__(self, seed):
+        self._seed = seed
+        self._game = None
+
+    def seed(self, seed):
+        self._seed = seed
+        return [seed]
+
+    def reset(self):
+        self._game = Game.new(4, self._seed)
+        self._seed += 1
+        return self._game.observation()
+
+    def step(self, action):
+        game = self._game
+        if not game.is_action_valid(action):
+            return game.observation(), REWARD_INVALID_ACTION, True, {}
+        game, _ = game.move(action)
+        self._game = game = advance(game)
+        reward = 0
+        if game.over():
+            reward = REWARD_WIN if game.winner() == 0 else REWARD_LOSE
+        return game.observation(), reward, game.over(), {'round': game.round()}
+
+
+class TestLoveLetterVecEnv(unittest.TestCase):
+    """Vectorized environment plays as LoveLetterEnv.advance_game"""
+
+    def test_reset(self):
+        """Game i is dealt as Game.new(4, seed + i)"""
+        env = LoveLetterVecEnv(4, 30)
+        observations = env.reset()
+        self.assertEqual(observations.shape, (4, 1396))
+        self.assertEqual(observations.dtype, np.float32)
+        for idx in range(4):
+            np.testing.assert_array_equal(observations[idx],
+                                          Game.new(4, 30 + idx).observation())
+
+    def test_cross_check(self):
+        """Observations, rewards and dones match stepping Game objects"""
+        count = 16
+        seed = 70
+        env = LoveLetterVecEnv(count, seed, opponent=first_legal)
+        observations = env.reset()
+        games = [Game.new(4, seed + idx) for idx in range(count)]
+        next_seed = seed + count
+        rng = np.random.RandomState(1)
+        finished = 0
+
+        while finished < 3 * count:
+            keys = rng.uniform(size=(count, action_count(4)))
+            keys[observations[:, :action_count(4)] == 0] = -1
+            actions = keys.argmax(axis=1)
+            observations, rewards, dones, infos = env.step(actions)
+
+            for idx, game in enumerate(games):
+                game, _ = game.move(candidates(0, 4)[actions[idx]])
+                game = advance(game)
+                self.assertEqual(infos[idx]['round'], game.round())
+                self.assertEqual(dones[idx], game.over())
+                if game.over():
+                    self.assertEqual(rewards[idx], REWARD_WIN
+                                     if game.winner() == 0 else REWARD_LOSE)
+                    game = Game.new(4, next_seed)
+                    next_seed += 1
+                    finished += 1
+                else:
+                    self.assertEqual(rewards[idx], 0)
+                    self.assertNotIn('terminal_observation', infos[idx])
+                np.testing.assert_array_equal(observations[idx],
+                                              game.observation())
+                games[idx] = game
+
+    def test_observation_formats(self):
+        """Compact observations unpack to the float32 observations"""
+        envs = {observation_format: LoveLetterVecEnv(8, 90, first_legal,
+                                                     observation_format)
+                for observation_format in ['float32', 'uint8', 'packed']}
+        observations = {observation_format: env.reset()
+                        for observation_format, env in envs.items()}
+        self.assertEqual(observations['uint8'].dtype, np.uint8)
+        self.assertEqual(observations['packed'].shape, (8, 176))
+        for _ in range(20):
+            expected = observations['float32']
+            for observation_format in ['uint8', 'packed']:
+                np.testing.assert_array_equal(
+                    unpack_observations(observations[observation_format],
+                                        observation_format), expected)
+            actions = expected[:, :action_count(4)].argmax(axis=1)
+            observations = {observation_format: env.step(actions)[0]
+                            for observation_format, env in envs.items()}
+
+    def test_invalid_action(self):
+        """Invalid actions end the game with a penalty"""
+        env = LoveLetterVecEnv(2, 451)
+        observations = env.reset()
+        # princess is not in the opening hand of seed 451
+        _, rewards, dones, infos = env.step([7, 1000])
+        self.assertListEqual(list(rewards), [REWARD_INVALID_ACTION] * 2)
+        self.assertListEqual(list(dones), [True, True])
+        np.testing.assert_array_equal(infos[0]['terminal_observation'],
+                                      observations[0])
+
+    def test_vec_env_methods(self):
+        """Attributes and methods are shared by every game"""
+        env = LoveLetterVecEnv(3)
+        self.assertEqual(env.num_envs, 3)
+        self.assertListEqual(env.get_attr('num_envs'), [3, 3, 3])
+        self.assertListEqual(env.get_attr('num_envs', 1), [3])
+        env.set_attr('label', 'a')
+        self.assertListEqual(env.get_attr('label', [0, 2]), ['a', 'a'])
+        self.assertListEqual(env.seed(5), [5, 6, 7])
+        np.testing.assert_array_equal(env.reset()[0],
+                                      Game.new(4, 5).observation())
+        env.close()
+
+
+class TestSharedMemoryVecEnv(unittest.TestCase):
+    """Subprocess environments return what they would in process"""
+
+    def test_cross_check(self):
+        """Observations, rewards, dones and infos match stepping the envs"""
+        count = 4
+        env = SharedMemoryVecEnv([lambda seed=seed: GameEnv(seed)
+                                  for seed in range(40, 40 + count)])
+        local = [GameEnv(seed) for seed in range(40, 40 + count)]
+        try:
+            observations = env.reset()
+            np.testing.assert_array_equal(
+                observations, np.stack([game_env.reset() for game_env in local]))
+            rng = np.random.RandomState(2)
+            for _ in range(60):
+                keys = rng.uniform(size=(count, action_count(4)))
+                keys[observations[:, :action_count(4)] == 0] = -1
+                actions = keys.argmax(axis=1)
+                # an invalid action now and then
+                actions[rng.uniform(size=count) < 0.05] = 1000
+                observations, rewards, dones, infos = env.step(actions)
+                for idx, game_env in enumerate(local):
+                    observation, reward, done, info = game_env.step(int(actions[idx]))
+                    self.assertEqual(rewards[idx], reward)
+                    self.assertEqual(dones[idx], done)
+                    if done:
+                        np.testing.assert_array_equal(
+                            infos[idx].pop('terminal_observation'), observation)
+                        observation = game_env.reset()
+                    self.assertDictEqual(infos[idx], info)
+                    np.testing.assert_array_equal(observations[idx], observation)
+        finally:
+            env.close()
+
+    def test_not_overwritten(self):
+        """Returned observations are kept by later steps"""
+        env = SharedMemoryVecEnv([lambda seed=seed: GameEnv(seed)
+                                  for seed in range(2)])
+        try:
+            returned = [env.reset()]
+            kept = [returned[0].copy()]
+            for _ in range(3):
+                legal = returned[-1][:, :action_count(4)]
+                returned.append(env.step(legal.argmax(axis=1))[0])
+                kept.append(returned[-1].copy())
+            for observations, observations_kept in zip(returned, kept):
+                np.testing.assert_array_equal(observations, observations_kept)
+        finally:
+            env.close()
+
+    def test_vec_env_methods(self):
+        """Attributes and methods are read from each subprocess"""
+        env = SharedMemoryVecEnv([lambda seed=seed: GameEnv(seed)
+                                  for seed in range(3)])
+        try:
+            self.assertEqual(env.num_envs, 3)
+            self.assertListEqual(env.get_attr('_seed'), [0, 1, 2])
+            env.set_attr('_seed', 9, [1])
+            self.assertListEqual(env.get_attr('_seed', [1, 2]), [9, 2])
+            self.assertListEqual(env.seed(20), [[20], [21], [22]])
+            self.assertListEqual(env.env_method('seed', 5, indices=0), [[5]])
+            np.testing.assert_array_equal(env.reset()[0],
+                                          Game.new(4, 5).observation())
+        finally:
+            env.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
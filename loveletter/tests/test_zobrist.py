@@ -0,0 +1,132 @@
+"""Tests for Zobrist hashing and the transposition table"""
+
+import random
+import unittest
+
+from loveletter.agents.agent import Agent
+from loveletter.game import Game
+from loveletter.player import PlayerTools
+from loveletter.zobrist import TranspositionTable
+
+
+def played_states(seed):
+    """Every state of a random game, hashed from the start"""
+    rng = random.Random(seed)
+    game = Game.new(4, seed)
+    game.zobrist_hash()
+    states = [game]
+    while game.active():
+        if not game.is_current_player_playing():
+            game = game.skip_eliminated_player()
+        else:
+            game = game._move(rng.choice(Agent.valid_actions(game)))
+        states.append(game)
+    return states
+
+
+class TestZobrist(unittest.TestCase):
+    """Position and information set keys"""
+
+    def test_incremental(self):
+        """Keys maintained by moves equal keys computed from scratch"""
+        for seed in range(50):
+            for game in played_states(seed):
+                self.assertIsNotNone(game._slot_keys)
+                fresh = Game(game.deck(), game.players(), game.turn_index(),
+                             game._action_log)
+                self.assertEqual(game.zobrist_hash(), fresh.zobrist_hash())
+                for seat in range(4):
+                    self.assertEqual(game.info_set_hash(seat),
+                                     fresh.info_set_hash(seat))
+
+    def test_distinct(self):
+        """Successive positions of a game have different keys"""
+        for seed in range(50):
+            states = played_states(seed)
+            keys = [game.zobrist_hash() for game in states]
+            for before, after in zip(keys, keys[1:]):
+                self.assertNotEqual(before, after)
+
+    def test_stable(self):
+        """Keys do not depend on the process"""
+        game = Game.new(4, 451)
+        self.assertEqual(game.zobrist_hash(), Game.new(4, 451).zobrist_hash())
+        self.assertLess(game.zobrist_hash(), 1 << 64)
+
+    def test_info_set(self):
+        """Swapping hidden opponent cards only changes the full key"""
+        game = Game.new(4, 3)
+        players = game.players()
+        players[1] = PlayerTools.set_hand(players[1], game.players()[2].hand_card)
+        players[2] = PlayerTools.set_hand(players[2], game.players()[1].hand_card)
+        swapped = Game(game.deck(), players, 0, [])
+        self.assertNotEqual(game.players()[1].hand_card,
+                            game.players()[2].hand_card)
+
+        self.assertNotEqual(game.zobrist_hash(), swapped.zobrist_hash())
+        self.assertEqual(game.info_set_hash(0), swapped.info_set_hash(0))
+        self.assertEqual(game.info_set_hash(3), swapped.info_set_hash(3))
+        self.assertNotEqual(game.info_set_hash(1), swapped.info_set_hash(1))
+        self.assertNotEqual(game.info_set_hash(0), game.info_set_hash(3))
+
+
+class TestTranspositionTable(unittest.TestCase):
+    """Bounded transposition table"""
+
+    def test_get_put(self):
+        """Stored values are found and lookups counted"""
+        table = TranspositionTable(16)
+        self.assertIsNone(table.get(5))
+        self.assertTrue(table.put(5, 'a', depth=2))
+        self.assertEqual(table.get(5), 'a')
+        self.assertEqual(table.depth(5), 2)
+        self.assertIn(5, table)
+        self.assertEqual(len(table), 1)
+        self.assertEqual((table.hits(), table.misses()), (1, 1))
+        self.assertEqual(table.hit_rate(), 0.5)
+
+    def test_depth_policy(self):
+        """Colliding keys keep the deepest result"""
+        table = TranspositionTable(16)
+        table.put(5, 'deep', depth=3)
+        self.assertFalse(table.put(21, 'shallow', depth=1))
+        self.assertEqual(table.get(5), 'deep')
+        self.assertTrue(table.put(21, 'deeper', depth=3))
+        self.assertNotIn(5, table)
+        self.assertEqual(table.get(21), 'deeper')
+
+    def test_depth_policy_same_key(self):
+        """A key keeps its deepest result"""
+        table = TranspositionTable(16)
+        table.put(5, 'deep', depth=3)
+        self.assertFalse(table.put(5, 'shallow', depth=1))
+        self.assertEqual(table.get(5), 'deep')
+        self.assertTrue(table.put(5, 'newer', depth=3))
+        self.assertEqual(table.get(5), 'newer')
+        self.assertEqual(len(table), 1)
+
+    def test_always_policy(self):
+        """Colliding keys keep the newest result"""
+        table = TranspositionTable(16, policy='always')
+        table.put(5, 'deep', depth=3)
+        self.assertTrue(table.put(21, 'shallow', depth=1))
+        self.assertEqual(table.get(21), 'shallow')
+
+    def test_bounded(self):
+        """The table never grows past its capacity"""
+        table = TranspositionTable(64)
+        for key in range(1000):
+            table.put(key * 7919, key)
+        self.assertEqual(len(table), 64)
+        table.clear()
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.hits() + table.misses(), 0)
+
+    def test_invalid(self):
+        """Invalid settings raise"""
+        self.assertRaises(Exception, TranspositionTable, 0)
+        self.assertRaises(Exception, TranspositionTable, 16, 'random')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,6 +20,7 @@ from loveletter.agents.random import AgentRandom
 from loveletter.agents.agent import Agent
 from loveletter.agents.a3c import AgentA3C
 from loveletter.arena import Arena
+from loveletter.sequential import IntervalWidth
 from loveletter.trainers.a3c_model import ActorCritic
 
 
@@ -97,16 +98,20 @@ def test(rank, args, shared_model, dtype):
                 torch.save(shared_model.state_dict(), path_now)
                 max_reward = reward_sum
 
-                win_rate_v_random = Arena.compare_agents_float(
+                # stop short of 800 games once the win rate is known to +-4%
+                comparison = Arena.compare_agents_sequential(
                     lambda seed: AgentA3C(path_output, dtype, seed),
                     lambda seed: AgentRandom(seed),
-                    800)
-                msg = " {} | VsRandom: {: >4}%".format(
+                    IntervalWidth(0.08), 800)
+                win_rate_v_random = comparison.win_rate
+                msg = " {} | VsRandom: {: >4}% of {} games".format(
                     datetime.datetime.now().strftime("%c"),
-                    round(win_rate_v_random * 100, 2)
+                    round(win_rate_v_random * 100, 2),
+                    comparison.games
                 )
                 print(msg)
                 log_value('Win Rate vs Random', win_rate_v_random, test_ctr)
+                log_value('Games vs Random', comparison.games, test_ctr)
                 if win_rate_v_random > max_winrate:
                     print("Found superior model at {}".format(datetime.datetime.now().isoformat()))
                     torch.save(shared_model.state_dict(), "{}_{}_best_{}".format(
@@ -19,7 +19,8 @@ def ensure_shared_grads(model, shared_model):
 def train(rank, args, shared_model, dtype):
     torch.manual_seed(args.seed + rank)
 
-    env = LoveLetterEnv(AgentRandom(args.seed + rank), args.seed + rank)
+    env = LoveLetterEnv(AgentRandom(args.seed + rank), args.seed + rank,
+                        deal_pool=args.deal_pool)
     env.seed(args.seed + rank)
     state = env.reset()
 
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter vectorized environments
+Many LoveLetterEnv games stepped together, in one process or in
+subprocesses sharing memory.
+
+The games are held in a `BatchGame`, so a step encodes every observation
+and plays every opponent move with array operations instead of a process
+and a Game object per environment. It follows the stable_baselines VecEnv
+interface and subclasses it when stable_baselines is installed, so PPO2
+trains on it as on a SubprocVecEnv of LoveLetterEnv:
+
+    env = LoveLetterVecEnv(8, seed=1)
+    model = PPO2(MlpPolicy, env)
+
+SharedMemoryVecEnv runs one environment per subprocess as SubprocVecEnv,
+for opponents that can not be batched.
+"""
+import multiprocessing
+
+import numpy as np
+
+from loveletter.actions import masked_argmax
+from loveletter.batch_game import BatchGame
+from loveletter.encoding import (OBSERVATION_SIZE, observation_dtype,
+                                 observation_high, observation_size,
+                                 pack_observations)
+
+try:
+    from stable_baselines.common.vec_env import VecEnv
+except ImportError:
+    VecEnv = object
+
+try:
+    from gym import spaces
+except ImportError:
+    spaces = None
+
+LEARNER = 0
+
+# rewards of LoveLetterEnv, which needs gym to import
+REWARD_WIN = 1
+REWARD_LOSE = -1
+REWARD_INVALID_ACTION = -1.50
+
+
+def random_opponent(seed=451):
+    """Opponent playing uniformly random legal actions"""
+    rng = np.random.default_rng(seed)
+
+    def opponent(observations, legal):
+        return masked_argmax(rng.random(legal.shape), legal)
+    return opponent
+
+
+class LoveLetterVecEnv(VecEnv):
+    """
+    Vectorized Love Letter Game Environment
+
+    The learner plays seat 0 of every game. After its action the
+    opponents of all games move together, one batched call per round of
+    turns, until each game is back at the learner or over. An opponent is
+    a function of the observations and bool legal action masks of the
+    games to move returning their action indices, for instance
+
+        lambda observations, legal: masked_argmax(
+            agent.logits(observations), legal)
+
+    for an AgentA3CNumpy. Finished games are dealt again at once; their
+    last observation is in the info as 'terminal_observation'.
+
+    The learner observes in observation_format as LoveLetterEnv does,
+    opponents always see float32 observations.
+    """
+
+    def __init__(self, num_envs, seed=451, opponent=None,
+                 observation_format='float32'):
+        observation_space = action_space = None
+        if spaces is not None:
+            observation_space = observation_box(observation_format)
+            action_space = spaces.Discrete(OBSERVATION_SIZE)
+        if VecEnv is object:
+            self.num_envs = num_envs
+            self.observation_space = observation_space
+            self.action_space = action_space
+        else:
+            super().__init__(num_envs, observation_space, action_space)
+
+        self._opponent_given = opponent
+        self._observation_format = observation_format
+        self._observations = np.zeros(
+            (num_envs, OBSERVATION_SIZE),
+            dtype=observation_dtype(observation_format))
+        self._actions = None
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """
+        Deal the games of the next reset from seed, game i as
+        Game.new(4, seed + i), and seed the default random opponent
+        """
+        seed = 451 if seed is None else seed
+        self._games = BatchGame(self.num_envs, seed, auto_reset=False)
+        self._fresh = True
+        self._opponent = self._opponent_given or random_opponent(seed)
+        return [seed + idx for idx in range(self.num_envs)]
+
+    def reset(self):
+        """Deal new games to every environment, returns the observations"""
+        if not self._fresh:
+            self._games.reset(np.arange(self.num_envs))
+        self._fresh = False
+        self._play_opponents()
+        return self._learner_observations()
+
+    def step(self, actions):
+        """Step every game, returns <observations, rewards, dones, infos>"""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(-1)
+
+    def step_wait(self):
+        """
+        Play the learner actions and the opponent replies
+
+        returns <observations, rewards, dones, infos>
+        """
+        actions, self._actions = self._actions, None
+        games = self._games
+        self._fresh = False
+        in_range = (actions >= 0) & (actions < games.action_count())
+        valid, _ = games.step(np.where(in_range, actions, 0), in_range)
+        self._play_opponents()
+
+        over = ~games.active()
+        rewards = np.where(games.winners() == LEARNER,
+                           REWARD_WIN, REWARD_LOSE).astype(np.float32)
+        rewards[~over] = 0
+        rewards[~valid] = REWARD_INVALID_ACTION
+        dones = over | ~valid
+
+        observations = self._learner_observations()
+        infos = [{'round': int(game_round)} for game_round in games.rounds()]
+        finished = np.flatnonzero(dones)
+        for idx in finished:
+            infos[idx]['terminal_observation'] = observations[idx]
+        if finished.size > 0:
+            games.reset(finished)
+            self._play_opponents()
+            observations = self._learner_observations()
+        return observations, rewards, dones, infos
+
+    def _learner_observations(self):
+        """New array of the observations of every game, in the env's format"""
+        observations = self._games.observations(out=self._observations)
+        if self._observation_format == 'packed':
+            return pack_observations(observations)
+        return observations.copy()
+
+    def _play_opponents(self):
+        """Move the opponents of every game until the learner is to play"""
+        games = self._games
+        while True:
+            moving = games.active() & (games.player_turns() != LEARNER)
+            if not moving.any():
+                return
+            rows = np.flatnonzero(moving)
+            observations = games.observations()[rows]
+            legal = observations[:, :games.action_count()] > 0
+            actions = np.zeros(self.num_envs, dtype=np.int64)
+            actions[rows] = self._opponent(observations, legal)
+            games.step(actions, moving)
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        """Attribute of the environment, the same for every game"""
+        return [getattr(self, attr_name)] * len(_indices(indices, self.num_envs))
+
+    def set_attr(self, attr_name, value, indices=None):
+        """Set an attribute of the environment, shared by every game"""
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """Call a method of the environment once per game"""
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs)
+                for _ in _indices(indices, self.num_envs)]
+
+
+def observation_box(observation_format):
+    """gym Box of the observations of a format"""
+    return spaces.Box(low=0, high=observation_high(observation_format),
+                      shape=(observation_size(observation_format),),
+                      dtype=observation_dtype(observation_format))
+
+
+def _indices(indices, num_envs):
+    """Environment indices selected by None, an int or a list"""
+    if indices is None:
+        return range(num_envs)
+    if isinstance(indices, int):
+        return [indices]
+    return indices
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """
+    Environments stepped in subprocesses, one each, as SubprocVecEnv.
+
+    Workers write observations, rewards and dones into shared arrays and
+    read their actions from one, so only the command and the info dict of
+    each step cross the pipes. Reset and step return copies of the shared
+    arrays, which the next step overwrites; the observation that ended an
+    episode is copied into its info as 'terminal_observation'. The
+    environments return observations of observation_format.
+
+    Environments are created in the workers, which are forked.
+    """
+
+    def __init__(self, env_fns, observation_format='float32'):
+        num_envs = len(env_fns)
+        dtype = np.dtype(observation_dtype(observation_format))
+        size = observation_size(observation_format)
+        self._buffers = (
+            multiprocessing.RawArray('b', num_envs * size * dtype.itemsize),
+            multiprocessing.RawArray('b', num_envs * size * dtype.itemsize),
+            multiprocessing.RawArray('d', num_envs),
+            multiprocessing.RawArray('b', num_envs),
+            multiprocessing.RawArray('q', num_envs))
+        (self._observations, self._terminal, self._rewards, self._dones,
+         self._actions) = _shared_arrays(self._buffers, num_envs, size, dtype)
+
+        context = multiprocessing.get_context('fork')
+        self._remotes = []
+        self._processes = []
+        for index, env_fn in enumerate(env_fns):
+            remote, worker_remote = context.Pipe()
+            process = context.Process(
+                target=_shared_memory_worker,
+                args=(worker_remote, env_fn, index, self._buffers, num_envs,
+                      size, dtype),
+                daemon=True)
+            process.start()
+            worker_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+        self._closed = False
+
+        self._remotes[0].send(('get_spaces', None))
+        observation_space, action_space = self._remotes[0].recv()
+        if VecEnv is object:
+            self.num_envs = num_envs
+            self.observation_space = observation_space
+            self.action_space = action_space
+        else:
+            super().__init__(num_envs, observation_space, action_space)
+
+    def seed(self, seed=None):
+        """Seed environment i with seed + i"""
+        seed = 451 if seed is None else seed
+        for index, remote in enumerate(self._remotes):
+            remote.send(('seed', seed + index))
+        return [remote.recv() for remote in self._remotes]
+
+    def reset(self):
+        """Reset every environment, returns the observations"""
+        for remote in self._remotes:
+            remote.send(('reset', None))
+        for remote in self._remotes:
+            remote.recv()
+        return self._observations.copy()
+
+    def step(self, actions):
+        """Step every environment, returns <observations, rewards, dones, infos>"""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
+        self._actions[:] = np.asarray(actions).reshape(-1)
+        for remote in self._remotes:
+            remote.send(('step', None))
+
+    def step_wait(self):
+        infos = [remote.recv() for remote in self._remotes]
+        dones = self._dones.astype(bool)
+        for index in np.flatnonzero(dones):
+            infos[index]['terminal_observation'] = self._terminal[index].copy()
+        return (self._observations.copy(), self._rewards.copy(), dones, infos)
+
+    def close(self):
+        if self._closed:
+            return
+        for remote in self._remotes:
+            remote.send(('close', None))
+        for process in self._processes:
+            process.join()
+        self._closed = True
+
+    def get_attr(self, attr_name, indices=None):
+        """Attribute of each selected environment"""
+        return self._call('get_attr', (attr_name,), indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        """Set an attribute of each selected environment"""
+        self._call('set_attr', (attr_name, value), indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """Call a method of each selected environment"""
+        return self._call('env_method',
+                          (method_name, method_args, method_kwargs), indices)
+
+    def _call(self, command, data, indices):
+        """Send a command to the selected workers, returns their replies"""
+        remotes = [self._remotes[index] for index in _indices(indices, self.num_envs)]
+        for remote in remotes:
+            remote.send((command, data))
+        return [remote.recv() for remote in remotes]
+
+
+def _shared_arrays(buffers, num_envs, size, dtype):
+    """NumPy views of the shared buffers of a SharedMemoryVecEnv"""
+    observations, terminal, rewards, dones, actions = buffers
+    return (np.frombuffer(observations, dtype=dtype).reshape(num_envs, size),
+            np.frombuffer(terminal, dtype=dtype).reshape(num_envs, size),
+            np.frombuffer(rewards, dtype=np.float64),
+            np.frombuffer(dones, dtype=np.int8),
+            np.frombuffer(actions, dtype=np.int64))
+
+
+def _shared_memory_worker(remote, env_fn, index, buffers, num_envs, size, dtype):
+    """Step one environment on the commands of a SharedMemoryVecEnv"""
+    observations, terminal, rewards, dones, actions = _shared_arrays(
+        buffers, num_envs, size, dtype)
+    env = env_fn()
+    while True:
+        command, data = remote.recv()
+        if command == 'step':
+            observation, reward, done, info = env.step(int(actions[index]))
+            if done:
+                terminal[index] = observation
+                observation = env.reset()
+            observations[index] = observation
+            rewards[index] = reward
+            dones[index] = done
+            remote.send(info)
+        elif command == 'reset':
+            observations[index] = env.reset()
+            remote.send(None)
+        elif command == 'seed':
+            remote.send(env.seed(data))
+        elif command == 'get_spaces':
+            remote.send((getattr(env, 'observation_space', None),
+                         getattr(env, 'action_space', None)))
+        elif command == 'get_attr':
+            remote.send(getattr(env, data[0]))
+        elif command == 'set_attr':
+            remote.send(setattr(env, data[0], data[1]))
+        elif command == 'env_method':
+            method_name, method_args, method_kwargs = data
+            remote.send(getattr(env, method_name)(*method_args, **method_kwargs))
+        elif command == 'close':
+            remote.close()
+            return
+        else:
+            raise Exception("Unknown command {}".format(command))
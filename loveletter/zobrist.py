@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Zobrist hashing
+64 bit position keys and a bounded transposition table.
+
+A position key XORs one random key per feature of the state:
+
+  deck cursor     number of cards left in the deck
+  turn            seat of the player to move
+  hands           card held by each seat
+  discard slots   card in each discard slot of each seat, which also
+                  determines whether the seat is protected by a handmaid
+
+Keys identify positions of the same deal, the order of the undealt cards
+is not part of them. The keys are fixed, so hashes are stable between
+runs and processes.
+
+An information set key instead only covers what one seat observes: the
+public cursor, turn and discards, its own hand, the card it drew when it
+is to move and the cards revealed to it by its priests.
+"""
+import random
+
+from loveletter.card import Card
+
+MAX_PLAYERS = 8
+SLOTS_PER_PLAYER = 8
+DECK_SIZE = sum(Card.counts)
+CARD_COUNT = Card.princess + 1
+
+_rng = random.Random(451)
+
+
+def _keys(count):
+    return [_rng.getrandbits(64) for _ in range(count)]
+
+
+_CURSOR = _keys(DECK_SIZE + 1)
+_TURN = _keys(MAX_PLAYERS)
+_SEAT = _keys(MAX_PLAYERS)
+_DRAWN = _keys(CARD_COUNT)
+_HAND = [_keys(CARD_COUNT) for _ in range(MAX_PLAYERS)]
+# empty slots have no key
+_SLOT = [[[0] + _keys(CARD_COUNT - 1) for _ in range(SLOTS_PER_PLAYER)]
+         for _ in range(MAX_PLAYERS)]
+_REVEALED = [[_keys(CARD_COUNT) for _ in range(SLOTS_PER_PLAYER)]
+             for _ in range(MAX_PLAYERS)]
+
+
+def slots_key(seat, player):
+    """Key of the discard slots of the player in seat"""
+    keys = _SLOT[seat]
+    key = 0
+    for slot, action in enumerate(player.actions):
+        key ^= keys[slot][action.discard]
+    return key
+
+
+def public_key(slot_keys, deck_length, player_turn):
+    """Key of the state all seats observe"""
+    key = _CURSOR[deck_length] ^ _TURN[player_turn]
+    for slot_key in slot_keys:
+        key ^= slot_key
+    return key
+
+
+def hand_key(seat, card):
+    """Key of the card held by seat"""
+    return _HAND[seat][card]
+
+
+def info_set_key(seat, player, drawn_card):
+    """
+    Key of what only the player in seat observes
+
+    drawn_card is the card it drew, or no card when it is not to move.
+    """
+    key = _SEAT[seat] ^ _HAND[seat][player.hand_card] ^ _DRAWN[drawn_card]
+    for slot, action in enumerate(player.actions):
+        if action.discard == Card.priest:
+            key ^= _REVEALED[seat][slot][action.revealed_card]
+    return key
+
+
+class TranspositionTable():
+    """
+    Bounded table of search results keyed by position hash.
+
+    Each key maps to one of `capacity` entries. When a result is stored
+    on an entry already in use, by the same key or a colliding one, the
+    'depth' policy keeps the result searched deepest (the newer one on
+    ties) and the 'always' policy keeps the newer one.
+    """
+
+    POLICIES = ('depth', 'always')
+
+    def __init__(self, capacity=1 << 16, policy='depth'):
+        if capacity < 1:
+            raise Exception("Invalid capacity: {}".format(capacity))
+        if policy not in TranspositionTable.POLICIES:
+            raise Exception("Invalid replacement policy: {}".format(policy))
+        self._capacity = capacity
+        self._policy = policy
+        self._entries = [None] * capacity
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, default=None):
+        """Value stored for key, counted as a hit or a miss"""
+        entry = self._entries[key % self._capacity]
+        if entry is not None and entry[0] == key:
+            self._hits += 1
+            return entry[2]
+        self._misses += 1
+        return default
+
+    def depth(self, key):
+        """Depth stored with key, None if not stored"""
+        entry = self._entries[key % self._capacity]
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        return None
+
+    def put(self, key, value, depth=0):
+        """
+        Store a value for key, searched to depth
+
+        Returns True if it was stored
+        """
+        idx = key % self._capacity
+        entry = self._entries[idx]
+        if entry is None:
+            self._size += 1
+        elif self._policy == 'depth' and depth < entry[1]:
+            return False
+        self._entries[idx] = (key, depth, value)
+        return True
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        self._entries = [None] * self._capacity
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def capacity(self):
+        """Maximum number of entries"""
+        return self._capacity
+
+    def hits(self):
+        """Number of lookups that found their key"""
+        return self._hits
+
+    def misses(self):
+        """Number of lookups that did not find their key"""
+        return self._misses
+
+    def hit_rate(self):
+        """Fraction of lookups that found their key"""
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups > 0 else 0.0
+
+    def __contains__(self, key):
+        entry = self._entries[key % self._capacity]
+        return entry is not None and entry[0] == key
+
+    def __len__(self):
+        return self._size
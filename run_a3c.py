@@ -38,6 +38,8 @@ parser.add_argument('--max-episode-length', type=int, default=1, metavar='M',
                     help='maximum length of an episode (default: 10000)')
 parser.add_argument('--evaluate', action="store_true",
                     help='whether to evaluate results')
+parser.add_argument('--deal-pool', action="store_true",
+                    help='deal training games from a pool of decks shuffled in blocks')
 
 parser.add_argument('--save-name', metavar='FN', default='default_model',
                     help='path/prefix for the filename to save shared model\'s parameters')
@@ -1,40 +1,90 @@
-
 import argparse
 import csv
+import functools
 import os
 
-import torch
-
-from loveletter.agents.random import AgentRandom
+from loveletter.agents import registry
 from loveletter.arena import Arena
-from loveletter.agents.a3c import AgentA3C
-from loveletter.agents.tf_agent import TFAgent
+from loveletter.results_store import ResultsStore
+
+A3C_PATH = os.path.join("models", "stated_2017-05-01T22-59-33.510476_best_0.45875")
+SMITH_PATH = "weights.pkl"
+
+
+def torch_dtype():
+    """Tensor type of the A3C model, imports torch"""
+    import torch
+    return torch.cuda.FloatTensor if torch.cuda.is_available() else torch.FloatTensor
+
+
+# Place agents in this dict as created
+# the key is the readable name
+# first in the tuple is the registry name of the agent class
+# second is a function returning the arguments of the class before the
+# random seed, only called when the agent plays
+# third, if any, is the model file; its hash identifies the model so
+# stored games of an older model under the same name are played again,
+# and is only computed once the store is asked for games of the agent
+AGENTS = {
+    "A3C": ("A3C", lambda: (A3C_PATH, torch_dtype()), A3C_PATH),
+    "Random": ("Random", lambda: (), None),
+    "Mr. Smith": ("TF", lambda: (SMITH_PATH,), SMITH_PATH),
+    "Mr. Smith 2": ("TF", lambda: ('weights_2.pkl',), 'weights_2.pkl'),
+}
 
 PARSER = argparse.ArgumentParser(
     description='Run the arena with available agents')
 
+PARSER.add_argument('--agents', type=str, default=','.join(AGENTS),
+                    help='Comma separated agents to play (default: {})'.format(
+                        ','.join(AGENTS)))
 PARSER.add_argument('--output', type=str, default='arena.results.csv',
                     help='Path to write arena results')
+PARSER.add_argument('--store', type=str, default='arena.results.db',
+                    help='SQLite file of played games, reused by later runs')
+PARSER.add_argument('--workers', type=int, default=1,
+                    help='Number of processes playing games')
 
 ARGS = PARSER.parse_args()
 
-print('Starting arena')
-A3C_PATH = os.path.join("models", "stated_2017-05-01T22-59-33.510476_best_0.45875")
-SMITH_PATH = "weights.pkl"
 
-dtype = torch.cuda.FloatTensor if torch.cuda.is_available() else torch.FloatTensor
+def arena_agent(name):
+    """
+    (name, lambda, fingerprint function) of an agent
+
+    Its module is imported and its arguments built when it first plays,
+    so agents whose games are all stored are never loaded.
+    """
+    if name not in AGENTS:
+        raise Exception("Unknown agent {}, available are {}".format(
+            name, ', '.join(AGENTS)))
+    registry_name, arguments, model_path = AGENTS[name]
+    loaded = []
+
+    def create(seed):
+        if not loaded:
+            loaded.append((registry.load(registry_name), arguments()))
+        agent_class, agent_arguments = loaded[0]
+        return agent_class(*agent_arguments, seed)
+
+    return (name, create, functools.lru_cache()(lambda: model_fingerprint(model_path)))
 
 
-ARENA = Arena([
-    # Place agents in this list as created
-    # first in the tuple is the readable name
-    # second is a lambda that ONLY takes a random seed. This can be discarded
-    # if the the Agent does not require a seed
-    ("A3C", lambda seed: AgentA3C(A3C_PATH, dtype, seed)),
-    ("Random", lambda seed: AgentRandom(seed)),
-    ("Mr. Smith", lambda seed: TFAgent(SMITH_PATH, seed)),
-    ("Mr. Smith 2", lambda seed: TFAgent('weights_2.pkl', seed))
-], 100)
+def model_fingerprint(model_path):
+    """
+    Hash of a model file, '' without one
+
+    A missing file has no stored games, its agent fails once it plays.
+    """
+    if model_path is None or not os.path.exists(model_path):
+        return ''
+    return ResultsStore.fingerprint(model_path)
+
+
+print('Starting arena')
+
+ARENA = Arena([arena_agent(name.strip()) for name in ARGS.agents.split(',')],
+              100, workers=ARGS.workers, store=ResultsStore(ARGS.store))
 
 print('Run the arena for: ', ARENA.csv_header())
 
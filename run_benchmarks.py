@@ -0,0 +1,21 @@
+"""Run the performance benchmarks"""
+
+import argparse
+
+from loveletter.benchmarks import SUITES, run_suite
+
+PARSER = argparse.ArgumentParser(
+    description='Run the Love Letter performance benchmarks')
+
+PARSER.add_argument('suites', nargs='*', default=[],
+                    help='Suites to run (default: all of {})'.format(
+                        ', '.join(sorted(SUITES))))
+PARSER.add_argument('--games', type=int, default=500,
+                    help='Number of games to simulate per measurement')
+PARSER.add_argument('--seed', type=int, default=451,
+                    help='Seed of the first simulated game')
+
+ARGS = PARSER.parse_args()
+
+for suite in ARGS.suites if ARGS.suites else sorted(SUITES):
+    run_suite(suite, ARGS)
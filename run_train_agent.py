@@ -8,6 +8,7 @@ from stable_baselines.common.vec_env import DummyVecEnv, SubprocVecEnv
 from stable_baselines import PPO2
 
 from loveletter.env import LoveLetterEnv
+from loveletter.vec_env import LoveLetterVecEnv
 from loveletter.arena import Arena
 from loveletter.agents.random import AgentRandom
 from loveletter.agents.tf_agent import TFAgent
@@ -24,7 +25,8 @@ parser.add_argument('--lr', type=float, default=0.0001, metavar='LR',
 parser.add_argument('--seed', type=int, default=1, metavar='S',
                     help='random seed (default: 1)')
 parser.add_argument('--num-processes', type=int, default=4, metavar='N',
-                    help='how many training processes to use (default: 4)')
+                    help='how many training processes (or games against a random '
+                         'agent) to use (default: 4)')
 parser.add_argument('--num-steps', type=int, default=20, metavar='NS',
                     help='number of forward steps for update (default: 20)')
 parser.add_argument('--total-steps', type=int, default=1e6, metavar='NS',
@@ -52,8 +54,7 @@ if __name__ == '__main__':
         env = SubprocVecEnv([lambda: LoveLetterEnv(TFAgent(args.load_name, args.seed + i))
                              for i in range(args.num_processes)])
     else:
-        env = SubprocVecEnv([lambda: LoveLetterEnv(AgentRandom(args.seed + i))
-                             for i in range(args.num_processes)])
+        env = LoveLetterVecEnv(args.num_processes, args.seed)
 
     model = PPO2(CustomPolicy,
                  env,